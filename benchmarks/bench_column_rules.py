@@ -0,0 +1,89 @@
+"""Benchmark the column-from-field table rules of ``validate_form``.
+
+Times ``is_all_unique_in_column_from_field`` and
+``has_multiple_column_values_from_field_in_table`` on experiment-design tables
+of 10k and 100k rows, held as lists, NumPy arrays and a ``DataFrame``. Both
+rules are one pass over each referenced column, so the time per row should
+stay flat as the table grows.
+
+Run from the repository root::
+
+    python benchmarks/bench_column_rules.py
+"""
+
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from md_form import validate_form  # noqa: E402
+
+DEFINITION = {"properties": {
+    "condition_column": {"fieldType": "DatasetSampleMetadata"},
+    "control_variables": {"fieldType": "PairwiseControlVariables"},
+    "experiment_design": {
+        "fieldType": "SampleMetadataTable",
+        "rules": [
+            {"name": "is_all_unique_in_column_from_field", "parameters": {"values": "sample_column"}},
+            {"name": "has_multiple_column_values_from_field_in_table", "parameters": {"values": "condition_column"}},
+            {"name": "has_multiple_column_values_from_field_in_table",
+             "parameters": {"field": "control_variables", "values": "control_variables[].column"}},
+        ],
+    },
+    "sample_column": {"fieldType": "DatasetSampleMetadata"},
+}}
+
+
+def _table(rows, valid):
+    samples = np.array([f"S{i}" for i in range(rows)], dtype=object)
+    if not valid:
+        samples[-1] = samples[0]  # one duplicate, found only at the last row
+    return {
+        "sample_name": samples,
+        "condition": np.arange(rows) % 4,
+        "batch": np.arange(rows) % 7,
+    }
+
+
+def _as(kind, table):
+    if kind == "list":
+        return {name: col.tolist() for name, col in table.items()}
+    if kind == "DataFrame":
+        return pd.DataFrame(table)
+    return table
+
+
+def _time(data, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        validate_form(DEFINITION, data)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main(repeat=5):
+    print(f"{'rows':>8} {'table':>10} {'data':>8} {'median ms':>10} {'ns/row':>8}")
+    for rows in (10_000, 100_000):
+        for valid in (True, False):
+            base = _table(rows, valid)
+            for kind in ("list", "ndarray", "DataFrame"):
+                data = {
+                    "sample_column": "sample_name",
+                    "condition_column": "condition",
+                    "control_variables": [{"column": "batch"}],
+                    "experiment_design": _as(kind, base),
+                }
+                assert validate_form(DEFINITION, data).is_valid is valid
+                seconds = _time(data, repeat)
+                label = "valid" if valid else "invalid"
+                print(f"{rows:>8} {kind:>10} {label:>8} {seconds * 1e3:>10.2f} {seconds * 1e9 / rows:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
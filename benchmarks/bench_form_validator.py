@@ -0,0 +1,256 @@
+"""Throughput benchmarks for ``validate_form``.
+
+Each scenario builds a form definition and a valid and an invalid submission
+for it, then validates each submission repeatedly against the compiled form
+(as a validation worker would) and reports per-submission latency percentiles
+and submissions per second. With ``--uncompiled`` the definition dict is
+passed on every call instead, as by callers that don't hold a
+:class:`CompiledForm`:
+
+* ``fields_<n>``: forms of 10 to 5,000 fields mixing options, bounds,
+  required rules and shared ``when`` gates,
+* ``options_<n>``: a multi-select over a large option list,
+* ``nested_when``: fields gated by deep ``and``/``or`` trees,
+* ``table_<rows>``: an experiment-design table with column rules,
+* ``catalog_<n>``: a dataset selection checked against a large catalog,
+  passed as a list and as a prebuilt :class:`DatasetIndex`,
+* ``tutorial/<form>``: the forms shipped in ``tutorial/*.json``.
+
+Run from the repository root::
+
+    python benchmarks/bench_form_validator.py                # every scenario
+    python benchmarks/bench_form_validator.py fields table   # names containing "fields" or "table"
+    python benchmarks/bench_form_validator.py --repeat 50 --json
+    python benchmarks/bench_form_validator.py --generated    # via compile_form_code
+    python benchmarks/bench_form_validator.py --uncompiled   # pass the definition dict each time
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from md_form.field_utils import DatasetIndex, compile_form, compile_form_code, validate_form  # noqa: E402
+
+INVALID_OPTION = "__not_an_option__"
+
+
+def _gate(i):
+    return {"property": "mode", "equals": "advanced" if i % 2 else "basic"}
+
+
+def fields_form(count):
+    properties = {"mode": {"fieldType": "String", "rules": [{"name": "is_required"}],
+                           "parameters": {"options": ["basic", "advanced"]}}}
+    for i in range(count - 1):
+        kind = i % 4
+        if kind == 0:
+            spec = {"fieldType": "String", "parameters": {"options": [f"o{j}" for j in range(8)]}, "default": "o0"}
+        elif kind == 1:
+            spec = {"fieldType": "Number", "parameters": {"min": 0, "max": 100}}
+        elif kind == 2:
+            spec = {"fieldType": "String", "rules": [{"name": "is_required"},
+                                                     {"name": "is_not_equal_to_value", "parameters": {"value": "x"}}]}
+        else:
+            spec = {"fieldType": "Boolean", "default": False}
+        if i % 3 == 0:
+            spec["when"] = _gate(i)
+        properties[f"field_{i}"] = spec
+    return {"properties": properties}
+
+
+def options_form(count):
+    options = [{"name": f"Option {j}", "value": f"opt_{j}"} for j in range(count)]
+    return {"properties": {"choices": {"fieldType": "MultipleSelect", "parameters": {"options": options},
+                                       "rules": [{"name": "is_required"}]}}}
+
+
+def _nested(depth, i):
+    if depth == 0:
+        return {"property": f"flag_{i % 10}", "equals": True}
+    operator = "and" if depth % 2 else "or"
+    return {"operator": operator, "conditions": [_nested(depth - 1, i + k) for k in range(3)]}
+
+
+def nested_when_form(count=200, depth=5):
+    properties = {f"flag_{i}": {"fieldType": "Boolean"} for i in range(10)}
+    for i in range(count):
+        properties[f"gated_{i}"] = {"fieldType": "Number", "when": _nested(depth, i),
+                                    "parameters": {"min": 0, "max": 1}, "rules": [{"name": "is_required"}]}
+    return {"properties": properties}
+
+
+def table_form():
+    return {"properties": {
+        "condition_column": {"fieldType": "DatasetSampleMetadata", "rules": [{"name": "is_required"}]},
+        "experiment_design": {"fieldType": "SampleMetadataTable", "rules": [
+            {"name": "has_unique_column_values_in_table", "parameters": {"column": "sample_name"}},
+            {"name": "has_multiple_column_values_from_field_in_table", "parameters": {"values": "condition_column"}},
+        ]},
+    }}
+
+
+def catalog_form():
+    return {"properties": {"input_datasets": {"fieldType": "Datasets", "rules": [{"name": "is_required"}],
+                                              "parameters": {"type": "INTENSITY"}}}}
+
+
+def sample_data(definition, dataset_ids=()):
+    """A submission giving every field a valid value (its default, first option, ...)."""
+    properties = definition.get("properties", definition)
+    data = {}
+    for name, spec in properties.items():
+        if not isinstance(spec, dict) or "fieldType" not in spec:
+            continue
+        params = spec.get("parameters") or {}
+        options = params.get("options")
+        if spec["fieldType"] == "Datasets":
+            data[name] = list(dataset_ids)[:1]
+        elif isinstance(options, list) and options:
+            first = options[0]
+            value = first.get("value") if isinstance(first, dict) else first
+            data[name] = [value] if spec["fieldType"] == "MultipleSelect" else value
+        elif spec.get("default") is not None:
+            data[name] = spec["default"]
+        elif spec["fieldType"] in ("Number", "NumberRange"):
+            data[name] = params.get("min", 0)
+        elif spec["fieldType"] == "Boolean":
+            data[name] = True
+        else:
+            data[name] = f"{name}_value"
+    return data
+
+
+def break_data(definition, data):
+    """A copy of ``data`` with every option, bound and required field made invalid."""
+    properties = definition.get("properties", definition)
+    bad = dict(data)
+    for name, spec in properties.items():
+        if not isinstance(spec, dict) or name not in bad:
+            continue
+        params = spec.get("parameters") or {}
+        if "options" in params:
+            bad[name] = [INVALID_OPTION] if isinstance(bad[name], list) else INVALID_OPTION
+        elif isinstance(params.get("max"), (int, float)) and spec["fieldType"] != "Datasets":
+            bad[name] = params["max"] + 1
+        elif any(isinstance(r, dict) and r.get("name") == "is_required" for r in spec.get("rules") or []):
+            del bad[name]
+    return bad
+
+
+def _catalog(size):
+    return [{"id": f"ds_{i}", "type": "INTENSITY" if i % 3 else "PAIRWISE", "state": "COMPLETED"}
+            for i in range(size)]
+
+
+def scenarios():
+    """Yield ``(name, definition, valid_data, invalid_data, validate_kwargs)``."""
+    for count in (10, 100, 1000, 5000):
+        definition = fields_form(count)
+        valid = sample_data(definition)
+        yield f"fields_{count}", definition, valid, break_data(definition, valid), {}
+
+    for count in (1000, 20000):
+        definition = options_form(count)
+        valid = {"choices": [f"opt_{j}" for j in range(0, count, count // 100)]}
+        yield f"options_{count}", definition, valid, {"choices": valid["choices"] + [INVALID_OPTION]}, {}
+
+    definition = nested_when_form()
+    valid = {f"flag_{i}": True for i in range(10)}
+    valid.update({f"gated_{i}": 1 for i in range(200)})
+    yield "nested_when", definition, valid, {f"flag_{i}": True for i in range(10)}, {}
+
+    for rows in (10_000, 100_000):
+        table = {"sample_name": [f"S{i}" for i in range(rows)], "condition": [f"C{i % 4}" for i in range(rows)]}
+        valid = {"condition_column": "condition", "experiment_design": table}
+        bad_table = dict(table, sample_name=table["sample_name"][:-1] + ["S0"])
+        invalid = {"condition_column": "condition", "experiment_design": bad_table}
+        yield f"table_{rows}", table_form(), valid, invalid, {}
+
+    for size in (1000, 100_000):
+        catalog = _catalog(size)
+        valid = {"input_datasets": [f"ds_{i}" for i in range(1, size, max(1, size // 50)) if i % 3]}
+        invalid = {"input_datasets": ["ds_0", "missing"]}
+        yield f"catalog_{size}_list", catalog_form(), valid, invalid, {"datasets": catalog}
+        yield f"catalog_{size}_index", catalog_form(), valid, invalid, {"datasets": DatasetIndex(catalog)}
+
+    for path in sorted(glob.glob(os.path.join(ROOT, "tutorial", "*.json"))):
+        with open(path) as f:
+            definition = json.load(f)
+        catalog = _catalog(10)
+        valid = sample_data(definition, ["ds_1"])
+        yield (f"tutorial/{os.path.basename(path)}", definition, valid, break_data(definition, valid),
+               {"datasets": catalog})
+
+
+def _percentile(sorted_values, q):
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(definition, data, repeat, generated=False, uncompiled=False, **kwargs):
+    """Validate ``data`` ``repeat`` times; return latency stats in milliseconds.
+
+    With ``generated`` the form is validated by its generated code
+    (:func:`compile_form_code`) instead of :func:`validate_form`; with
+    ``uncompiled`` :func:`validate_form` is given the definition dict.
+    """
+    if generated:
+        validate = compile_form_code(definition).validate
+    elif uncompiled:
+        def validate(data, **kwargs):
+            return validate_form(definition, data, **kwargs)
+    else:
+        form = compile_form(definition)
+
+        def validate(data, **kwargs):
+            return validate_form(form, data, **kwargs)
+    validate(data, **kwargs)  # warm-up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        validate(data, **kwargs)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    total = sum(timings)
+    return {
+        "p50_ms": _percentile(timings, 0.50) * 1e3,
+        "p95_ms": _percentile(timings, 0.95) * 1e3,
+        "p99_ms": _percentile(timings, 0.99) * 1e3,
+        "per_sec": repeat / total if total else float("inf"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("filters", nargs="*", help="only run scenarios whose name contains one of these")
+    parser.add_argument("--repeat", type=int, default=20, help="validations per submission (default 20)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    parser.add_argument("--generated", action="store_true", help="validate with the generated code")
+    parser.add_argument("--uncompiled", action="store_true", help="pass the definition dict on every call")
+    args = parser.parse_args(argv)
+
+    results = []
+    for name, definition, valid, invalid, kwargs in scenarios():
+        if args.filters and not any(f in name for f in args.filters):
+            continue
+        assert validate_form(definition, valid, **kwargs).is_valid, name
+        assert not validate_form(definition, invalid, **kwargs).is_valid, name
+        for label, data in (("valid", valid), ("invalid", invalid)):
+            stats = measure(definition, data, args.repeat, generated=args.generated, uncompiled=args.uncompiled,
+                            **kwargs)
+            results.append({"scenario": name, "data": label, **stats})
+            if not args.json:
+                print(f"{name:<40} {label:<8} p50 {stats['p50_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms  "
+                      f"p99 {stats['p99_ms']:9.3f} ms  {stats['per_sec']:10.0f}/s", flush=True)
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
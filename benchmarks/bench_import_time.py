@@ -0,0 +1,103 @@
+"""Import-time benchmark for a large params module, with and without production mode.
+
+Generates a module declaring an ``MdDatasetBaseModel`` with ``--fields`` fields
+(500 by default) built with the field helpers and rule builders, the way a
+large workflow's params module does, then imports it in fresh interpreters
+with ``MD_FORM_PRODUCTION`` unset and set to ``1``. For each mode it reports
+the median time to import ``md_form`` and then the params module.
+
+Run from the repository root::
+
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --fields 2000 --runs 5 --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULE_NAME = "bench_params_module"
+
+_FIELD_TEMPLATES = [
+    '    field_{i}: Optional[str] = string_field(name="Field {i}", rules=[is_required()])',
+    '    field_{i}: Optional[float] = number_field(name="Field {i}", ge=0, le=100, '
+    'when=When.equals("mode", "advanced"))',
+    '    field_{i}: Optional[bool] = boolean_field(name="Field {i}", default=False)',
+    '    field_{i}: Optional[str] = select_field(name="Field {i}", options=["a", "b", "c"], default="a")',
+    '    field_{i}: Optional[str] = string_field(name="Field {i}", '
+    'rules=[is_not_equal_to_value("x"), is_equal_to_value_from_field("field_0")])',
+]
+
+# Imports md_form, then the params module, and prints both timings as JSON.
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import md_form.field_utils
+imported = time.perf_counter()
+import {module}
+done = time.perf_counter()
+print(json.dumps({{"md_form_ms": (imported - started) * 1e3, "module_ms": (done - imported) * 1e3}}))
+"""
+
+
+def params_module(fields):
+    lines = [
+        "from typing import Optional",
+        "from md_form.field_utils import (",
+        "    ConditionalRequiredMixin, MdDatasetBaseModel, When, boolean_field, is_equal_to_value_from_field,",
+        "    is_not_equal_to_value, is_required, number_field, select_field, string_field,",
+        ")",
+        "",
+        "",
+        "class Params(ConditionalRequiredMixin, MdDatasetBaseModel):",
+        '    mode: Optional[str] = select_field(name="Mode", options=["basic", "advanced"], default="basic")',
+    ]
+    lines += [_FIELD_TEMPLATES[i % len(_FIELD_TEMPLATES)].format(i=i) for i in range(fields)]
+    return "\n".join(lines) + "\n"
+
+
+def measure(directory, production, runs):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([directory, ROOT]), PYTHONDONTWRITEBYTECODE="1")
+    env.pop("MD_FORM_PRODUCTION", None)
+    if production:
+        env["MD_FORM_PRODUCTION"] = "1"
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=MODULE_NAME)],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        samples.append(json.loads(output))
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--fields", type=int, default=500, help="fields in the params module (default 500)")
+    parser.add_argument("--runs", type=int, default=7, help="fresh interpreters per mode (default 7)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, MODULE_NAME + ".py"), "w") as f:
+            f.write(params_module(args.fields))
+        for production in (False, True):
+            stats = measure(directory, production, args.runs)
+            results.append({"fields": args.fields, "production": production, **stats})
+            if not args.json:
+                mode = "production" if production else "development"
+                print(f"{args.fields} fields  {mode:<12} md_form {stats['md_form_ms']:8.1f} ms  "
+                      f"params module {stats['module_ms']:8.1f} ms", flush=True)
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -38,7 +38,8 @@ from .rules_builder import (
 )
 
 # Import When class and evaluation
-from .when import When, evaluate_when
+from .when import When, evaluate_when, compile_when, simplify_when
+from .when_vectorized import evaluate_when_vectorized
 
 # Import conditional validation mixin
 from .conditional_validator import ConditionalRequiredMixin
@@ -51,11 +52,23 @@ from .md_dataset_base_model import MdDatasetBaseModel
 # Runtime validation of a data payload against a form-definition dict
 from .form_validator import (
     validate_form,
+    validate_form_async,
     is_valid_form,
+    compile_form,
+    CompiledForm,
     ValidationResult,
     FieldError,
     FormValidationError,
 )
+from .form_json_validator import validate_form_json
+from .validation_session import ValidationSession
+from .dataset_index import DatasetIndex
+from .dataset_resolver import DatasetResolver, CachingDatasetResolver, InMemoryDatasetResolver
+from .validation_profile import ValidationProfile
+from .rule_registry import register_rule, unregister_rule, registered_rules, register_messages
+from .validation_service import ValidationService, ValidationClient
+from .form_codegen import GeneratedForm, compile_form_code
+from .production_mode import is_production_mode, set_production_mode
 __all__ = [
     # Field helpers
     "boolean_field",
@@ -91,6 +104,9 @@ __all__ = [
     # Classes
     "When",
     "evaluate_when",
+    "compile_when",
+    "simplify_when",
+    "evaluate_when_vectorized",
     "ConditionalRequiredMixin",
     "Rule",
     "EqualsToValueRule",
@@ -102,8 +118,28 @@ __all__ = [
 
     # Form-definition validation
     "validate_form",
+    "validate_form_async",
+    "validate_form_json",
     "is_valid_form",
+    "compile_form",
+    "CompiledForm",
     "ValidationResult",
     "FieldError",
     "FormValidationError",
+    "ValidationSession",
+    "DatasetIndex",
+    "DatasetResolver",
+    "CachingDatasetResolver",
+    "InMemoryDatasetResolver",
+    "ValidationProfile",
+    "register_rule",
+    "unregister_rule",
+    "registered_rules",
+    "register_messages",
+    "ValidationService",
+    "ValidationClient",
+    "GeneratedForm",
+    "compile_form_code",
+    "set_production_mode",
+    "is_production_mode",
 ] 
\ No newline at end of file
@@ -1,5 +1,39 @@
+import weakref
+from typing import Any, Dict, List, Tuple
+
 from pydantic import model_validator
-from .when import evaluate_when
+from .when import Predicate, compile_when
+
+# The fields a class requires conditionally, with their compiled conditions.
+GatePlan = List[Tuple[str, Predicate]]
+
+# Per-class plans, with the model_fields mapping each was built from so a
+# model_rebuild() that replaces the fields also replaces the plan.
+_PLANS: "weakref.WeakKeyDictionary[type, Tuple[Dict[str, Any], GatePlan]]" = weakref.WeakKeyDictionary()
+
+
+def _gate_plan(cls: type) -> GatePlan:
+    fields = cls.model_fields
+    cached = _PLANS.get(cls)
+    if cached is not None and cached[0] is fields:
+        return cached[1]
+
+    plan: GatePlan = []
+    for field_name, field_info in fields.items():
+        extra = field_info.json_schema_extra or {}
+        when = extra.get("when")
+        if not when:
+            continue
+
+        rules = extra.get("rules", [])
+        if isinstance(rules, dict):
+            rules = [rules]
+
+        if any(r.get("name") == "is_required" for r in rules):
+            plan.append((field_name, compile_when(when)))
+
+    _PLANS[cls] = (fields, plan)
+    return plan
 
 
 class ConditionalRequiredMixin:
@@ -9,23 +43,11 @@ class ConditionalRequiredMixin:
         if not isinstance(data, dict):
             return data
 
-        for field_name, field_info in cls.model_fields.items():
-            extra = field_info.json_schema_extra or {}
-            rules = extra.get("rules", [])
-            when = extra.get("when")
-
-            if not when:
-                continue
-
-            if isinstance(rules, dict):
-                rules = [rules]
-
-            has_required = any(r.get("name") == "is_required" for r in rules)
-
-            if has_required and evaluate_when(when, data):
-                value = data.get(field_name)
-                if value is None:
-                    msg = f"'{field_name}' is required"
-                    raise ValueError(msg)
+        # Only the fields that are required under a `when` condition are
+        # checked; the plan is built on the class's first validation.
+        for field_name, condition in _gate_plan(cls):
+            if condition(data) and data.get(field_name) is None:
+                msg = f"'{field_name}' is required"
+                raise ValueError(msg)
 
         return data
@@ -0,0 +1,129 @@
+"""A reusable index over the datasets available for selection.
+
+:func:`validate_form` checks the ids selected in dataset-selection fields
+against a catalog of datasets. Passing the catalog as a plain list means it is
+indexed again on every call; a :class:`DatasetIndex` is built once, kept up to
+date as datasets are added, removed or change state, and passed wherever a
+``datasets`` list is accepted. Checking a submission then costs a few lookups
+per selected dataset, however large the catalog.
+"""
+
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, Optional, Set
+
+# Only fully-processed datasets are selectable.
+COMPLETED_STATE = "COMPLETED"
+
+
+class DatasetIndex:
+    """Datasets keyed by ``id``, with lookups by ``type``, ``entityType`` and state.
+
+    Each dataset is a dict with at least an ``id`` (entries without one are
+    ignored, as in a plain ``datasets`` list). The index keeps a reference to
+    each dict, so update datasets through :meth:`add` or :meth:`set_state`
+    rather than mutating them in place. A ``type`` or ``entityType`` that
+    can't be hashed is not indexed; such datasets are compared one by one.
+    """
+
+    def __init__(self, datasets: Iterable[Dict[str, Any]] = ()):
+        self._by_id: Dict[Any, Dict[str, Any]] = {}
+        self._by_type: Dict[Any, Set[Any]] = {}
+        self._by_entity_type: Dict[Any, Set[Any]] = {}
+        self._completed: Set[Any] = set()
+        # Ids of datasets whose type or entityType can't be a dict key.
+        self._unhashable: Set[Any] = set()
+        for dataset in datasets:
+            self.add(dataset)
+
+    def add(self, dataset: Dict[str, Any]) -> None:
+        """Add ``dataset``, replacing any dataset with the same id."""
+        if not isinstance(dataset, dict) or "id" not in dataset:
+            return
+        ds_id = dataset["id"]
+        if ds_id in self._by_id:
+            self._unindex(ds_id)
+        self._by_id[ds_id] = dataset
+        self._index(self._by_type, dataset.get("type"), ds_id)
+        self._index(self._by_entity_type, dataset.get("entityType"), ds_id)
+        if dataset.get("state") == COMPLETED_STATE:
+            self._completed.add(ds_id)
+
+    def remove(self, ds_id: Any) -> None:
+        """Remove the dataset with id ``ds_id`` (a no-op if it is not indexed)."""
+        if ds_id in self._by_id:
+            self._unindex(ds_id)
+            del self._by_id[ds_id]
+
+    def set_state(self, ds_id: Any, state: Any) -> None:
+        """Record a state change, e.g. a dataset finishing processing."""
+        dataset = self._by_id.get(ds_id)
+        if dataset is None:
+            raise KeyError(ds_id)
+        self.add({**dataset, "state": state})
+
+    def get(self, ds_id: Any) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(ds_id)
+
+    def has_type(self, ds_id: Any, dataset_type: Any) -> bool:
+        dataset = self._by_id.get(ds_id)
+        return dataset is not None and dataset.get("type") == dataset_type
+
+    def has_entity_type(self, ds_id: Any, entity_type: Any) -> bool:
+        dataset = self._by_id.get(ds_id)
+        return dataset is not None and dataset.get("entityType") == entity_type
+
+    def is_completed(self, ds_id: Any) -> bool:
+        return ds_id in self._completed
+
+    def of_type(self, dataset_type: Any) -> FrozenSet[Any]:
+        """The ids of every dataset of ``dataset_type``."""
+        return self._lookup(self._by_type, "type", dataset_type)
+
+    def of_entity_type(self, entity_type: Any) -> FrozenSet[Any]:
+        """The ids of every dataset with ``entityType == entity_type``."""
+        return self._lookup(self._by_entity_type, "entityType", entity_type)
+
+    @property
+    def completed(self) -> FrozenSet[Any]:
+        """The ids of every dataset in the ``COMPLETED`` state."""
+        return frozenset(self._completed)
+
+    def __contains__(self, ds_id: Any) -> bool:
+        return ds_id in self._by_id
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._by_id.values())
+
+    def _unindex(self, ds_id: Any) -> None:
+        old = self._by_id[ds_id]
+        self._discard(self._by_type, old.get("type"), ds_id)
+        self._discard(self._by_entity_type, old.get("entityType"), ds_id)
+        self._completed.discard(ds_id)
+        self._unhashable.discard(ds_id)
+
+    def _index(self, index: Dict[Any, Set[Any]], key: Any, ds_id: Any) -> None:
+        try:
+            index.setdefault(key, set()).add(ds_id)
+        except TypeError:
+            self._unhashable.add(ds_id)
+
+    def _lookup(self, index: Dict[Any, Set[Any]], attribute: str, key: Any) -> FrozenSet[Any]:
+        try:
+            ids = set(index.get(key, ()))
+        except TypeError:
+            ids = set()
+        ids.update(ds_id for ds_id in self._unhashable if self._by_id[ds_id].get(attribute) == key)
+        return frozenset(ids)
+
+    @staticmethod
+    def _discard(index: Dict[Any, Set[Any]], key: Any, ds_id: Any) -> None:
+        try:
+            ids = index.get(key)
+        except TypeError:
+            return
+        if ids is not None:
+            ids.discard(ds_id)
+            if not ids:
+                del index[key]
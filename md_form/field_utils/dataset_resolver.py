@@ -0,0 +1,133 @@
+"""Resolve selected datasets on demand instead of supplying the whole catalog.
+
+:func:`validate_form` normally needs every dataset the user could have
+selected. A :class:`DatasetResolver` can be passed as ``datasets`` instead: the
+validator collects the ids selected across all dataset-selection fields and asks
+the resolver for just those, in one batch. :func:`validate_form_async` does the
+same with an awaitable fetch.
+
+:class:`CachingDatasetResolver` wraps a batch fetch function (e.g. a call to
+the datasets API) and caches its answers for ``ttl`` seconds.
+:class:`InMemoryDatasetResolver` serves a fixed list, for tests.
+"""
+
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .dataset_index import DatasetIndex
+
+# Expired cache entries are dropped whenever the cache has doubled since the
+# last sweep, but not before it holds this many.
+_MIN_PRUNE_SIZE = 1024
+
+# Fetches the datasets with the given ids; ids with no dataset are left out.
+FetchDatasets = Callable[[List[Any]], Iterable[Dict[str, Any]]]
+AsyncFetchDatasets = Callable[[List[Any]], Awaitable[Iterable[Dict[str, Any]]]]
+
+
+class DatasetResolver:
+    """Base class for looking up the datasets behind a set of selected ids."""
+
+    def resolve(self, ids: Set[Any]) -> DatasetIndex:
+        """Return an index holding the datasets among ``ids`` that exist."""
+        raise NotImplementedError
+
+    async def aresolve(self, ids: Set[Any]) -> DatasetIndex:
+        """Async variant of :meth:`resolve`; defaults to calling it directly."""
+        return self.resolve(ids)
+
+
+class CachingDatasetResolver(DatasetResolver):
+    """Batch ``fetch`` calls and cache their answers for ``ttl`` seconds.
+
+    Every id not already cached is requested in a single ``fetch`` call.
+    Ids the fetch does not return are cached as missing too, so repeated
+    submissions naming an unknown dataset don't refetch it until the entry
+    expires. Expired entries are swept out as new answers are stored, so the
+    cache holds about the ids asked for within ``ttl``. ``afetch`` is the
+    awaitable counterpart used by :meth:`aresolve`; without it the sync
+    ``fetch`` is called.
+    """
+
+    def __init__(
+        self,
+        fetch: Optional[FetchDatasets] = None,
+        *,
+        afetch: Optional[AsyncFetchDatasets] = None,
+        ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if fetch is None and afetch is None:
+            raise ValueError("a fetch or afetch function is required")
+        self._fetch = fetch
+        self._afetch = afetch
+        self.ttl = ttl
+        self._clock = clock
+        # id -> (expiry time, dataset or None for a known-missing id)
+        self._cache: Dict[Any, Tuple[float, Optional[Dict[str, Any]]]] = {}
+        self._prune_at = _MIN_PRUNE_SIZE
+
+    def resolve(self, ids: Set[Any]) -> DatasetIndex:
+        index, missing = self._from_cache(ids)
+        if missing:
+            if self._fetch is None:
+                raise TypeError("this resolver only has an async fetch; use aresolve")
+            self._store(missing, self._fetch(missing), index)
+        return index
+
+    async def aresolve(self, ids: Set[Any]) -> DatasetIndex:
+        if self._afetch is None:
+            return self.resolve(ids)
+        index, missing = self._from_cache(ids)
+        if missing:
+            self._store(missing, await self._afetch(missing), index)
+        return index
+
+    def invalidate(self, ids: Optional[Iterable[Any]] = None) -> None:
+        """Drop cached answers for ``ids``, or for every id when omitted."""
+        if ids is None:
+            self._cache.clear()
+            return
+        for ds_id in ids:
+            self._cache.pop(ds_id, None)
+
+    def _from_cache(self, ids: Set[Any]) -> Tuple[DatasetIndex, List[Any]]:
+        now = self._clock()
+        index = DatasetIndex()
+        missing: List[Any] = []
+        for ds_id in ids:
+            entry = self._cache.get(ds_id)
+            if entry is None or entry[0] <= now:
+                missing.append(ds_id)
+            elif entry[1] is not None:
+                index.add(entry[1])
+        return index, missing
+
+    def _store(self, requested: List[Any], fetched: Iterable[Dict[str, Any]], index: DatasetIndex) -> None:
+        now = self._clock()
+        if len(self._cache) >= self._prune_at:
+            self._cache = {ds_id: entry for ds_id, entry in self._cache.items() if entry[0] > now}
+            self._prune_at = max(_MIN_PRUNE_SIZE, 2 * len(self._cache))
+        expires = now + self.ttl
+        wanted = set(requested)
+        for ds_id in requested:
+            self._cache[ds_id] = (expires, None)
+        for dataset in fetched:
+            if isinstance(dataset, dict) and "id" in dataset:
+                self._cache[dataset["id"]] = (expires, dataset)
+                if dataset["id"] in wanted:
+                    index.add(dataset)
+
+
+class InMemoryDatasetResolver(CachingDatasetResolver):
+    """A resolver over a fixed list of datasets, recording each batch it fetches."""
+
+    def __init__(self, datasets: Iterable[Dict[str, Any]], *, ttl: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self._catalog = DatasetIndex(datasets)
+        self.fetches: List[List[Any]] = []
+        super().__init__(self._fetch_from_catalog, ttl=ttl, clock=clock)
+
+    def _fetch_from_catalog(self, ids: List[Any]) -> List[Dict[str, Any]]:
+        self.fetches.append(list(ids))
+        return [self._catalog.get(ds_id) for ds_id in ids if ds_id in self._catalog]
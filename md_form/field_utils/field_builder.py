@@ -3,7 +3,7 @@ from pydantic import Field
 from functools import wraps
 from .field_types import FieldType
 from .when import When
-from typeguard import typechecked
+from .production_mode import typechecked
 from .rules import Rule
 
 
@@ -45,11 +45,13 @@ def field_builder(field_type: FieldType) -> Callable[[Callable], Callable]:
             if rules is not None:
 
                 if isinstance(rules, list):
-                    json_schema_extra["rules"] = [rule.as_dict() for rule in rules]
-                    has_required = any(rule.as_dict().get("name") == "is_required" for rule in rules)
+                    rule_dicts = [rule.as_dict() for rule in rules]
+                    json_schema_extra["rules"] = rule_dicts
+                    has_required = any(rule_dict.get("name") == "is_required" for rule_dict in rule_dicts)
                 else:
-                    json_schema_extra["rules"] = rules.as_dict()
-                    has_required = rules.as_dict().get("name") == "is_required"
+                    rule_dict = rules.as_dict()
+                    json_schema_extra["rules"] = rule_dict
+                    has_required = rule_dict.get("name") == "is_required"
 
             else:
                 has_required = False
@@ -1,7 +1,7 @@
 from typing import Any, Dict, List, Optional, Union
 from .field_types import FieldType
 from .field_builder import field_builder
-from typeguard import typechecked
+from .production_mode import typechecked
 
 @field_builder(FieldType.BOOLEAN)
 @typechecked
@@ -0,0 +1,391 @@
+"""Compile a form definition into specialized Python source.
+
+:func:`compile_form_code` turns a form definition into the source of one
+``validate`` function for that form, in the spirit of ``fastjsonschema``: every
+``when`` gate becomes an inline boolean expression, static option lists,
+``min``/``max`` bounds and the value rules (``is_equal_to_value``,
+``is_not_equal_to_value``, ``is_equal_to_value_from_field``) become
+straight-line comparisons against constants, and the remaining checks (table
+rules, custom rules, dynamic options, dataset fields) are called directly,
+without the per-field dispatch of :func:`validate_form`.
+
+The result is a :class:`GeneratedForm`. Its ``source`` can be read (or
+printed) for debugging, and tracebacks through generated code show its lines.
+Generated forms are cached by the structure of the definition (see
+:func:`frozen.exact_key`), so compiling the same definition again is a lookup. Validating with a generated form gives
+exactly the errors :func:`validate_form` gives.
+
+Example::
+
+    generated = compile_form_code(definition)
+    print(generated.source)
+    result = generated.validate(data, datasets=datasets)
+"""
+
+import hashlib
+import linecache
+import math
+import sys
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .dataset_resolver import DatasetResolver
+from .frozen import exact_key
+from .form_validator import (
+    CompiledForm,
+    Datasets,
+    FieldError,
+    ValidationResult,
+    _ValidationContext,
+    _check_datasets,
+    _check_options,
+    _collect_dataset_ids,
+    _is_equal_to_value_from_field_rule,
+    _is_equal_to_value_rule,
+    _is_not_equal_to_value_rule,
+    _normalize_rules,
+    _rule_params,
+    compile_form,
+    validate_form,
+)
+from .rule_registry import registry_version, rule_factory
+from .validation_profile import ValidationProfile
+from .when import When, _as_node, _simplified, _when_key
+
+# Upper bound on distinct generated forms kept in the cache.
+_MAX_GENERATED = 256
+
+# Option lists at least this long are checked with a set lookup for plain values.
+_SET_MIN_OPTIONS = 8
+
+# Values whose == agrees with their hash, so set and list membership agree.
+_SCALARS = (str, int, float, bool, type(None))
+
+
+class GeneratedForm:
+    """A form definition compiled to Python source by :func:`compile_form_code`.
+
+    Attributes:
+        form: The :class:`CompiledForm` the code was generated from.
+        fingerprint: A hash of the definition; identical definitions share it.
+        source: The generated Python source.
+    """
+
+    def __init__(self, form: CompiledForm, fingerprint: str, source: str, namespace: Dict[str, Any]):
+        self.form = form
+        self.fingerprint = fingerprint
+        self.source = source
+        filename = f"<md_form generated {fingerprint[:12]}>"
+        # Let tracebacks and inspect show the generated lines.
+        linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+        exec(compile(source, filename, "exec"), namespace)
+        self._run = namespace["validate"]
+
+    def validate(
+        self,
+        data: Dict[str, Any],
+        *,
+        datasets: Optional[Datasets] = None,
+        allow_unknown: bool = True,
+        raise_on_error: bool = False,
+        max_errors: Optional[int] = None,
+        fail_fast: bool = False,
+        profile: Optional[ValidationProfile] = None,
+    ) -> ValidationResult:
+        """Validate ``data``; takes the same options as :func:`validate_form`.
+
+        Profiling needs the instrumented checks, so with a ``profile`` this
+        runs :func:`validate_form` on :attr:`form` instead.
+        """
+        if profile is not None or not isinstance(data, dict):
+            return validate_form(
+                self.form, data, datasets=datasets, allow_unknown=allow_unknown, raise_on_error=raise_on_error,
+                max_errors=max_errors, fail_fast=fail_fast, profile=profile,
+            )
+        if fail_fast:
+            max_errors = 1 if max_errors is None else min(max_errors, 1)
+        if max_errors is not None and max_errors < 1:
+            raise ValueError("max_errors must be at least 1")
+        if isinstance(datasets, DatasetResolver):
+            datasets = datasets.resolve(_collect_dataset_ids(self.form, data))
+        errors, truncated = self._run(data, datasets, allow_unknown, max_errors)
+        result = ValidationResult(errors, truncated)
+        return result.raise_if_invalid() if raise_on_error else result
+
+    def is_valid(self, data: Dict[str, Any], **kwargs: Any) -> bool:
+        """Whether ``data`` is valid; validation stops at the first error."""
+        kwargs.pop("max_errors", None)
+        kwargs.pop("fail_fast", None)
+        return self.validate(data, max_errors=1, **kwargs).is_valid
+
+    def __repr__(self) -> str:
+        return f"GeneratedForm({len(self.form.fields)} fields, fingerprint={self.fingerprint[:12]!r})"
+
+
+# (definition key, rule registry version) -> generated form.
+_GENERATED: Dict[Tuple[Any, int], GeneratedForm] = {}
+
+
+def compile_form_code(definition: Union[Dict[str, Any], CompiledForm]) -> GeneratedForm:
+    """Generate, compile and cache the validation code for ``definition``.
+
+    Rules are looked up in the rule registry when the code is generated;
+    registering or removing a rule invalidates the cache.
+    """
+    form = compile_form(definition)
+    try:
+        key: Optional[Tuple[Any, int]] = (_definition_key(form), registry_version())
+    except TypeError:
+        key = None  # values exact_key can't key; generate uncached
+    generated = _GENERATED.get(key) if key is not None else None
+    if generated is None:
+        fingerprint = _fingerprint(form.fields if key is None else key[0])
+        source, namespace = _generate(form, fingerprint)
+        generated = GeneratedForm(form, fingerprint, source, namespace)
+        if key is not None:
+            if len(_GENERATED) >= _MAX_GENERATED:
+                _GENERATED.clear()
+            _GENERATED[key] = generated
+    return generated
+
+
+def definition_fingerprint(definition: Union[Dict[str, Any], CompiledForm]) -> str:
+    """A hash of a form definition's fields, in order (it sets the order of errors)."""
+    form = compile_form(definition)
+    try:
+        return _fingerprint(_definition_key(form))
+    except TypeError:
+        return _fingerprint(form.fields)
+
+
+def _definition_key(form: CompiledForm) -> Any:
+    """A key equal only for forms whose fields are equal, with equal types, in
+    the same order. Raises ``TypeError`` for values that can't be keyed."""
+    return tuple((exact_key(name), exact_key(spec)) for name, spec in form.fields.items())
+
+
+def _fingerprint(key: Any) -> str:
+    return hashlib.sha256(repr(key).encode()).hexdigest()
+
+
+def _contains(value: Any, expected: Any) -> bool:
+    return isinstance(value, (list, tuple)) and expected in value
+
+
+class _Writer:
+    """Accumulates generated lines and the constants they refer to."""
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+        self.namespace: Dict[str, Any] = {
+            "FieldError": FieldError,
+            "_Context": _ValidationContext,
+            "_check_datasets": _check_datasets,
+            "_check_options": _check_options,
+            "_contains": _contains,
+            "_SCALARS": _SCALARS,
+        }
+        self._constants: Dict[int, str] = {}
+        self._gates: Dict[Any, str] = {}
+
+    def child(self) -> "_Writer":
+        """A writer for a separate block of lines, sharing this one's constants."""
+        child = _Writer()
+        child.namespace, child._constants, child._gates = self.namespace, self._constants, self._gates
+        return child
+
+    def line(self, depth: int, text: str) -> None:
+        self.lines.append("    " * depth + text)
+
+    def full(self, depth: int) -> None:
+        self.line(depth, "if len(errors) >= limit:")
+        self.line(depth + 1, "return errors[:limit], True")
+
+    def const(self, value: Any) -> str:
+        """A Python expression for ``value``: a literal, or a bound constant."""
+        kind = type(value)
+        if kind in (str, int, bool, type(None)) or (kind is float and math.isfinite(value)):
+            return repr(value)
+        name = self._constants.get(id(value))
+        if name is None:
+            name = self._constants[id(value)] = f"_k{len(self._constants)}"
+            self.namespace[name] = value
+        return name
+
+    def gate(self, when: Any, depth: int) -> str:
+        """The local holding a field's gate; evaluated where first used, then reused."""
+        node = _simplified(_as_node(when))
+        try:
+            key = _when_key(node)
+        except TypeError:
+            key = object()
+        name = self._gates.get(key)
+        if name is None:
+            name = self._gates[key] = f"gate{len(self._gates)}"
+            self.line(depth, f"{name} = {self.condition(node)}")
+        return name
+
+    def condition(self, node: When) -> str:
+        if node.operator is not None:
+            if not node.conditions:
+                return "True" if node.operator == "and" else "False"
+            joiner = f" {node.operator} "
+            return "(" + joiner.join(self.condition(c) for c in node.conditions) + ")"
+        value = f"data.get({self.const(node.property)})"
+        expected = self.const(node.value)
+        if node.condition_type == "equals":
+            return f"({value} == {expected})"
+        if node.condition_type == "not_equals":
+            return f"({value} != {expected})"
+        if node.condition_type == "is_present":
+            return f"({value} is not None)"
+        return f"_contains({value}, {expected})"
+
+
+def _generate(form: CompiledForm, fingerprint: str) -> Tuple[str, Dict[str, Any]]:
+    w = _Writer()
+    w.line(0, f"# Validation code generated by md_form for form {fingerprint}.")
+    w.line(0, "def validate(data, datasets, allow_unknown, max_errors):")
+    w.line(1, "limit = max_errors if max_errors is not None else _MAXSIZE")
+    w.line(1, "errors = []")
+    w.line(1, "append = errors.append")
+    w.line(1, "ctx = _Context(data, max_errors)")
+    w.namespace["_MAXSIZE"] = sys.maxsize
+    for name, spec in form.fields.items():
+        _generate_field(w, form, name, spec)
+    if form.dataset_fields:
+        w.line(1, f"errors.extend(_check_datasets({w.const(form.dataset_fields)}, data, datasets, ctx))")
+        w.full(1)
+    w.line(1, "if not allow_unknown:")
+    w.line(2, "for key in data:")
+    w.line(3, f"if key not in {w.const(frozenset(form.fields))}:")
+    w.line(4, "append(FieldError(key, 'unknown_field'))")
+    w.line(4, "if len(errors) >= limit:")
+    w.line(5, "return errors, True")
+    w.line(1, "return errors, False")
+    return "\n".join(w.lines) + "\n", w.namespace
+
+
+def _generate_field(w: _Writer, form: CompiledForm, name: str, spec: Dict[str, Any]) -> None:
+    body = w.child()
+    _generate_value_checks(body, name, spec, depth=0)
+    required = name in form.required
+    if not required and not body.lines:
+        return  # nothing to check, whatever the gate says
+
+    field = w.const(name)
+    w.line(1, f"# {name!r}")
+    depth = 1
+    if name in form.gates:
+        w.line(depth, f"if {w.gate(spec['when'], depth)}:")
+        depth += 1
+    w.line(depth, f"value = data.get({field})")
+    if required:
+        w.line(depth, "if value is None:")
+        w.line(depth + 1, f"append(FieldError({field}, 'required'))")
+        w.full(depth + 1)
+        if body.lines:
+            w.line(depth, "else:")
+    elif body.lines:
+        w.line(depth, "if value is not None:")
+    for line in body.lines:
+        w.line(depth + 1, line)
+
+
+def _generate_value_checks(w: _Writer, name: str, spec: Dict[str, Any], depth: int) -> None:
+    """The checks run on a present value: options, then bounds, then rules."""
+    field = w.const(name)
+    params = spec.get("parameters")
+    if isinstance(params, dict):
+        _generate_options(w, field, spec, params, depth)
+        _generate_bounds(w, field, params, depth)
+    for rule in _normalize_rules(spec.get("rules")):
+        _generate_rule(w, field, rule, depth)
+
+
+def _static_options(options: Any) -> Optional[List[Any]]:
+    """The allowed values of an option list without ``when`` entries, else ``None``."""
+    if not isinstance(options, list):
+        return None
+    allowed: List[Any] = []
+    for opt in options:
+        if not isinstance(opt, dict):
+            allowed.append(opt)
+        elif opt.get("when"):
+            return None
+        else:
+            allowed.append(opt.get("value"))
+    return allowed
+
+
+def _generate_options(w: _Writer, field: str, spec: Dict[str, Any], params: Dict[str, Any], depth: int) -> None:
+    if "options" not in params:
+        return
+    options = params["options"]
+    allowed = _static_options(options)
+    if allowed is None:
+        if isinstance(options, (list, dict)):
+            # Conditional or dynamic ({ref, cases}) options depend on the data.
+            w.line(depth, f"errors.extend(_check_options({field}, {w.const(spec)}, value, ctx))")
+            w.full(depth)
+        return
+
+    listed = w.const(allowed)
+    plain = len(allowed) >= _SET_MIN_OPTIONS and all(
+        type(v) in _SCALARS and v == v for v in allowed
+    )
+    w.line(depth, "for item in (value if isinstance(value, list) else (value,)):")
+    if plain:
+        # For scalars a set lookup answers exactly what the list scan would.
+        as_set = w.const(frozenset(allowed))
+        w.line(depth + 1, f"if not ((item in {as_set}) if type(item) in _SCALARS else (item in {listed})):")
+    else:
+        w.line(depth + 1, f"if item not in {listed}:")
+    w.line(depth + 2, f"append(FieldError({field}, 'not_an_option', {{'value': item, 'allowed': list({listed})}}))")
+    w.full(depth + 2)
+
+
+def _generate_bounds(w: _Writer, field: str, params: Dict[str, Any], depth: int) -> None:
+    minimum = params.get("min")
+    maximum = params.get("max")
+    has_min = isinstance(minimum, (int, float))
+    has_max = isinstance(maximum, (int, float))
+    if not (has_min or has_max):
+        return
+    w.line(depth, "if isinstance(value, (int, float)) and not isinstance(value, bool):")
+    if has_min:
+        bound = w.const(minimum)
+        w.line(depth + 1, f"if value < {bound}:")
+        w.line(depth + 2, f"append(FieldError({field}, 'below_min', {{'min': {bound}}}))")
+        w.full(depth + 2)
+    if has_max:
+        bound = w.const(maximum)
+        w.line(depth + 1, f"if value > {bound}:")
+        w.line(depth + 2, f"append(FieldError({field}, 'above_max', {{'max': {bound}}}))")
+        w.full(depth + 2)
+
+
+def _generate_rule(w: _Writer, field: str, rule: Dict[str, Any], depth: int) -> None:
+    factory = rule_factory(rule.get("name"))
+    if factory is None:
+        return
+    params = _rule_params(rule)
+    if factory is _is_equal_to_value_rule or factory is _is_not_equal_to_value_rule:
+        expected = w.const(params.get("value"))
+        test, code = ("!=", "not_equal_to_value") if factory is _is_equal_to_value_rule else ("==", "equal_to_value")
+        w.line(depth, f"if value {test} {expected}:")
+        w.line(depth + 1, f"append(FieldError({field}, {code!r}, {{'value': {expected}}}))")
+        w.full(depth + 1)
+        return
+    if factory is _is_equal_to_value_from_field_rule:
+        other = w.const(params.get("field"))
+        w.line(depth, f"if value != data.get({other}):")
+        w.line(depth + 1, f"append(FieldError({field}, 'not_equal_to_field', {{'field': {other}}}))")
+        w.full(depth + 1)
+        return
+    check = factory(params)
+    if check is None:
+        return
+    w.line(depth, f"error = {w.const(check)}({field}, value, ctx)")
+    w.line(depth, "if error is not None:")
+    w.line(depth + 1, "append(error)")
+    w.full(depth + 1)
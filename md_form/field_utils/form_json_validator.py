@@ -0,0 +1,291 @@
+"""Validate a submission straight from its JSON text.
+
+Large submissions are mostly embedded tables (e.g. an experiment design with
+thousands of rows). :func:`validate_form_json` reads the JSON incrementally
+instead of loading it whole: ordinary field values are parsed as they come,
+but the columns of table fields are checked one value at a time as they
+stream past and only a :class:`ColumnSummary` of each is kept. Values of keys
+that no field reads are dropped. Peak memory is then roughly one column's
+distinct values rather than the whole payload.
+
+A table field is streamed when its rules are all table rules (plus
+``is_required``) and no other field reads its value; otherwise it is parsed in
+full like any other value.
+"""
+
+import codecs
+import io
+import json
+import re
+from typing import IO, Any, Dict, Optional, Set, Union
+
+from .form_validator import (
+    CompiledForm,
+    FieldError,
+    ValidationResult,
+    _ValidationContext,
+    _field_reads,
+    _normalize_rules,
+    _prepare_form,
+    _rule_params,
+    _validate_field,
+    validate_form,
+)
+from .table_checks import ColumnSummary
+from .when import referenced_properties
+
+JsonSource = Union[bytes, bytearray, memoryview, str, IO[bytes], IO[str]]
+
+# Rules that only need column summaries of a table value.
+_TABLE_RULES = {
+    "has_unique_in_column",
+    "has_unique_column_values_in_table",
+    "is_all_unique_in_column_from_field",
+    "has_multiple_column_values_from_field_in_table",
+}
+
+_CHUNK_SIZE = 64 * 1024
+
+# Characters that may still follow a number up to the end of the buffer.
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*\Z")
+
+
+def validate_form_json(
+    definition: Union[Dict[str, Any], CompiledForm],
+    source: JsonSource,
+    *,
+    chunk_size: int = _CHUNK_SIZE,
+    **kwargs: Any,
+) -> ValidationResult:
+    """Validate a JSON submission read incrementally from ``source``.
+
+    ``source`` is the JSON text as ``bytes``/``str`` or a binary or text
+    stream, read ``chunk_size`` at a time. Keyword arguments are those of
+    :func:`validate_form`, and the result is the same as
+    ``validate_form(definition, json.load(source), ...)``. With ``fail_fast``
+    (or ``max_errors=1``) each field is checked as soon as every value it
+    depends on has been read, and reading stops at the first error found in
+    stream order; the result is then marked ``truncated``.
+
+    Malformed JSON is reported as an ``invalid_json`` error on ``<root>``.
+    """
+    form = _prepare_form(definition)
+    early = bool(kwargs.get("fail_fast")) or kwargs.get("max_errors") == 1
+    reader = _Reader(source, chunk_size)
+    try:
+        data = _read_submission(form, reader, early)
+    except json.JSONDecodeError as exc:
+        data = _Invalid(FieldError("<root>", "invalid_json", {"error": str(exc)}))
+    if isinstance(data, _Invalid):
+        result = ValidationResult([data.error], truncated=data.truncated)
+        return result.raise_if_invalid() if kwargs.get("raise_on_error") else result
+    return validate_form(form, data, **kwargs)
+
+
+class _Invalid:
+    """Why reading stopped before the whole submission could be validated."""
+
+    __slots__ = ("error", "truncated")
+
+    def __init__(self, error: FieldError, truncated: bool = False):
+        self.error = error
+        self.truncated = truncated
+
+
+def _read_submission(form: CompiledForm, reader: "_Reader", early: bool) -> Union[Dict[str, Any], _Invalid]:
+    if reader.peek() != "{":
+        value = reader.value()
+        reader.end()
+        return _Invalid(FieldError("<root>", "invalid_data")) if not isinstance(value, dict) else value
+
+    streamed = _streamed_tables(form)
+    dependents = form.dependents
+    pending = {name: _field_reads(name, spec) for name, spec in form.fields.items()} if early else None
+    data: Dict[str, Any] = {}
+    ctx = _ValidationContext(data, max_errors=1)
+
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.expect("}")
+        reader.end()
+        return data
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            reader.fail("expected a property name")
+        reader.expect(":")
+        if key in streamed and reader.peek() == "{":
+            data[key] = _read_table(reader, streamed[key])
+        elif key in form.fields or key in dependents:
+            data[key] = reader.value()
+        else:
+            reader.value()
+            data[key] = None  # nothing reads it; only its presence matters
+
+        if pending is not None:
+            for name in dependents.get(key, ()):
+                reads = pending.get(name)
+                if reads is None:
+                    continue
+                reads.discard(key)
+                if not reads:
+                    del pending[name]
+                    errors = _validate_field(name, form, ctx)
+                    if errors:
+                        return _Invalid(errors[0], truncated=True)
+
+        if reader.peek() == ",":
+            reader.expect(",")
+            continue
+        reader.expect("}")
+        reader.end()
+        return data
+
+
+def _streamed_tables(form: CompiledForm) -> Dict[str, Optional[Set[Any]]]:
+    """Map each streamable table field to the columns whose duplicates matter.
+
+    ``None`` means every column's duplicates are tracked, since the column is
+    named by another field that may not have been read yet.
+    """
+    tables: Dict[str, Optional[Set[Any]]] = {}
+    for name, spec in form.fields.items():
+        rules = _normalize_rules(spec.get("rules"))
+        names = {rule.get("name") for rule in rules} - {"is_required"}
+        if not names or not names <= _TABLE_RULES:
+            continue
+        params = spec.get("parameters")
+        if isinstance(params, dict) and ({"options", "min", "max"} & params.keys()):
+            continue
+        if form.dependents.get(name) != [name] or name in _when_reads(spec):
+            continue
+        if "is_all_unique_in_column_from_field" in names:
+            tables[name] = None
+        else:
+            tables[name] = {
+                _rule_params(rule).get("column") for rule in rules
+                if rule.get("name") in ("has_unique_in_column", "has_unique_column_values_in_table")
+            }
+    return tables
+
+
+def _when_reads(spec: Dict[str, Any]) -> Set[Any]:
+    return referenced_properties(spec["when"]) if spec.get("when") else set()
+
+
+def _read_table(reader: "_Reader", unique_columns: Optional[Set[Any]]) -> Dict[Any, Any]:
+    """Read a table object, summarising its array columns as they stream."""
+    table: Dict[Any, Any] = {}
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.expect("}")
+        return table
+    while True:
+        column = reader.value()
+        if not isinstance(column, str):
+            reader.fail("expected a property name")
+        reader.expect(":")
+        if reader.peek() == "[":
+            track = unique_columns is None or column in unique_columns
+            table[column] = _read_column(reader, ColumnSummary(track_duplicates=track))
+        else:
+            table[column] = reader.value()
+        if reader.peek() == ",":
+            reader.expect(",")
+            continue
+        reader.expect("}")
+        return table
+
+
+def _read_column(reader: "_Reader", summary: ColumnSummary) -> ColumnSummary:
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.expect("]")
+        return summary.finish()
+    while True:
+        summary.add(reader.value())
+        if reader.peek() == ",":
+            reader.expect(",")
+            continue
+        reader.expect("]")
+        return summary.finish()
+
+
+class _Reader:
+    """JSON tokens and values read incrementally from text, bytes or a stream."""
+
+    _WHITESPACE = " \t\n\r"
+
+    def __init__(self, source: JsonSource, chunk_size: int):
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        elif isinstance(source, str):
+            source = io.StringIO(source)
+        self._read = source.read
+        self._chunk_size = chunk_size
+        self._decoder: Optional[Any] = None
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Read more text, at least doubling what is buffered; ``False`` at EOF."""
+        if self._eof:
+            return False
+        chunk = self._read(max(self._chunk_size, len(self._buffer) - self._pos))
+        if isinstance(chunk, (bytes, bytearray)):
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+            chunk = self._decoder.decode(chunk, final=not chunk)
+        if not chunk:
+            self._eof = True
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return not self._eof
+
+    def peek(self) -> str:
+        """The next non-whitespace character, or ``""`` at the end of input."""
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in self._WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            self.fail(f"expected {char!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Parse and return the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number cut off by the end of the buffer ("1", "0.", "1e") may
+            # continue in the next chunk.
+            if (
+                isinstance(value, (int, float))
+                and _NUMBER_TAIL.match(self._buffer, end)
+                and self._fill()
+            ):
+                continue
+            self._pos = end
+            return value
+
+    def end(self) -> None:
+        if self.peek() != "":
+            self.fail("extra data after the submission")
+
+    def fail(self, message: str) -> None:
+        raise json.JSONDecodeError(message, self._buffer, self._pos)
@@ -23,20 +23,47 @@ runtime, without needing the original Pydantic model. It enforces:
 * ``parameters.options`` membership (static lists and dynamic ``{ref, cases}``),
 * numeric ``parameters.min`` / ``parameters.max`` bounds,
 * the value/cross-field ``rules`` (``is_equal_to_value``, etc.),
-* dataset-selection fields against a supplied ``datasets`` list (see the
-  ``datasets`` argument of :func:`validate_form`).
+* dataset-selection fields against a supplied ``datasets`` list,
+  :class:`DatasetIndex` or :class:`DatasetResolver` (see the ``datasets``
+  argument of :func:`validate_form`).
 
 ``fieldType`` is a frontend widget hint rather than a reliable data type, so it
 is deliberately not used to type-check values. Rules that cannot be checked from
 the data alone are skipped rather than reported, so the validator stays
-forward-compatible with new field/rule kinds.
+forward-compatible with new field/rule kinds. Rules are looked up by name in
+the rule registry, where custom rules can be added with :func:`register_rule`.
+
+A definition that is validated repeatedly can be prepared once with
+:func:`compile_form` and the resulting :class:`CompiledForm` passed in place of
+the dict. A dict passed directly is prepared for that one call only, without
+compiling its ``when`` conditions.
 """
 
+import os
+import sys
+import warnings
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
 
+from .dataset_index import COMPLETED_STATE, DatasetIndex
+from .dataset_resolver import DatasetResolver
+from .rule_registry import RuleCheck, register_rule, rule_factory, rule_message
 from .field_types import FieldType
-from .when import evaluate_when
+from .table_checks import (
+    as_table,
+    column_values,
+    describe_duplicates,
+    duplicate_positions,
+    has_duplicates,
+    has_multiple_values,
+    is_column,
+)
+from .validation_profile import ValidationProfile
+from .when import Predicate, compile_when, evaluate_when, referenced_properties
+
+# This package's directory; warnings are attributed to the first frame outside it.
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
 
 # fieldType of a dataset-selection field (see field_helpers.datasets_field).
 _DATASETS_FIELD_TYPE = FieldType.INTENSITY_INPUT_DATASET.value  # "Datasets"
@@ -45,19 +72,101 @@ _DATASETS_FIELD_TYPE = FieldType.INTENSITY_INPUT_DATASET.value  # "Datasets"
 _BOOLEAN_FIELD_TYPE = FieldType.BOOLEAN.value  # "Boolean"
 
 # Only fully-processed datasets are selectable.
-_COMPLETED_STATE = "COMPLETED"
+_COMPLETED_STATE = COMPLETED_STATE
+
+# The datasets available for selection: a list of dataset dicts, a prebuilt
+# index, or a resolver that looks up just the selected ids.
+Datasets = Union[List[Dict[str, Any]], DatasetIndex, DatasetResolver]
+
+
+def _describe_duplicate_values(params: Dict[str, Any]) -> str:
+    message = f"column {params['column']!r} must contain unique values"
+    duplicates = params.get("duplicates")
+    if duplicates:
+        message += f" (duplicates: {describe_duplicates(dict(duplicates))})"
+    return message
+
+
+# Message template (or renderer) for each error code, formatted with the
+# error's params.
+_MESSAGES: Dict[str, Any] = {
+    "invalid_data": "data must be an object",
+    "invalid_json": "data is not valid JSON ({error})",
+    "unknown_field": "unknown field not present in the form definition",
+    "required": "is required",
+    "not_an_option": "{value!r} is not one of the allowed options {allowed}",
+    "below_min": "must be >= {min}",
+    "above_max": "must be <= {max}",
+    "not_a_table": "must be a table (an object mapping column names to lists)",
+    "table_columns_not_lists": "table columns must be lists",
+    "table_columns_uneven": "table columns must all have the same length",
+    "not_equal_to_value": "must equal {value!r}",
+    "equal_to_value": "must not equal {value!r}",
+    "not_equal_to_field": "must equal the value of {field!r}",
+    "included_in_field_values": "must not be one of the values in {field!r}",
+    "duplicate_values": _describe_duplicate_values,
+    "missing_column": "table has no column {column!r} (named by {path!r})",
+    "single_value_column": "column {column!r} must contain more than one distinct value",
+    "datasets_not_provided": "a datasets list must be provided to validate this field",
+    "dataset_not_found": "dataset {dataset!r} is not in the provided datasets",
+    "dataset_wrong_type": "dataset {dataset!r} must be of type {expected!r}, not {actual!r}",
+    "dataset_not_completed": "dataset {dataset!r} must be in state {expected!r}, not {actual!r}",
+}
 
 
-@dataclass(frozen=True)
 class FieldError:
-    """A single validation failure for one field."""
+    """A single validation failure for one field.
+
+    ``code`` identifies the kind of failure (e.g. ``"required"``,
+    ``"not_an_option"``) and stays stable across releases; ``params`` holds
+    the values involved. The human-readable :attr:`message` is only rendered
+    when asked for. A code with no known template is its own message.
+
+    Errors are hashable, so their attributes are read-only.
+    """
+
+    __slots__ = ("field", "code", "params")
+
+    def __init__(self, field: str, code: str, params: Optional[Dict[str, Any]] = None):
+        object.__setattr__(self, "field", field)
+        object.__setattr__(self, "code", code)
+        object.__setattr__(self, "params", params)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"FieldError is read-only; cannot set {name!r}")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"FieldError is read-only; cannot delete {name!r}")
 
-    field: str
-    message: str
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return FieldError, (self.field, self.code, self.params)
+
+    @property
+    def message(self) -> str:
+        template = _MESSAGES.get(self.code) or rule_message(self.code)
+        if template is None:
+            return self.code
+        if callable(template):
+            return template(self.params or {})
+        return template.format(**self.params) if self.params else template
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"field": self.field, "code": self.code, "params": dict(self.params or {}), "message": self.message}
 
     def __str__(self) -> str:
         return f"{self.field}: {self.message}"
 
+    def __repr__(self) -> str:
+        return f"FieldError({self.field!r}, {self.code!r}, {self.params!r})"
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, FieldError):
+            return NotImplemented
+        return (self.field, self.code, self.params or {}) == (other.field, other.code, other.params or {})
+
+    def __hash__(self) -> int:
+        return hash((self.field, self.code))
+
 
 @dataclass
 class ValidationResult:
@@ -67,9 +176,13 @@ class ValidationResult:
 
         if validate_form(definition, data):
             ...
+
+    ``truncated`` is set when validation stopped at its error budget, so
+    ``errors`` may not list every failure.
     """
 
     errors: List[FieldError] = field(default_factory=list)
+    truncated: bool = False
 
     @property
     def is_valid(self) -> bool:
@@ -78,6 +191,10 @@ class ValidationResult:
     def __bool__(self) -> bool:
         return self.is_valid
 
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """The errors as plain dicts (``field``, ``code``, ``params``, ``message``)."""
+        return [error.to_dict() for error in self.errors]
+
     def raise_if_invalid(self) -> "ValidationResult":
         if self.errors:
             raise FormValidationError(self)
@@ -93,65 +210,319 @@ class FormValidationError(ValueError):
         super().__init__(f"Invalid form data: {joined}")
 
 
+class CompiledForm:
+    """A form definition prepared for repeated validation.
+
+    Each field's ``when`` is compiled once. Fields gated on the same condition
+    share one compiled predicate, so during validation every distinct condition
+    is evaluated at most once per ``data``.
+
+    Each rule is looked up in the rule registry (see :mod:`rule_registry`) and
+    bound to its parameters here, so validating runs the prepared checks
+    without dispatching on rule names. Rules the registry doesn't know are
+    skipped, listed in ``unknown_rules`` and reported with a ``UserWarning``.
+    """
+
+    # How a field's ``when`` becomes the predicate that gates it.
+    _gate = staticmethod(compile_when)
+
+    def __init__(self, definition: Dict[str, Any]):
+        self.fields: Dict[str, Dict[str, Any]] = _get_field_defs(definition)
+        self.gates: Dict[str, Predicate] = {
+            name: self._gate(spec["when"])
+            for name, spec in self.fields.items()
+            if spec.get("when")
+        }
+        self.dataset_fields: List[Tuple[str, Dict[str, Any]]] = [
+            (name, spec) for name, spec in self.fields.items()
+            if spec.get("fieldType") == _DATASETS_FIELD_TYPE
+        ]
+        self.required: Set[str] = set()
+        # field -> [(rule name, check)], looked up in the rule registry once here.
+        self.rule_checks: Dict[str, List[Tuple[Any, RuleCheck]]] = {}
+        # (field, rule name) of each rule the registry doesn't know; these are skipped.
+        self.unknown_rules: List[Tuple[str, Any]] = []
+        for name, spec in self.fields.items():
+            rules = _normalize_rules(spec.get("rules"))
+            if _has_required_rule(rules) or _is_implicitly_required(spec):
+                self.required.add(name)
+            checks = self._compile_rules(name, rules)
+            if checks:
+                self.rule_checks[name] = checks
+        self._dependents: Optional[Dict[str, List[str]]] = None
+        if self.unknown_rules:
+            skipped = ", ".join(f"{rule_name!r} on {name!r}" for name, rule_name in self.unknown_rules)
+            warnings.warn(f"Skipping rules the registry doesn't know: {skipped}", stacklevel=_caller_stacklevel())
+
+    def _compile_rules(self, name: str, rules: List[Dict[str, Any]]) -> List[Tuple[Any, RuleCheck]]:
+        checks: List[Tuple[Any, RuleCheck]] = []
+        for rule in rules:
+            rule_name = rule.get("name")
+            factory = rule_factory(rule_name)
+            if factory is None:
+                self.unknown_rules.append((name, rule_name))
+                continue
+            check = factory(_rule_params(rule))
+            if check is not None:
+                checks.append((rule_name, check))
+        return checks
+
+    @property
+    def dependents(self) -> Dict[str, List[str]]:
+        """Map each data key to the fields whose validation reads it.
+
+        A field reads its own value, the properties in its ``when`` (and in
+        its options' ``when``), the ``ref`` of dynamic options, and the
+        ``field`` (and the field a ``values`` path starts at) of cross-field
+        rules. Fields are listed in definition order.
+        """
+        if self._dependents is None:
+            dependents: Dict[str, List[str]] = {}
+            for name, spec in self.fields.items():
+                for key in _field_reads(name, spec):
+                    dependents.setdefault(key, []).append(name)
+            self._dependents = dependents
+        return self._dependents
+
+
+def _caller_stacklevel() -> int:
+    """The ``stacklevel`` that points a warning raised by the calling function
+    at the first frame outside this package: the user's call site, however
+    deep inside the package the warning was raised."""
+    level = 1
+    frame = sys._getframe(1)
+    while frame.f_back is not None and frame.f_code.co_filename.startswith(_PACKAGE_DIR):
+        frame = frame.f_back
+        level += 1
+    return level
+
+
+def _evaluated_gate(when: Any) -> Predicate:
+    if isinstance(when, dict):
+        return partial(evaluate_when, when)
+    return compile_when(when)
+
+
+class _OneShotForm(CompiledForm):
+    """The form :func:`validate_form` prepares from a definition dict it is
+    given directly. It serves that one call, so each ``when`` is evaluated as
+    it is rather than compiled."""
+
+    _gate = staticmethod(_evaluated_gate)
+
+
+def compile_form(definition: Union[Dict[str, Any], CompiledForm]) -> CompiledForm:
+    """Prepare ``definition`` for repeated validation (a no-op if already compiled)."""
+    if isinstance(definition, CompiledForm):
+        return definition
+    return CompiledForm(definition)
+
+
+def _prepare_form(definition: Union[Dict[str, Any], CompiledForm]) -> CompiledForm:
+    """The form to validate one submission against: ``definition`` itself when
+    compiled, otherwise a :class:`_OneShotForm` of it."""
+    if isinstance(definition, CompiledForm):
+        return definition
+    return _OneShotForm(definition)
+
+
+class _ValidationContext:
+    """Per-call state shared by the checks of one :func:`validate_form` run.
+
+    ``max_errors`` caps how many errors the run collects before it stops.
+    With ``messages=False`` checks skip work that only feeds error messages
+    (such as locating duplicate rows), for callers that only need to know
+    whether the data is valid. ``profile``, when given, receives the timings
+    of the run (see :mod:`validation_profile`).
+    """
+
+    __slots__ = ("data", "max_errors", "messages", "profile", "_gate_results", "_value_sets")
+
+    def __init__(
+        self,
+        data: Dict[str, Any],
+        max_errors: Optional[int] = None,
+        messages: bool = True,
+        profile: Optional[ValidationProfile] = None,
+    ):
+        self.data = data
+        self.max_errors = max_errors
+        self.messages = messages
+        self.profile = profile
+        self._gate_results: Dict[Predicate, bool] = {}
+        self._value_sets: Dict[Tuple[Any, Any], _ValueSet] = {}
+
+    def is_met(self, gate: Predicate) -> bool:
+        """Evaluate a compiled condition, reusing the result for repeated gates."""
+        result = self._gate_results.get(gate)
+        if result is None:
+            result = self._gate_results[gate] = bool(gate(self.data))
+        return result
+
+    def referenced_values(self, field_name: Any, values_key: Any) -> "_ValueSet":
+        """The values held by a referenced field, built once per run and shared
+        by every rule that references the same field and key."""
+        try:
+            key = (field_name, values_key)
+            value_set = self._value_sets.get(key)
+        except TypeError:
+            return _ValueSet(_referenced_values(self.data, field_name, values_key))
+        if value_set is None:
+            value_set = self._value_sets[key] = _ValueSet(_referenced_values(self.data, field_name, values_key))
+        return value_set
+
+    def is_full(self, errors: List["FieldError"]) -> bool:
+        return self.max_errors is not None and len(errors) >= self.max_errors
+
+
 def is_valid_form(definition: Dict[str, Any], data: Dict[str, Any], **kwargs: Any) -> bool:
-    """Convenience wrapper returning just the boolean validity."""
-    return validate_form(definition, data, **kwargs).is_valid
+    """Convenience wrapper returning just the boolean validity.
+
+    Validation stops at the first error.
+    """
+    if kwargs.get("raise_on_error"):
+        # The raised exception carries the full errors, so take the full path.
+        return validate_form(definition, data, **kwargs).is_valid
+    kwargs.pop("raise_on_error", None)
+    kwargs.pop("fail_fast", None)
+    kwargs.pop("max_errors", None)
+    if not isinstance(data, dict):
+        return False
+    form = _prepare_form(definition)
+    if isinstance(kwargs.get("datasets"), DatasetResolver):
+        kwargs["datasets"] = kwargs["datasets"].resolve(_collect_dataset_ids(form, data))
+    errors, _ = _run(form, data, max_errors=1, messages=False, **kwargs)
+    return not errors
 
 
 def validate_form(
-    definition: Dict[str, Any],
+    definition: Union[Dict[str, Any], CompiledForm],
     data: Dict[str, Any],
     *,
-    datasets: Optional[List[Dict[str, Any]]] = None,
+    datasets: Optional[Datasets] = None,
     allow_unknown: bool = True,
     raise_on_error: bool = False,
+    max_errors: Optional[int] = None,
+    fail_fast: bool = False,
+    profile: Optional[ValidationProfile] = None,
 ) -> ValidationResult:
     """Validate ``data`` against a form ``definition`` dict.
 
     Args:
         definition: A form-definition dict. Either the whole translated payload
-            (``{"properties": {...}}``) or the bare properties map.
+            (``{"properties": {...}}``) or the bare properties map. A
+            :class:`CompiledForm` from :func:`compile_form` is also accepted.
         data: The submitted values, keyed by field name.
         datasets: The datasets available for selection, each a dict with at
             least an ``id`` (e.g. ``{"id": ..., "name": ..., "type": ...}``).
             Required whenever the definition contains a dataset-selection field
             (``fieldType == "Datasets"``): the selected ids in ``data`` are
             checked against these. If the form has such a field and ``datasets``
-            is ``None``, that is reported as an error.
+            is ``None``, that is reported as an error. A :class:`DatasetIndex`
+            may be passed instead of the list, to avoid re-indexing a large
+            catalog on every call, or a :class:`DatasetResolver`, which is
+            asked once for just the ids selected in ``data``.
         allow_unknown: When ``False``, keys in ``data`` with no matching field
             in the definition are reported as errors. Defaults to ``True``
             because payloads often carry non-form metadata.
         raise_on_error: When ``True``, raise :class:`FormValidationError`
             instead of returning a result with errors.
+        max_errors: Stop validating once this many errors have been found.
+            The result is then marked ``truncated``.
+        fail_fast: Stop at the first error (the same as ``max_errors=1``).
+        profile: A :class:`ValidationProfile` to add this call's per-field,
+            per-rule and per-check timings to.
 
     Returns:
         A :class:`ValidationResult`. It is truthy when the data is valid.
     """
     if not isinstance(data, dict):
-        result = ValidationResult([FieldError("<root>", "data must be an object")])
+        result = ValidationResult([FieldError("<root>", "invalid_data")])
         return result.raise_if_invalid() if raise_on_error else result
 
-    fields = _get_field_defs(definition)
-    errors: List[FieldError] = []
+    if fail_fast:
+        max_errors = 1 if max_errors is None else min(max_errors, 1)
+    if max_errors is not None and max_errors < 1:
+        raise ValueError("max_errors must be at least 1")
+
+    form = _prepare_form(definition)
+    if isinstance(datasets, DatasetResolver):
+        datasets = datasets.resolve(_collect_dataset_ids(form, data))
+    errors, truncated = _run(
+        form, data,
+        datasets=datasets, allow_unknown=allow_unknown, max_errors=max_errors, profile=profile,
+    )
+    result = ValidationResult(errors, truncated)
+    return result.raise_if_invalid() if raise_on_error else result
+
+
+async def validate_form_async(
+    definition: Union[Dict[str, Any], CompiledForm],
+    data: Dict[str, Any],
+    *,
+    datasets: Optional[Datasets] = None,
+    **kwargs: Any,
+) -> ValidationResult:
+    """Like :func:`validate_form`, awaiting a :class:`DatasetResolver`'s lookup.
+
+    The selected dataset ids are resolved with a single ``aresolve`` call;
+    everything else runs as in :func:`validate_form`, which accepts the same
+    keyword arguments.
+    """
+    form = compile_form(definition)
+    if isinstance(datasets, DatasetResolver) and isinstance(data, dict):
+        datasets = await datasets.aresolve(_collect_dataset_ids(form, data))
+    return validate_form(form, data, datasets=datasets, **kwargs)
 
-    for name, spec in fields.items():
-        errors.extend(_validate_field(name, spec, data))
 
-    errors.extend(_check_datasets(fields, data, datasets))
+def _run(
+    form: CompiledForm,
+    data: Dict[str, Any],
+    *,
+    datasets: Optional[Datasets] = None,
+    allow_unknown: bool = True,
+    max_errors: Optional[int] = None,
+    messages: bool = True,
+    profile: Optional[ValidationProfile] = None,
+) -> Tuple[List[FieldError], bool]:
+    """Collect the errors for ``data``; also report whether the budget cut them short."""
+    fields = form.fields
+    ctx = _ValidationContext(data, max_errors, messages, profile)
+    errors: List[FieldError] = []
+    validate_field = _validate_field
+    if profile is not None:
+        profile.calls += 1
+        validate_field = _validate_field_profiled
+
+    for name in fields:
+        errors.extend(validate_field(name, form, ctx))
+        if ctx.is_full(errors):
+            return errors[:max_errors], True
+
+    if profile is None:
+        errors.extend(_check_datasets(form.dataset_fields, data, datasets, ctx))
+    elif form.dataset_fields:
+        started = profile.clock()
+        errors.extend(_check_datasets(form.dataset_fields, data, datasets, ctx))
+        profile.add(profile.checks, "datasets", profile.clock() - started)
+    if ctx.is_full(errors):
+        return errors[:max_errors], True
 
     if not allow_unknown:
         for key in data:
             if key not in fields:
-                errors.append(FieldError(key, "unknown field not present in the form definition"))
+                errors.append(FieldError(key, "unknown_field"))
+                if ctx.is_full(errors):
+                    return errors, True
 
-    result = ValidationResult(errors)
-    return result.raise_if_invalid() if raise_on_error else result
+    return errors, False
 
 
 def _check_datasets(
-    fields: Dict[str, Any],
+    dataset_fields: List[Tuple[str, Dict[str, Any]]],
     data: Dict[str, Any],
-    datasets: Optional[List[Dict[str, Any]]],
+    datasets: Optional[Datasets],
+    ctx: _ValidationContext,
 ) -> List[FieldError]:
     """Cross-check dataset-selection fields against the available ``datasets``.
 
@@ -162,41 +533,76 @@ def _check_datasets(
       ``COMPLETED`` state.
     """
     errors: List[FieldError] = []
-    dataset_fields = [(n, s) for n, s in fields.items() if s.get("fieldType") == _DATASETS_FIELD_TYPE]
     if not dataset_fields:
         return errors
 
     if datasets is None:
         return [
-            FieldError(name, "a datasets list must be provided to validate this field")
+            FieldError(name, "datasets_not_provided")
             for name, _ in dataset_fields
         ]
 
-    by_id = {d["id"]: d for d in datasets if isinstance(d, dict) and "id" in d}
+    by_id = _datasets_by_id(datasets)
     for name, spec in dataset_fields:
-        value = data.get(name)
-        if value is None:
-            continue
-        params = spec.get("parameters") or {}
-        required_type = params.get("type")
-        for ds_id in _selected_dataset_ids(value):
-            dataset = by_id.get(ds_id)
-            if dataset is None:
-                errors.append(FieldError(name, f"dataset {ds_id!r} is not in the provided datasets"))
-                continue
+        errors.extend(_check_dataset_field(name, spec, data.get(name), by_id, ctx))
+        if ctx.is_full(errors):
+            break
+    return errors
+
+
+def _index_datasets(datasets: Datasets) -> DatasetIndex:
+    return datasets if isinstance(datasets, DatasetIndex) else DatasetIndex(datasets)
+
+
+def _datasets_by_id(datasets: Datasets) -> Union[DatasetIndex, Dict[Any, Dict[str, Any]]]:
+    """Something with ``get(id)`` for the datasets; a plain dict for a one-off list,
+    which is cheaper to build than a full :class:`DatasetIndex`."""
+    if isinstance(datasets, DatasetIndex):
+        return datasets
+    return {d["id"]: d for d in datasets if isinstance(d, dict) and "id" in d}
+
+
+def _check_dataset_field(
+    name: str,
+    spec: Dict[str, Any],
+    value: Any,
+    by_id: Union[DatasetIndex, Dict[Any, Dict[str, Any]]],
+    ctx: _ValidationContext,
+) -> List[FieldError]:
+    """Check the datasets selected in one dataset-selection field."""
+    errors: List[FieldError] = []
+    if value is None:
+        return errors
+    params = spec.get("parameters") or {}
+    required_type = params.get("type")
+    for ds_id in _selected_dataset_ids(value):
+        dataset = by_id.get(ds_id)
+        if dataset is None:
+            errors.append(FieldError(name, "dataset_not_found", {"dataset": ds_id}))
+        else:
             if required_type is not None and dataset.get("type") != required_type:
-                errors.append(FieldError(
-                    name,
-                    f"dataset {ds_id!r} must be of type {required_type!r}, not {dataset.get('type')!r}",
-                ))
+                errors.append(FieldError(name, "dataset_wrong_type", {
+                    "dataset": ds_id, "expected": required_type, "actual": dataset.get("type"),
+                }))
             if dataset.get("state") != _COMPLETED_STATE:
-                errors.append(FieldError(
-                    name,
-                    f"dataset {ds_id!r} must be in state {_COMPLETED_STATE!r}, not {dataset.get('state')!r}",
-                ))
+                errors.append(FieldError(name, "dataset_not_completed", {
+                    "dataset": ds_id, "expected": _COMPLETED_STATE, "actual": dataset.get("state"),
+                }))
+        if ctx.is_full(errors):
+            break
     return errors
 
 
+def _collect_dataset_ids(form: CompiledForm, data: Dict[str, Any]) -> Set[Any]:
+    """The ids selected across every dataset-selection field of ``data``."""
+    ids: Set[Any] = set()
+    for name, _ in form.dataset_fields:
+        value = data.get(name)
+        if value is not None:
+            ids.update(_selected_dataset_ids(value))
+    return ids
+
+
 def _selected_dataset_ids(value: Any) -> List[Any]:
     """Extract the selected dataset ids from a field value.
 
@@ -228,34 +634,114 @@ def _get_field_defs(definition: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def _field_reads(name: str, spec: Dict[str, Any]) -> Set[Any]:
+    """The data keys that validating field ``name`` depends on."""
+    reads: Set[Any] = {name}
+    when = spec.get("when")
+    if when:
+        reads |= referenced_properties(when)
+
+    params = spec.get("parameters")
+    options = params.get("options") if isinstance(params, dict) else None
+    if isinstance(options, dict) and isinstance(options.get("ref"), str):
+        reads.add(options["ref"])
+        cases = options.get("cases")
+        option_lists = list(cases.values()) if isinstance(cases, dict) else []
+    else:
+        option_lists = [options]
+    for option_list in option_lists:
+        if not isinstance(option_list, list):
+            continue
+        for opt in option_list:
+            if isinstance(opt, dict) and opt.get("when"):
+                reads |= referenced_properties(opt["when"])
+
+    for rule in _normalize_rules(spec.get("rules")):
+        params = _rule_params(rule)
+        other = params.get("field")
+        if isinstance(other, str):
+            reads.add(other)
+        path_field = _path_field(params.get("values"))
+        if path_field is not None:
+            reads.add(path_field)
+    return reads
+
+
 def _is_absent(value: Any) -> bool:
     return value is None
 
 
-def _validate_field(name: str, spec: Dict[str, Any], data: Dict[str, Any]) -> List[FieldError]:
-    when = spec.get("when")
+def _validate_field(name: str, form: CompiledForm, ctx: _ValidationContext) -> List[FieldError]:
     # A field gated by an unmet `when` is inactive: skip every check for it.
-    if when and not evaluate_when(when, data):
+    gate = form.gates.get(name)
+    if gate is not None and not ctx.is_met(gate):
         return []
 
-    rules = _normalize_rules(spec.get("rules"))
-    present = name in data and not _is_absent(data.get(name))
-
-    if not present:
-        if _has_required_rule(rules) or _is_implicitly_required(spec):
-            return [FieldError(name, "is required")]
-        return []
+    data = ctx.data
+    if name not in data or _is_absent(data.get(name)):
+        return [FieldError(name, "required")] if name in form.required else []
 
+    spec = form.fields[name]
     value = data[name]
     errors: List[FieldError] = []
 
-    errors.extend(_check_options(name, spec, value, data))
-    errors.extend(_check_bounds(name, spec, value))
-    for rule in rules:
-        err = _check_rule(name, rule, value, data)
+    errors.extend(_check_options(name, spec, value, ctx))
+    if ctx.is_full(errors):
+        return errors
+    errors.extend(_check_bounds(name, spec, value, ctx))
+    for _, check in form.rule_checks.get(name, ()):
+        if ctx.is_full(errors):
+            break
+        err = check(name, value, ctx)
+        if err is not None:
+            errors.append(err)
+
+    return errors
+
+
+def _validate_field_profiled(name: str, form: CompiledForm, ctx: _ValidationContext) -> List[FieldError]:
+    """:func:`_validate_field`, timing each step into ``ctx.profile``."""
+    profile = ctx.profile
+    clock = profile.clock
+    started = clock()
+    errors: List[FieldError] = []
+
+    gate = form.gates.get(name)
+    if gate is not None:
+        gate_started = clock()
+        met = ctx.is_met(gate)
+        profile.add(profile.checks, "gate", clock() - gate_started)
+        if not met:
+            profile.add(profile.fields, name, clock() - started)
+            return errors
+
+    data = ctx.data
+    if name not in data or _is_absent(data.get(name)):
+        if name in form.required:
+            errors.append(FieldError(name, "required"))
+        profile.add(profile.fields, name, clock() - started)
+        return errors
+
+    spec = form.fields[name]
+    value = data[name]
+    for kind, check in (("options", _check_options), ("bounds", _check_bounds)):
+        if ctx.is_full(errors):
+            break
+        check_started = clock()
+        errors.extend(check(name, spec, value, ctx))
+        profile.add(profile.checks, kind, clock() - check_started)
+    for rule_name, rule_check in form.rule_checks.get(name, ()):
+        if ctx.is_full(errors):
+            break
+        rule_started = clock()
+        err = rule_check(name, value, ctx)
+        elapsed = clock() - rule_started
+        profile.add(profile.checks, "rule", elapsed)
+        profile.add(profile.rules, rule_name, elapsed)
         if err is not None:
             errors.append(err)
 
+    profile.add(profile.fields, name, clock() - started)
     return errors
 
 
@@ -295,26 +781,26 @@ def _is_implicitly_required(spec: Dict[str, Any]) -> bool:
     return isinstance(params, dict) and "options" in params
 
 
-def _allowed_option_values(options: Any, data: Dict[str, Any]) -> Optional[List[Any]]:
+def _allowed_option_values(options: Any, ctx: _ValidationContext) -> Optional[List[Any]]:
     """Resolve the set of currently-selectable option values.
 
     Returns ``None`` when membership cannot be determined statically (e.g. a
     dynamic ``{ref, cases}`` whose controlling field value has no matching case).
     """
     if isinstance(options, list):
-        return _values_from_option_list(options, data)
+        return _values_from_option_list(options, ctx)
     if isinstance(options, dict):
         ref = options.get("ref")
         cases = options.get("cases")
         if isinstance(cases, dict) and isinstance(ref, str):
-            case = cases.get(data.get(ref))
+            case = cases.get(ctx.data.get(ref))
             if isinstance(case, list):
-                return _values_from_option_list(case, data)
+                return _values_from_option_list(case, ctx)
         return None
     return None
 
 
-def _values_from_option_list(options: List[Any], data: Dict[str, Any]) -> List[Any]:
+def _values_from_option_list(options: List[Any], ctx: _ValidationContext) -> List[Any]:
     allowed: List[Any] = []
     for opt in options:
         # Translated payloads use {name, value} dicts, but tolerate raw scalars too.
@@ -322,17 +808,17 @@ def _values_from_option_list(options: List[Any], data: Dict[str, Any]) -> List[A
             allowed.append(opt)
             continue
         opt_when = opt.get("when")
-        if opt_when and not evaluate_when(opt_when, data):
+        if opt_when and not ctx.is_met(compile_when(opt_when)):
             continue
         allowed.append(opt.get("value"))
     return allowed
 
 
-def _check_options(name: str, spec: Dict[str, Any], value: Any, data: Dict[str, Any]) -> List[FieldError]:
+def _check_options(name: str, spec: Dict[str, Any], value: Any, ctx: _ValidationContext) -> List[FieldError]:
     params = spec.get("parameters")
     if not isinstance(params, dict) or "options" not in params:
         return []
-    allowed = _allowed_option_values(params["options"], data)
+    allowed = _allowed_option_values(params["options"], ctx)
     if allowed is None:
         return []
 
@@ -340,13 +826,13 @@ def _check_options(name: str, spec: Dict[str, Any], value: Any, data: Dict[str,
     errors: List[FieldError] = []
     for item in selected:
         if item not in allowed:
-            errors.append(
-                FieldError(name, f"{item!r} is not one of the allowed options {allowed}")
-            )
+            errors.append(FieldError(name, "not_an_option", {"value": item, "allowed": allowed}))
+            if ctx.is_full(errors):
+                break
     return errors
 
 
-def _check_bounds(name: str, spec: Dict[str, Any], value: Any) -> List[FieldError]:
+def _check_bounds(name: str, spec: Dict[str, Any], value: Any, ctx: _ValidationContext) -> List[FieldError]:
     params = spec.get("parameters")
     if not isinstance(params, dict):
         return []
@@ -356,21 +842,25 @@ def _check_bounds(name: str, spec: Dict[str, Any], value: Any) -> List[FieldErro
     minimum = params.get("min")
     maximum = params.get("max")
     if isinstance(minimum, (int, float)) and value < minimum:
-        errors.append(FieldError(name, f"must be >= {minimum}"))
+        errors.append(FieldError(name, "below_min", {"min": minimum}))
     if isinstance(maximum, (int, float)) and value > maximum:
-        errors.append(FieldError(name, f"must be <= {maximum}"))
+        errors.append(FieldError(name, "above_max", {"max": maximum}))
     return errors
 
 
-def _check_table_shape(name: str, value: Any) -> Optional[FieldError]:
-    """Ensure a value is a table: an object mapping columns to equal-length lists."""
-    if not isinstance(value, dict):
-        return FieldError(name, "must be a table (an object mapping column names to lists)")
-    columns = [col for col in value.values() if isinstance(col, list)]
-    if len(columns) != len(value):
-        return FieldError(name, "table columns must be lists")
+def _check_table_shape(name: str, table: Optional[Mapping[Any, Any]]) -> Optional[FieldError]:
+    """Ensure a value is a table: an object mapping columns to equal-length lists.
+
+    ``table`` is the value as returned by :func:`as_table`, so columnar values
+    (a ``DataFrame``, or a dict of arrays) are accepted too.
+    """
+    if table is None:
+        return FieldError(name, "not_a_table")
+    columns = [col for col in table.values() if is_column(col)]
+    if len(columns) != len(table):
+        return FieldError(name, "table_columns_not_lists")
     if len({len(col) for col in columns}) > 1:
-        return FieldError(name, "table columns must all have the same length")
+        return FieldError(name, "table_columns_uneven")
     return None
 
 
@@ -379,8 +869,47 @@ def _rule_params(rule: Dict[str, Any]) -> Dict[str, Any]:
     return params if isinstance(params, dict) else {}
 
 
+class _ValueSet:
+    """Membership over a referenced field's values: a hash set, plus a list
+    scanned with ``==`` for the values that can't be hashed.
+
+    Answers ``value in values`` exactly as the equivalent list would.
+    """
+
+    __slots__ = ("_hashable", "_unhashable")
+
+    def __init__(self, values: Iterable[Any]):
+        self._hashable: Set[Any] = set()
+        self._unhashable: List[Any] = []
+        for value in values:
+            try:
+                self._hashable.add(value)
+            except TypeError:
+                self._unhashable.append(value)
+
+    def __contains__(self, value: Any) -> bool:
+        try:
+            if value in self._hashable:
+                return True
+        except TypeError:
+            # An unhashable value can still compare equal to a hashable one.
+            if any(value == candidate for candidate in self._hashable):
+                return True
+        return any(value is candidate or value == candidate for candidate in self._unhashable)
+
+
 def _referenced_values(data: Dict[str, Any], field_name: Any, values_key: Any) -> List[Any]:
-    """Collect the comparable values held by a referenced field."""
+    """Collect the comparable values held by a referenced field.
+
+    ``values_key`` names the key (or table column) to read from the field's
+    items, either bare (``"column"``) or as a path from the field
+    (``"control_variables[].column"``).
+    """
+    if isinstance(values_key, str) and isinstance(field_name, str):
+        for prefix in (field_name + "[].", field_name + "."):
+            if values_key.startswith(prefix):
+                values_key = values_key[len(prefix):]
+                break
     referenced = data.get(field_name)
     if isinstance(referenced, list):
         if values_key is not None:
@@ -390,51 +919,167 @@ def _referenced_values(data: Dict[str, Any], field_name: Any, values_key: Any) -
                 if isinstance(item, dict) and values_key in item
             ]
         return list(referenced)
-    if isinstance(referenced, dict) and values_key is not None and values_key in referenced:
-        col = referenced[values_key]
-        return list(col) if isinstance(col, list) else [col]
+    table = as_table(referenced)
+    if table is not None and values_key is not None and values_key in table:
+        col = table[values_key]
+        return list(column_values(col)) if is_column(col) else [col]
     return []
 
 
-def _check_rule(name: str, rule: Dict[str, Any], value: Any, data: Dict[str, Any]) -> Optional[FieldError]:
-    rule_name = rule.get("name")
-    params = _rule_params(rule)
+def _path_field(path: Any) -> Optional[str]:
+    """The field a ``values`` path such as ``"control_variables[].column"`` starts at."""
+    if not isinstance(path, str):
+        return None
+    head = path.partition(".")[0]
+    return head[:-2] if head.endswith("[]") else head
+
+
+def _values_at_path(data: Dict[str, Any], path: Any) -> List[Any]:
+    """Resolve a rule's ``values`` path against ``data``.
+
+    ``"field"`` is the field's value (each item, if it is a list), and
+    ``"field[].key"`` or ``"field.key"`` is ``key`` of each dict among them.
+    """
+    head = _path_field(path)
+    if head is None:
+        return []
+    value = data.get(head)
+    if value is None:
+        return []
+    items = value if isinstance(value, list) else [value]
+    key = path.partition(".")[2]
+    if key:
+        return [item[key] for item in items if isinstance(item, dict) and key in item]
+    return items
+
+
+def _column_names_from_path(data: Dict[str, Any], path: Any) -> List[Any]:
+    """The distinct column names a ``values`` path selects, in order."""
+    names: Dict[Any, None] = {}
+    for item in _values_at_path(data, path):
+        try:
+            if item is not None:
+                names.setdefault(item, None)
+        except TypeError:
+            continue  # not usable as a column name
+    return list(names)
+
+
+def _check_unique_column(name: str, column: Any, col: Any, ctx: _ValidationContext) -> Optional[FieldError]:
+    if not ctx.messages:
+        return FieldError(name, "duplicate_values", {"column": column}) if has_duplicates(col) else None
+    duplicates = duplicate_positions(col)
+    if duplicates:
+        return FieldError(name, "duplicate_values", {"column": column, "duplicates": list(duplicates.items())})
+    return None
+
+
+# Built-in rules. Each factory runs once per rule when a form is compiled and
+# returns the check bound to that rule's parameters (see rule_registry).
+
+
+def _is_required_rule(params: Dict[str, Any]) -> None:
+    # Presence is checked by _validate_field; there is no per-value check.
+    return None
+
+
+def _is_equal_to_value_rule(params: Dict[str, Any]) -> RuleCheck:
+    expected = params.get("value")
 
-    if rule_name == "is_equal_to_value":
-        if value != params.get("value"):
-            return FieldError(name, f"must equal {params.get('value')!r}")
+    def check(name: str, value: Any, ctx: _ValidationContext) -> Optional[FieldError]:
+        if value != expected:
+            return FieldError(name, "not_equal_to_value", {"value": expected})
         return None
+    return check
+
+
+def _is_not_equal_to_value_rule(params: Dict[str, Any]) -> RuleCheck:
+    expected = params.get("value")
 
-    if rule_name == "is_not_equal_to_value":
-        if value == params.get("value"):
-            return FieldError(name, f"must not equal {params.get('value')!r}")
+    def check(name: str, value: Any, ctx: _ValidationContext) -> Optional[FieldError]:
+        if value == expected:
+            return FieldError(name, "equal_to_value", {"value": expected})
         return None
+    return check
 
-    if rule_name == "is_equal_to_value_from_field":
-        other = params.get("field")
-        if value != data.get(other):
-            return FieldError(name, f"must equal the value of {other!r}")
+
+def _is_equal_to_value_from_field_rule(params: Dict[str, Any]) -> RuleCheck:
+    other = params.get("field")
+
+    def check(name: str, value: Any, ctx: _ValidationContext) -> Optional[FieldError]:
+        if value != ctx.data.get(other):
+            return FieldError(name, "not_equal_to_field", {"field": other})
         return None
+    return check
 
-    if rule_name == "is_not_included_in_values_from_field":
-        other = params.get("field")
-        candidates = _referenced_values(data, other, params.get("values"))
-        if value in candidates:
-            return FieldError(name, f"must not be one of the values in {other!r}")
+
+def _is_not_included_in_values_from_field_rule(params: Dict[str, Any]) -> RuleCheck:
+    other = params.get("field")
+    values_key = params.get("values")
+
+    def check(name: str, value: Any, ctx: _ValidationContext) -> Optional[FieldError]:
+        if value in ctx.referenced_values(other, values_key):
+            return FieldError(name, "included_in_field_values", {"field": other})
         return None
+    return check
+
+
+def _unique_column_rule(params: Dict[str, Any]) -> RuleCheck:
+    column = params.get("column")
 
-    if rule_name in ("has_unique_in_column", "has_unique_column_values_in_table"):
-        column = params.get("column")
+    def check(name: str, value: Any, ctx: _ValidationContext) -> Optional[FieldError]:
         # These rules operate on a table: an object mapping column names to
         # equal-length value lists. A value that isn't that shape can't satisfy
         # the rule, so report the shape failure.
-        shape_error = _check_table_shape(name, value)
+        table = as_table(value)
+        shape_error = _check_table_shape(name, table)
         if shape_error is not None:
             return shape_error
-        col = value.get(column)
-        if isinstance(col, list) and len(col) != len(set(col)):
-            return FieldError(name, f"column {column!r} must contain unique values")
-        return None
-
-    # is_required is handled by presence logic; unknown/opaque rules are skipped.
+        col = table.get(column)
+        if not is_column(col):
+            return None
+        return _check_unique_column(name, column, column_values(col), ctx)
+    return check
+
+
+def _columns_from_field_rule(check_column: Callable[[str, Any, Any, _ValidationContext], Optional[FieldError]]):
+    """A factory for rules on the table columns named by another field's value(s),
+    e.g. ``condition_column`` or each ``control_variables[].column``."""
+    def factory(params: Dict[str, Any]) -> RuleCheck:
+        path = params.get("values")
+
+        def check(name: str, value: Any, ctx: _ValidationContext) -> Optional[FieldError]:
+            columns = _column_names_from_path(ctx.data, path)
+            if not columns:
+                return None
+            table = as_table(value)
+            shape_error = _check_table_shape(name, table)
+            if shape_error is not None:
+                return shape_error
+            for column in columns:
+                col = table.get(column)
+                if not is_column(col):
+                    return FieldError(name, "missing_column", {"column": column, "path": path})
+                err = check_column(name, column, column_values(col), ctx)
+                if err is not None:
+                    return err
+            return None
+        return check
+    return factory
+
+
+def _check_multiple_values(name: str, column: Any, col: Any, ctx: _ValidationContext) -> Optional[FieldError]:
+    if not has_multiple_values(col):
+        return FieldError(name, "single_value_column", {"column": column})
     return None
+
+
+register_rule("is_required", _is_required_rule)
+register_rule("is_equal_to_value", _is_equal_to_value_rule)
+register_rule("is_not_equal_to_value", _is_not_equal_to_value_rule)
+register_rule("is_equal_to_value_from_field", _is_equal_to_value_from_field_rule)
+register_rule("is_not_included_in_values_from_field", _is_not_included_in_values_from_field_rule)
+register_rule("has_unique_in_column", _unique_column_rule)
+register_rule("has_unique_column_values_in_table", _unique_column_rule)
+register_rule("is_all_unique_in_column_from_field", _columns_from_field_rule(_check_unique_column))
+register_rule("has_multiple_column_values_from_field_in_table", _columns_from_field_rule(_check_multiple_values))
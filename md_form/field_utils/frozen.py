@@ -0,0 +1,103 @@
+"""Read-only dicts and lists for JSON-like data shared between callers.
+
+Condition and rule nodes compute their dict form once and hand the same
+object to every caller; these containers make that safe by refusing in-place
+changes. They compare equal to, and serialize like, plain dicts and lists, and
+``copy``/``deepcopy``/``pickle`` produce plain (mutable) containers, so code
+that copies a schema before editing it keeps working.
+"""
+
+import copy
+from typing import Any, Dict, List, NoReturn
+
+
+def _read_only(self: Any, *args: Any, **kwargs: Any) -> NoReturn:
+    raise TypeError(f"{type(self).__name__} is read-only")
+
+
+class FrozenDict(dict):
+    """A ``dict`` that cannot be modified in place."""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+    __ior__ = _read_only
+
+    def __copy__(self) -> Dict[Any, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Dict[Any, Any]:
+        return {copy.deepcopy(k, memo): copy.deepcopy(v, memo) for k, v in self.items()}
+
+    def __reduce__(self) -> Any:
+        return dict, (dict(self),)
+
+
+class FrozenList(list):
+    """A ``list`` that cannot be modified in place."""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = _read_only
+    append = extend = insert = pop = remove = reverse = sort = clear = _read_only
+    __iadd__ = __imul__ = _read_only
+
+    def __copy__(self) -> List[Any]:
+        return list(self)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> List[Any]:
+        return [copy.deepcopy(v, memo) for v in self]
+
+    def __reduce__(self) -> Any:
+        return list, (list(self),)
+
+
+def freeze(value: Any) -> Any:
+    """A read-only copy of ``value``: nested dicts and lists become frozen.
+
+    Other values (including tuples, whose items are frozen) are kept as they are.
+    """
+    if isinstance(value, dict):
+        return value if _is_frozen(value) else FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return value if _is_frozen(value) else FrozenList(freeze(v) for v in value)
+    if isinstance(value, tuple) and type(value) is tuple:
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """A plain, mutable copy of ``value``: nested dicts and lists are copied.
+
+    A cheaper ``deepcopy`` for JSON-like data, such as a cached frozen schema.
+    """
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [thaw(v) for v in value]
+    if isinstance(value, tuple) and type(value) is tuple:
+        return tuple(thaw(v) for v in value)
+    return value
+
+
+def _is_frozen(value: Any) -> bool:
+    # Frozen containers are only ever built by freeze(), so their items are frozen too.
+    return isinstance(value, (FrozenDict, FrozenList))
+
+
+def exact_key(value: Any) -> Any:
+    """A hashable key for ``value`` that is equal only for equal values of equal types.
+
+    ``1``, ``1.0`` and ``True`` compare equal, but interning an object built
+    from one as another would change its dict form. Raises ``TypeError`` for
+    values that can't be keyed.
+    """
+    if isinstance(value, dict):
+        return (dict, frozenset((exact_key(k), exact_key(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__mro__[-2], tuple(exact_key(v) for v in value))
+    if isinstance(value, (set, frozenset)):
+        return (frozenset, frozenset(exact_key(v) for v in value))
+    hash(value)
+    return (type(value), value)
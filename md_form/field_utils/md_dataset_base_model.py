@@ -1,11 +1,34 @@
+import json
+import weakref
 from itertools import count
+from typing import Any, Dict, Optional, Tuple, Union
 
 from pydantic import BaseModel
+from pydantic.json_schema import DEFAULT_REF_TEMPLATE, GenerateJsonSchema, JsonSchemaMode
+
+from .frozen import freeze, thaw
+
+# Generated JSON schemas per class, keyed by the model_json_schema arguments
+# (mode included) and stored read-only. Cleared whenever any model is rebuilt,
+# since a rebuild can change the schema of every model that embeds it.
+_SCHEMAS: "weakref.WeakKeyDictionary[type, Dict[Any, Dict[str, Any]]]" = weakref.WeakKeyDictionary()
+
+# Translated form definitions per class: the read-only dict and, once asked
+# for, its JSON encoding. Cleared together with _SCHEMAS.
+_FORMS: "weakref.WeakKeyDictionary[type, Tuple[Dict[str, Any], Optional[bytes]]]" = weakref.WeakKeyDictionary()
+
+# Where translate_payload expects the params model, as Prefect lays it out.
+_DEFINITIONS_REF_TEMPLATE = "#/definitions/{model}"
 
 
 class MdDatasetBaseModel(BaseModel):
     @classmethod
     def __get_pydantic_json_schema__(cls, schema, handler):
+        # Not cached: this also runs when the model is embedded in another
+        # model's schema (Prefect's create_v2_schema wraps the params model with
+        # create_model and TypeAdapter(...).json_schema()), and there handler()
+        # writes the model's definitions into that generator. Numbering the
+        # fields is a small share of the time; the rest is pydantic's.
         json_schema = handler(schema)
         json_schema = handler.resolve_ref_schema(json_schema)
         counter = count()
@@ -32,3 +55,109 @@ class MdDatasetBaseModel(BaseModel):
                     number(sub_schema)
 
         return json_schema
+
+    @classmethod
+    def model_json_schema(
+        cls,
+        by_alias: bool = True,
+        ref_template: str = DEFAULT_REF_TEMPLATE,
+        schema_generator: type = GenerateJsonSchema,
+        mode: JsonSchemaMode = "validation",
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        """``BaseModel.model_json_schema``, generated once per class and set of arguments.
+
+        Returns a fresh copy of the cached schema, which callers may modify.
+        """
+        return thaw(cls._frozen_json_schema(by_alias, ref_template, schema_generator, mode, **kwargs))
+
+    @classmethod
+    def _frozen_json_schema(
+        cls,
+        by_alias: bool = True,
+        ref_template: str = DEFAULT_REF_TEMPLATE,
+        schema_generator: type = GenerateJsonSchema,
+        mode: JsonSchemaMode = "validation",
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        # The cached, read-only schema itself; see model_json_schema.
+        key: Optional[Any] = (by_alias, ref_template, schema_generator, mode, tuple(sorted(kwargs.items())))
+        schemas = _SCHEMAS.get(cls)
+        try:
+            cached = schemas.get(key) if schemas is not None else None
+        except TypeError:
+            key = cached = None
+        if cached is not None:
+            return cached
+
+        json_schema = freeze(super().model_json_schema(
+            by_alias=by_alias, ref_template=ref_template, schema_generator=schema_generator, mode=mode, **kwargs,
+        ))
+        # A model with unresolved forward references is only complete once it
+        # has been rebuilt; don't keep a schema generated before then.
+        if key is not None and cls.__pydantic_complete__:
+            _SCHEMAS.setdefault(cls, {})[key] = json_schema
+        return json_schema
+
+    @classmethod
+    def form_definition(cls, *, as_json: bool = False) -> Union[Dict[str, Any], bytes]:
+        """The form served for this params model: ``translate_payload`` of its schema.
+
+        Computed once per class and returned read-only; copy it before editing.
+        With ``as_json=True``, returns the same form as UTF-8 JSON bytes, encoded
+        once and reused.
+        """
+        cached = _FORMS.get(cls)
+        if cached is None:
+            cached = (freeze(cls._translate_form()), None)
+            if cls.__pydantic_complete__:
+                _FORMS[cls] = cached
+        form, encoded = cached
+        if not as_json:
+            return form
+        if encoded is None:
+            encoded = json.dumps(form, separators=(",", ":")).encode("utf-8")
+            if cls in _FORMS:
+                _FORMS[cls] = (form, encoded)
+        return encoded
+
+    @classmethod
+    def _translate_form(cls) -> Dict[str, Any]:
+        # Imported here: md_form imports field_utils on its own import.
+        from md_form.translate_payload import translate_payload
+
+        schema = thaw(cls._frozen_json_schema(ref_template=_DEFINITIONS_REF_TEMPLATE))
+        definitions = schema.pop("$defs", {})
+        definitions[cls.__name__] = schema
+        return translate_payload({
+            "properties": {
+                "params": {
+                    "$ref": _DEFINITIONS_REF_TEMPLATE.format(model=cls.__name__),
+                    "position": 0,
+                    "title": "params",
+                },
+            },
+            "required": ["params"],
+            "definitions": definitions,
+        })
+
+    @classmethod
+    def model_rebuild(
+        cls,
+        *,
+        force: bool = False,
+        raise_errors: bool = True,
+        _parent_namespace_depth: int = 2,
+        _types_namespace: Any = None,
+    ) -> Optional[bool]:
+        try:
+            # One more frame to skip to reach the caller's namespace.
+            return super().model_rebuild(
+                force=force,
+                raise_errors=raise_errors,
+                _parent_namespace_depth=_parent_namespace_depth + 1,
+                _types_namespace=_types_namespace,
+            )
+        finally:
+            _SCHEMAS.clear()
+            _FORMS.clear()
@@ -0,0 +1,54 @@
+"""Production mode: skip typeguard's runtime type checks.
+
+The field helpers, ``field_builder`` and the rule builders are decorated with
+:func:`typechecked`, which checks their arguments with ``typeguard`` in
+development and tests. Instrumenting a function with typeguard recompiles it,
+and every checked call inspects its arguments, which makes importing modules
+that declare hundreds of fields slow. In production mode the decorated
+functions run unchecked.
+
+Production mode is on when the ``MD_FORM_PRODUCTION`` environment variable is
+set to ``1``, ``true``, ``yes`` or ``on`` when ``md_form`` is first imported, or
+after :func:`set_production_mode` is called. When it is on at import time the
+decorated functions are left exactly as written and ``typeguard`` is not even
+imported; otherwise instrumentation is deferred to a function's first checked
+call, so switching production mode on later still skips it.
+"""
+
+import functools
+import os
+from typing import Any, Callable, List, TypeVar
+
+PRODUCTION_ENV_VAR = "MD_FORM_PRODUCTION"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_PRODUCTION = [os.environ.get(PRODUCTION_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")]
+
+
+def set_production_mode(enabled: bool = True) -> None:
+    """Turn production mode (no runtime type checks) on or off."""
+    _PRODUCTION[0] = bool(enabled)
+
+
+def is_production_mode() -> bool:
+    """Whether decorated functions currently skip their type checks."""
+    return _PRODUCTION[0]
+
+
+def typechecked(func: F) -> F:
+    """``typeguard.typechecked``, unless in production mode (see the module docs)."""
+    if _PRODUCTION[0]:
+        return func
+    instrumented: List[Callable[..., Any]] = []
+
+    @functools.wraps(func)
+    def checked(*args: Any, **kwargs: Any) -> Any:
+        if _PRODUCTION[0]:
+            return func(*args, **kwargs)
+        if not instrumented:
+            from typeguard import typechecked as instrument
+
+            instrumented.append(instrument(func))
+        return instrumented[0](*args, **kwargs)
+    return checked  # type: ignore[return-value]
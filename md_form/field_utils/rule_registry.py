@@ -0,0 +1,109 @@
+"""The rules :func:`validate_form` can check, by name.
+
+Each rule name maps to a *check factory*. When a form is compiled (see
+:func:`compile_form`) the factory is called once for every occurrence of the
+rule, with that rule's ``parameters``, and returns the check to run for the
+field: ``check(field_name, value, ctx)`` returning a :class:`FieldError` or
+``None``. Validation then calls the prepared checks directly, so a rule
+registered here runs exactly like the built-in ones.
+
+A factory may return ``None`` when the rule needs no per-value check (as
+``is_required`` does; presence is handled by the validator). Rules whose
+name is not registered are skipped, keeping the validator forward-compatible
+with rule kinds it doesn't know yet. Compiling a form that uses such rules
+emits a ``UserWarning`` naming them; they are also listed in
+:attr:`CompiledForm.unknown_rules`.
+
+Example, checking entity ids against a catalog::
+
+    @register_rule("is_known_entity", messages={"unknown_entity": "{entity!r} is not a known entity"})
+    def is_known_entity(params):
+        catalog = load_entity_ids(params["catalog"])
+
+        def check(name, value, ctx):
+            if value not in catalog:
+                return FieldError(name, "unknown_entity", {"entity": value})
+            return None
+        return check
+
+The registry is read when a form is compiled: forms compiled before a rule is
+(re)registered keep the checks they were built with.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+# check(field_name, value, ctx) -> FieldError or None
+RuleCheck = Callable[[str, Any, Any], Any]
+# factory(parameters) -> RuleCheck, or None if there is nothing to check
+RuleFactory = Callable[[Dict[str, Any]], Optional[RuleCheck]]
+
+_FACTORIES: Dict[str, RuleFactory] = {}
+
+# Message templates for the error codes of registered rules.
+_MESSAGES: Dict[str, Any] = {}
+
+# Bumped on every (un)registration, so caches of compiled checks can tell
+# when they are stale.
+_VERSION = [0]
+
+
+def register_rule(
+    name: str,
+    factory: Optional[RuleFactory] = None,
+    *,
+    messages: Optional[Dict[str, Any]] = None,
+    replace: bool = False,
+) -> Any:
+    """Register ``factory`` as the check factory of rule ``name``.
+
+    Usable directly or as a decorator. ``messages`` maps the error codes the
+    rule's checks report to their message templates (formatted with the
+    error's params, or callables taking them). Registering a name twice is an
+    error unless ``replace`` is set.
+    """
+    def decorate(factory: RuleFactory) -> RuleFactory:
+        if name in _FACTORIES and not replace:
+            raise ValueError(f"rule {name!r} is already registered")
+        _FACTORIES[name] = factory
+        _VERSION[0] += 1
+        if messages:
+            _MESSAGES.update(messages)
+        return factory
+
+    if factory is None:
+        return decorate
+    return decorate(factory)
+
+
+def unregister_rule(name: str) -> None:
+    """Remove rule ``name`` (a no-op if it is not registered)."""
+    if _FACTORIES.pop(name, None) is not None:
+        _VERSION[0] += 1
+
+
+def rule_factory(name: Any) -> Optional[RuleFactory]:
+    """The check factory registered for ``name``, or ``None``."""
+    try:
+        return _FACTORIES.get(name)
+    except TypeError:
+        return None
+
+
+def registered_rules() -> List[str]:
+    """The names of every registered rule."""
+    return list(_FACTORIES)
+
+
+def register_messages(messages: Dict[str, Any]) -> None:
+    """Add message templates for error codes that aren't reported by a rule."""
+    _MESSAGES.update(messages)
+
+
+def rule_message(code: str) -> Any:
+    """The message template registered for error ``code``, or ``None``."""
+    return _MESSAGES.get(code)
+
+
+def registry_version() -> int:
+    """A counter that changes whenever a rule is registered or removed."""
+    return _VERSION[0]
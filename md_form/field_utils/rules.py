@@ -1,17 +1,94 @@
-from typing import Any, Dict, Union, Literal, Optional
+import weakref
+from typing import Any, Dict, Union, Literal, Optional, Tuple
+
+from .frozen import exact_key, freeze
 
 class Rule:
     """Base class for validation rules"""
+    __slots__ = ()
+
     def as_dict(self) -> Dict[str, Any]:
         raise NotImplementedError
 
-class EqualsToValueRule(Rule):
-    """Validation rule for when a field value should equal/not equal a specific value"""
-    def __init__(self, rule_name: str, value: Any):
-        self.rule_name = rule_name
-        self.value = value
-    
+class _InternedRule(Rule):
+    """Base class for the built-in rules: immutable, interned flyweights.
+
+    Building a rule equal to an existing one returns that same object, and its
+    dict form is computed once, when the rule is created, and shared
+    (read-only; see :mod:`.frozen`).
+    """
+    __slots__ = ("_key", "_dict", "__weakref__")
+
+    # The constructor arguments, in order; each is stored as an attribute.
+    _fields: Tuple[str, ...] = ()
+    _interned: "weakref.WeakValueDictionary[Any, _InternedRule]" = weakref.WeakValueDictionary()
+
+    @classmethod
+    def _make(cls, *values: Any) -> "_InternedRule":
+        try:
+            key = (cls, tuple(exact_key(value) for value in values))
+            existing = cls._interned.get(key)
+        except TypeError:
+            key = existing = None
+        if existing is not None:
+            return existing
+        self = object.__new__(cls)
+        for name, value in zip(cls._fields, values):
+            object.__setattr__(self, name, freeze(value))
+        object.__setattr__(self, "_key", key)
+        object.__setattr__(self, "_dict", freeze(self._build_dict()))
+        if key is not None:
+            cls._interned[key] = self
+        return self
+
+    def _build_dict(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
     def as_dict(self) -> Dict[str, Any]:
+        return self._dict
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} objects are immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} objects are immutable")
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        if type(other) is not type(self):
+            return NotImplemented
+        if self._key is not None and other._key is not None:
+            return self._key == other._key
+        return self._dict == other._dict
+
+    def __hash__(self) -> int:
+        if self._key is None:
+            raise TypeError(f"unhashable {type(self).__name__}: {self!r}")
+        return hash(self._key)
+
+    def __repr__(self) -> str:
+        args = ", ".join(repr(getattr(self, name)) for name in self._fields)
+        return f"{type(self).__name__}({args})"
+
+    def __reduce__(self) -> Any:
+        return type(self), tuple(getattr(self, name) for name in self._fields)
+
+    def __copy__(self) -> "_InternedRule":
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "_InternedRule":
+        return self
+
+class EqualsToValueRule(_InternedRule):
+    """Validation rule for when a field value should equal/not equal a specific value"""
+    _fields = ("rule_name", "value")
+    __slots__ = _fields
+
+    def __new__(cls, rule_name: str, value: Any):
+        return cls._make(rule_name, value)
+
+    def _build_dict(self) -> Dict[str, Any]:
         return {
             "name": self.rule_name,
             "parameters": {
@@ -19,14 +96,15 @@ class EqualsToValueRule(Rule):
             }
         }
 
-class EqualsToFieldRule(Rule):
+class EqualsToFieldRule(_InternedRule):
     """Validation rule for when a field value should equal/not equal another field's value"""
-    def __init__(self, rule_name: str, field: str, values: Optional[str] = None):
-        self.rule_name = rule_name
-        self.field = field
-        self.values = values
-    
-    def as_dict(self) -> Dict[str, Any]:
+    _fields = ("rule_name", "field", "values")
+    __slots__ = _fields
+
+    def __new__(cls, rule_name: str, field: str, values: Optional[str] = None):
+        return cls._make(rule_name, field, values)
+
+    def _build_dict(self) -> Dict[str, Any]:
         parameters = {"field": self.field}
         if self.values is not None:
             parameters["values"] = self.values
@@ -35,22 +113,27 @@ class EqualsToFieldRule(Rule):
             "parameters": parameters
         }
 
-class RequiredRule(Rule):
+class RequiredRule(_InternedRule):
     """Validation rule for when a field is required"""
-    def __init__(self, rule_name: str):
-        self.rule_name = rule_name
-    
-    def as_dict(self) -> Dict[str, Any]:
+    _fields = ("rule_name",)
+    __slots__ = _fields
+
+    def __new__(cls, rule_name: str):
+        return cls._make(rule_name)
+
+    def _build_dict(self) -> Dict[str, Any]:
         return {
             "name": self.rule_name
         }
-class ColumnValidationRule(Rule):
+class ColumnValidationRule(_InternedRule):
     """Base class for column validation rules"""
-    def __init__(self, rule_name: str, column: str):
-        self.rule_name = rule_name
-        self.column = column
-    
-    def as_dict(self) -> Dict[str, Any]:
+    _fields = ("rule_name", "column")
+    __slots__ = _fields
+
+    def __new__(cls, rule_name: str, column: str):
+        return cls._make(rule_name, column)
+
+    def _build_dict(self) -> Dict[str, Any]:
         return {
             "name": self.rule_name,
             "parameters": {
@@ -58,18 +141,19 @@ class ColumnValidationRule(Rule):
             }
         }
 
-class ColumnFromFieldValidationRule(Rule):
+class ColumnFromFieldValidationRule(_InternedRule):
     """Base class for column validation rules that reference a field"""
-    def __init__(self, rule_name: str, values: str, field: Optional[str] = None):
-        self.rule_name = rule_name
-        self.field = field
-        self.values = values
-    
-    def as_dict(self) -> Dict[str, Any]:
+    _fields = ("rule_name", "values", "field")
+    __slots__ = _fields
+
+    def __new__(cls, rule_name: str, values: str, field: Optional[str] = None):
+        return cls._make(rule_name, values, field)
+
+    def _build_dict(self) -> Dict[str, Any]:
         parameters = {"values": self.values}
         if self.field is not None:
             parameters["field"] = self.field
         return {
             "name": self.rule_name,
             "parameters": parameters
-        } 
\ No newline at end of file
+        }
@@ -1,50 +1,40 @@
 from typing import Any, Optional
 from .rules import EqualsToValueRule, EqualsToFieldRule, ColumnValidationRule, ColumnFromFieldValidationRule, RequiredRule
-from typeguard import typechecked
-import inspect
+from .production_mode import typechecked
 
 
 @typechecked
 def is_equal_to_value(value: Any) -> EqualsToValueRule:
-    function_name = inspect.currentframe().f_code.co_name
-    return EqualsToValueRule(function_name, value)
+    return EqualsToValueRule("is_equal_to_value", value)
 
 @typechecked
 def is_not_equal_to_value(value: Any) -> EqualsToValueRule:
-    function_name = inspect.currentframe().f_code.co_name
-    return EqualsToValueRule(function_name, value)
+    return EqualsToValueRule("is_not_equal_to_value", value)
 
 @typechecked
 def is_equal_to_value_from_field(field: str) -> EqualsToFieldRule:
-    function_name = inspect.currentframe().f_code.co_name
-    return EqualsToFieldRule(function_name, field)
+    return EqualsToFieldRule("is_equal_to_value_from_field", field)
 
 @typechecked
 def is_not_included_in_values_from_field(field: str, values: Optional[str] = None) -> EqualsToFieldRule:
-    function_name = inspect.currentframe().f_code.co_name
-    return EqualsToFieldRule(function_name, field, values)
+    return EqualsToFieldRule("is_not_included_in_values_from_field", field, values)
 
 @typechecked
 def is_required() -> RequiredRule:
-    function_name = inspect.currentframe().f_code.co_name
-    return RequiredRule(function_name)
+    return RequiredRule("is_required")
 
 @typechecked
 def has_unique_column_values_in_table(column: str) -> ColumnValidationRule:
-    function_name = inspect.currentframe().f_code.co_name
-    return ColumnValidationRule(function_name, column)
+    return ColumnValidationRule("has_unique_column_values_in_table", column)
 
 @typechecked
 def has_unique_in_column(column: str) -> ColumnValidationRule:
-    function_name = inspect.currentframe().f_code.co_name
-    return ColumnValidationRule(function_name, column)
+    return ColumnValidationRule("has_unique_in_column", column)
 
 @typechecked
 def is_all_unique_in_column_from_field(values: str) -> ColumnFromFieldValidationRule:
-    function_name = inspect.currentframe().f_code.co_name
-    return ColumnFromFieldValidationRule(function_name, values)
+    return ColumnFromFieldValidationRule("is_all_unique_in_column_from_field", values)
 
 @typechecked
 def has_multiple_column_values_from_field_in_table(values: str, field: Optional[str] = None) -> ColumnFromFieldValidationRule:
-    function_name = inspect.currentframe().f_code.co_name
-    return ColumnFromFieldValidationRule(function_name, values, field) 
\ No newline at end of file
+    return ColumnFromFieldValidationRule("has_multiple_column_values_from_field_in_table", values, field) 
\ No newline at end of file
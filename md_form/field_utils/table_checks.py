@@ -0,0 +1,281 @@
+"""Column checks for table-valued fields.
+
+Tables (e.g. the experiment design of ``experiment_design_field``) map column
+names to equal-length columns and can hold thousands of rows. A table may be
+given as a dict of lists, a dict of NumPy arrays / pandas Series / buffer
+objects (``memoryview``, ``array.array``), or a pandas ``DataFrame``; columns
+are read in place, never converted to lists.
+
+Duplicate values in a column are found with one hash pass: large array and
+Series columns go through pandas' hash table (once pandas is imported), lists
+and small columns through a plain set or dict, and both report exactly what
+Python equality would (``None`` matches ``None``; a NaN only matches the same
+object), so the choice never changes a validation result.
+
+A column can also be a :class:`ColumnSummary`, filled one value at a time as
+the column is parsed (see :func:`validate_form_json`); it answers the same
+checks without keeping the values.
+"""
+
+import array
+import sys
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+# Array and Series columns shorter than this are cheaper to check without
+# pandas. Lists are always checked with a set or dict: building a Series from
+# one costs more than the hash pass itself.
+VECTORIZE_MIN_ROWS = 1000
+
+# NumPy dtype kinds whose scalars convert losslessly to Python ones (bool,
+# integers, floats, complex, strings, bytes). Datetimes stay NumPy scalars.
+_PYTHON_KINDS = "biufcUS"
+
+# How many duplicated values an error message lists before summarising.
+_DESCRIBE_LIMIT = 5
+
+
+def as_table(value: Any) -> Optional[Mapping[Any, Any]]:
+    """The column mapping of a table value, or ``None`` if it isn't table-shaped.
+
+    A ``DataFrame`` is viewed as a mapping of its columns as NumPy arrays
+    (views onto the frame's data where pandas allows).
+    """
+    if isinstance(value, dict):
+        return value
+    pandas = sys.modules.get("pandas")
+    if pandas is not None and isinstance(value, pandas.DataFrame):
+        return {name: value[name].to_numpy() for name in value.columns}
+    return None
+
+
+class ColumnSummary:
+    """What the column checks need to know about a column, gathered value by value.
+
+    Call :meth:`add` for each value in order, then :meth:`finish`. Only the
+    first value and, with ``track_duplicates``, a dict of the values seen so
+    far are held while the column is read; afterwards just the duplicates are
+    kept. Results match the checks on the equivalent list.
+    """
+
+    __slots__ = ("length", "multiple", "duplicates", "_first", "_seen", "_unhashable")
+
+    def __init__(self, track_duplicates: bool = True):
+        self.length = 0
+        self.multiple = False
+        # None when duplicates aren't tracked.
+        self.duplicates: Optional[Dict[Any, List[int]]] = {} if track_duplicates else None
+        self._first: Any = None
+        self._seen: Optional[Dict[Any, int]] = {} if track_duplicates else None
+        self._unhashable: Dict[int, Any] = {}
+
+    def add(self, value: Any) -> None:
+        position = self.length
+        self.length += 1
+        if position == 0:
+            self._first = value
+        elif not self.multiple and value is not self._first and not value == self._first:
+            self.multiple = True
+        if self._seen is None:
+            return
+        try:
+            seen = self._seen.setdefault(value, position)
+        except TypeError:
+            self._unhashable[position] = value
+            return
+        if seen != position:
+            self.duplicates.setdefault(value, [seen]).append(position)
+
+    def finish(self) -> "ColumnSummary":
+        """Drop the per-value state once the whole column has been added."""
+        if self._unhashable:
+            _add_unhashable_duplicates(self._unhashable, list(self._unhashable), self.duplicates)
+        self._seen = None
+        self._unhashable = {}
+        self._first = None
+        return self
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __repr__(self) -> str:
+        return f"ColumnSummary(length={self.length})"
+
+
+def is_column(value: Any) -> bool:
+    """Whether ``value`` can be a table column: a list or a 1-D array-like."""
+    if isinstance(value, (list, ColumnSummary)):
+        return True
+    if isinstance(value, (array.array, memoryview)):
+        return memoryview(value).ndim == 1
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        return value.ndim == 1
+    pandas = sys.modules.get("pandas")
+    return pandas is not None and isinstance(value, pandas.Series)
+
+
+def column_values(column: Any) -> Sequence[Any]:
+    """A positionally indexable view of a column (a Series by position, not label)."""
+    pandas = sys.modules.get("pandas")
+    if pandas is not None and isinstance(column, pandas.Series):
+        return column.to_numpy()
+    return column
+
+
+def duplicate_positions(column: Sequence[Any], vectorize_min_rows: int = VECTORIZE_MIN_ROWS) -> Dict[Any, List[int]]:
+    """Map each value occurring more than once in ``column`` to its row positions.
+
+    Values are listed in order of first duplication; positions are ascending.
+    """
+    if isinstance(column, ColumnSummary):
+        return _summary_duplicates(column)
+    if _vectorize(column, vectorize_min_rows):
+        return _duplicate_positions_vectorized(column)
+    return _duplicate_positions_at(_python_values(column), range(len(column)))
+
+
+def has_duplicates(column: Sequence[Any], vectorize_min_rows: int = VECTORIZE_MIN_ROWS) -> bool:
+    """Whether any value occurs more than once in ``column``."""
+    if isinstance(column, ColumnSummary):
+        return bool(_summary_duplicates(column))
+    if _vectorize(column, vectorize_min_rows):
+        return bool(_duplicate_positions_vectorized(column))
+    values = _python_values(column)
+    try:
+        return len(set(values)) != len(values)
+    except TypeError:
+        return bool(_duplicate_positions_at(values, range(len(values))))
+
+
+def has_multiple_values(column: Sequence[Any], vectorize_min_rows: int = VECTORIZE_MIN_ROWS) -> bool:
+    """Whether ``column`` holds at least two distinct values.
+
+    Every value is compared with the first, so this stops at the first
+    differing row and never needs to hash (or be able to hash) the values.
+    """
+    if isinstance(column, ColumnSummary):
+        return column.multiple
+    if len(column) < 2:
+        return False
+    first = column[0]
+    numpy = sys.modules.get("numpy")
+    if (
+        len(column) >= vectorize_min_rows
+        and numpy is not None
+        and isinstance(column, numpy.ndarray)
+        and column.dtype.kind != "O"
+    ):
+        # NaN != NaN here, as it is between the separate NaN scalars a Python
+        # loop over the array would see.
+        return bool((column != first).any())
+    for value in column:
+        if value is not first and not value == first:
+            return True
+    return False
+
+
+def describe_duplicates(duplicates: Dict[Any, List[int]]) -> str:
+    """Render duplicates as ``'a' at rows 0, 3; 'b' at rows 1, 2``."""
+    parts = [
+        f"{value!r} at rows {', '.join(str(p) for p in positions)}"
+        for value, positions in list(duplicates.items())[:_DESCRIBE_LIMIT]
+    ]
+    remaining = len(duplicates) - _DESCRIBE_LIMIT
+    if remaining > 0:
+        parts.append(f"and {remaining} more")
+    return "; ".join(parts)
+
+
+def _vectorize(column: Sequence[Any], vectorize_min_rows: int) -> bool:
+    # Only arrays, Series and buffers, and never by importing pandas mid-validation.
+    return (
+        not isinstance(column, list)
+        and len(column) >= vectorize_min_rows
+        and sys.modules.get("pandas") is not None
+    )
+
+
+def _summary_duplicates(column: ColumnSummary) -> Dict[Any, List[int]]:
+    if column.duplicates is None:
+        raise ValueError("duplicates were not tracked for this column")
+    return column.duplicates
+
+
+def _python_values(column: Sequence[Any]) -> Sequence[Any]:
+    """``column`` with NumPy scalars converted to Python ones.
+
+    Duplicate values end up in error messages and ``FieldError.params``, which
+    must render and serialize like the values of a list column.
+    """
+    if isinstance(column, memoryview):
+        return column.tolist()
+    numpy = sys.modules.get("numpy")
+    if numpy is None:
+        return column
+    pandas = sys.modules.get("pandas")
+    if pandas is not None and isinstance(column, pandas.Series):
+        column = column.to_numpy()
+    if isinstance(column, numpy.ndarray) and column.dtype.kind in _PYTHON_KINDS:
+        return column.tolist()
+    return column
+
+
+def _duplicate_positions_at(column: Sequence[Any], positions: Any) -> Dict[Any, List[int]]:
+    """One dict pass over ``column[p] for p in positions``."""
+    first: Dict[Any, int] = {}
+    duplicates: Dict[Any, List[int]] = {}
+    unhashable: List[Any] = []
+    for position in positions:
+        value = column[position]
+        try:
+            seen = first.setdefault(value, position)
+        except TypeError:
+            unhashable.append(position)
+            continue
+        if seen != position:
+            duplicates.setdefault(value, [seen]).append(position)
+    if unhashable:
+        _add_unhashable_duplicates(column, unhashable, duplicates)
+    return duplicates
+
+
+def _add_unhashable_duplicates(column: Sequence[Any], positions: List[int], duplicates: Dict[Any, List[int]]) -> None:
+    # Lists/dicts in a column can't be hashed; compare them pairwise. They are
+    # keyed by repr since the value itself can't be a dict key.
+    groups: List[List[int]] = []
+    for position in positions:
+        for group in groups:
+            if column[group[0]] == column[position]:
+                group.append(position)
+                break
+        else:
+            groups.append([position])
+    for group in groups:
+        if len(group) > 1:
+            duplicates[repr(column[group[0]])] = group
+
+
+def _duplicate_positions_vectorized(column: Sequence[Any]) -> Dict[Any, List[int]]:
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(column, pd.Series):
+        series = column.reset_index(drop=True)
+    elif isinstance(column, np.ndarray):
+        series = pd.Series(column, copy=False)
+    else:
+        series = pd.Series(np.asarray(column), copy=False)
+
+    try:
+        null = series.isna().to_numpy()
+        duplicated = series.duplicated(keep=False).to_numpy()
+    except TypeError:
+        # Unhashable values; fall back to the dict pass.
+        return _duplicate_positions_at(_python_values(column), range(len(column)))
+
+    # pandas treats every null as equal to every other; re-check nulls and the
+    # flagged rows with Python equality so results match the dict pass.
+    candidates = np.flatnonzero(duplicated | null)
+    picked = _python_values(series.to_numpy()[candidates])
+    positions = candidates.tolist()
+    return _duplicate_positions_at(dict(zip(positions, picked)), positions)
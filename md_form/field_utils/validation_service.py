@@ -0,0 +1,370 @@
+"""A local multi-process validation service.
+
+:class:`ValidationService` loads a fixed set of form definitions, compiles each
+one once, and answers validate requests sent over a local socket (a Unix
+socket, or a named pipe on Windows) by :class:`ValidationClient` from a pool
+of worker processes. Where the ``fork`` start method is available the workers
+inherit the forms compiled in the service's process; elsewhere (Windows, where
+compiled checks can't be pickled) each worker compiles them once when it
+starts. Either way workers keep their compiled forms for their whole life, so
+a request costs one validation and no compilation.
+
+At most ``max_pending`` submissions are queued or running at once. Further
+submissions wait up to ``queue_timeout`` seconds for a slot and are otherwise
+rejected with an ``overloaded`` error, so a burst slows callers down instead of
+growing an unbounded queue. :meth:`ValidationService.metrics` reports
+throughput and queue depth.
+
+Example::
+
+    with ValidationService({"de": definition}, workers=4) as service:
+        client = service.client()
+        result = client.validate("de", data, datasets=datasets)
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from .dataset_index import DatasetIndex
+from .form_validator import (
+    CompiledForm,
+    Datasets,
+    FieldError,
+    ValidationResult,
+    _index_datasets,
+    compile_form,
+    validate_form,
+)
+from .rule_registry import register_messages
+
+# Options a client may pass through to validate_form.
+_OPTIONS = ("datasets", "allow_unknown", "max_errors", "fail_fast")
+
+# Errors reported by the service rather than by a field check.
+register_messages({
+    "unknown_form": "no form {form!r} is served",
+    "overloaded": "the validation service is at capacity ({max_pending} pending submissions)",
+    "worker_error": "validation failed in a worker: {error}",
+    "unknown_operation": "unknown operation {op!r}",
+})
+
+# Seconds start() waits for every worker process to come up.
+_START_TIMEOUT = 60.0
+
+# The forms served by this worker process, its default dataset index, and the
+# barrier the workers meet at on start (set by _init_worker).
+_WORKER_FORMS: Dict[str, CompiledForm] = {}
+_WORKER_DATASETS: List[Optional[DatasetIndex]] = [None]
+_WORKER_STARTED: List[Any] = [None]
+
+
+def _init_worker(
+    forms: Dict[str, Union[CompiledForm, Dict[str, Any]]], datasets: Optional[DatasetIndex], started: Any,
+) -> None:
+    # Forked workers get the forms already compiled (initargs aren't pickled
+    # under fork); spawned ones get the definitions and compile them here.
+    _WORKER_FORMS.clear()
+    for form_id, form in forms.items():
+        _WORKER_FORMS[form_id] = compile_form(form)
+    _WORKER_DATASETS[0] = datasets
+    _WORKER_STARTED[0] = started
+
+
+def _await_workers() -> None:
+    # Returns once every worker runs one of these at the same time, so start()
+    # can't finish while the pool is short of processes.
+    _WORKER_STARTED[0].wait(_START_TIMEOUT)
+
+
+def _fork_context() -> Any:
+    """The ``fork`` multiprocessing context, or ``None`` where there is none."""
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return None
+
+
+def _validate_in_worker(form_id: str, data: Any, options: Dict[str, Any]) -> Dict[str, Any]:
+    form = _WORKER_FORMS.get(form_id)
+    if form is None:
+        return _error_reply("unknown_form", {"form": form_id})
+    if "datasets" not in options and _WORKER_DATASETS[0] is not None:
+        options = dict(options, datasets=_WORKER_DATASETS[0])
+    result = validate_form(form, data, **options)
+    return {"errors": _pack_errors(result.errors), "truncated": result.truncated}
+
+
+def _pack_errors(errors: List[FieldError]) -> List[Tuple[str, str, Optional[Dict[str, Any]]]]:
+    return [(error.field, error.code, error.params) for error in errors]
+
+
+def _error_reply(code: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    return {"errors": [("<service>", code, params)], "truncated": False, "failed": True}
+
+
+class ValidationService:
+    """Validate submissions for a set of forms in a pool of worker processes.
+
+    Args:
+        definitions: The forms to serve, keyed by the id clients refer to them by.
+        datasets: The dataset catalog used when a request passes no
+            ``datasets``; indexed once, when the service starts.
+        workers: Number of worker processes (defaults to the CPU count).
+        max_pending: Submissions allowed in the pool (queued or running) at once.
+        queue_timeout: Seconds a submission waits for a free slot before it is
+            rejected as ``overloaded``.
+        address: Where to listen; by default a fresh Unix socket (or named pipe).
+    """
+
+    def __init__(
+        self,
+        definitions: Dict[str, Dict[str, Any]],
+        *,
+        datasets: Optional[Datasets] = None,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        queue_timeout: float = 30.0,
+        address: Optional[Union[str, Tuple[str, int]]] = None,
+    ):
+        self.definitions = dict(definitions)
+        self.datasets = datasets
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.queue_timeout = queue_timeout
+        self.authkey = os.urandom(32)
+        self._address = address
+        self._listener: Optional[Listener] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._connections: List[Connection] = []
+        # Submissions handed to the pool and not finished yet.
+        self._inflight: Set[Future] = set()
+        self._started_at = 0.0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._failed = 0
+        self._pending = 0
+        self._max_pending_seen = 0
+
+    @property
+    def address(self) -> Any:
+        if self._listener is None:
+            raise RuntimeError("the service is not running")
+        return self._listener.address
+
+    def start(self) -> "ValidationService":
+        if self._pool is not None:
+            return self
+        # Compiling here also fails on a bad definition before any worker starts.
+        forms = {form_id: compile_form(definition) for form_id, definition in self.definitions.items()}
+        index = _index_datasets(self.datasets) if self.datasets is not None else None
+        context = _fork_context()
+        started = (context or multiprocessing.get_context()).Barrier(self.workers)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(forms if context is not None else self.definitions, index, started),
+        )
+        # Start every worker now, before this process runs the service's threads
+        # (forking after them is unsafe). Without the fix for CPython gh-90622
+        # (early 3.9 and 3.10 releases) the pool starts a worker only when a
+        # task finds none idle, so queue one task per worker that holds its
+        # worker until all of them have started.
+        for future in [self._pool.submit(_await_workers) for _ in range(self.workers)]:
+            future.result()
+        self._listener = Listener(self._address, authkey=self.authkey)
+        self._started_at = time.monotonic()
+        self._spawn(self._accept_loop)
+        return self
+
+    def close(self) -> None:
+        """Stop accepting connections and shut the worker pool down."""
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.close()
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            # Drop queued submissions (shutdown's cancel_futures needs Python 3.9).
+            with self._lock:
+                inflight = list(self._inflight)
+            for future in inflight:
+                future.cancel()
+            pool.shutdown(wait=True)
+
+    def __enter__(self) -> "ValidationService":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def client(self) -> "ValidationClient":
+        """A client connected to this service."""
+        return ValidationClient(self.address, self.authkey)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters since :meth:`start`, plus the current and peak queue depth."""
+        with self._lock:
+            uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "failed": self._failed,
+                "queue_depth": self._pending,
+                "max_queue_depth": self._max_pending_seen,
+                "uptime_seconds": uptime,
+                "throughput_per_second": self._completed / uptime if uptime else 0.0,
+            }
+
+    def submit(self, form_id: str, data: Any, options: Optional[Dict[str, Any]] = None) -> "Future[Dict[str, Any]]":
+        """Queue one validation, waiting for a free slot; returns a future of the reply."""
+        options = {k: v for k, v in (options or {}).items() if k in _OPTIONS}
+        with self._lock:
+            self._submitted += 1
+        pool = self._pool
+        if pool is None:
+            raise RuntimeError("the service is not running")
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self._rejected += 1
+            future: Future = Future()
+            future.set_result(_error_reply("overloaded", {"max_pending": self.max_pending}))
+            return future
+        with self._lock:
+            self._pending += 1
+            self._max_pending_seen = max(self._max_pending_seen, self._pending)
+        try:
+            submitted = pool.submit(_validate_in_worker, form_id, data, options)
+        except BaseException:
+            # Closed (or broken) since the check above: give the slot back.
+            self._slots.release()
+            with self._lock:
+                self._pending -= 1
+                self._failed += 1
+            raise
+        with self._lock:
+            self._inflight.add(submitted)
+        # The returned future resolves only after the metrics are updated.
+        reply: Future = Future()
+        submitted.add_done_callback(lambda done: self._release(done, reply))
+        return reply
+
+    def _release(self, done: Future, reply: Future) -> None:
+        self._slots.release()
+        failed = done.cancelled() or done.exception() is not None or done.result().get("failed")
+        with self._lock:
+            self._inflight.discard(done)
+            self._pending -= 1
+            if failed:
+                self._failed += 1
+            else:
+                self._completed += 1
+        if done.cancelled():
+            reply.cancel()
+        elif done.exception() is not None:
+            reply.set_exception(done.exception())
+        else:
+            reply.set_result(done.result())
+
+    def _spawn(self, target: Any, *args: Any) -> None:
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _accept_loop(self) -> None:
+        while self._listener is not None:
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError):
+                return
+            with self._lock:
+                self._connections.append(conn)
+            self._spawn(self._serve, conn)
+
+    def _serve(self, conn: Connection) -> None:
+        try:
+            while True:
+                request = conn.recv()
+                conn.send(self._handle(request))
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def _handle(self, request: Dict[str, Any]) -> Any:
+        op = request.get("op")
+        if op == "validate":
+            return self._reply(self.submit(request["form"], request["data"], request.get("options")))
+        if op == "validate_many":
+            futures = [self.submit(request["form"], data, request.get("options")) for data in request["items"]]
+            return [self._reply(future) for future in futures]
+        if op == "metrics":
+            return self.metrics()
+        if op == "forms":
+            return sorted(self.definitions)
+        return _error_reply("unknown_operation", {"op": op})
+
+    @staticmethod
+    def _reply(future: "Future[Dict[str, Any]]") -> Dict[str, Any]:
+        try:
+            return future.result()
+        except Exception as exc:  # a worker died or validation raised
+            return _error_reply("worker_error", {"error": repr(exc)})
+
+
+class ValidationClient:
+    """Send validate requests to a :class:`ValidationService` over its local socket.
+
+    A client holds one connection and is not thread-safe; give each thread its
+    own client.
+    """
+
+    def __init__(self, address: Any, authkey: bytes):
+        self._conn = Client(address, authkey=authkey)
+
+    def validate(self, form_id: str, data: Any, **options: Any) -> ValidationResult:
+        """Validate ``data`` against form ``form_id``; ``options`` are those of :func:`validate_form`."""
+        return _unpack(self._call({"op": "validate", "form": form_id, "data": data, "options": options}))
+
+    def validate_many(self, form_id: str, items: List[Any], **options: Any) -> List[ValidationResult]:
+        """Validate several submissions in one round trip, spread across the workers."""
+        replies = self._call({"op": "validate_many", "form": form_id, "items": list(items), "options": options})
+        return [_unpack(reply) for reply in replies]
+
+    def metrics(self) -> Dict[str, Any]:
+        return self._call({"op": "metrics"})
+
+    def forms(self) -> List[str]:
+        return self._call({"op": "forms"})
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ValidationClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _call(self, request: Dict[str, Any]) -> Any:
+        self._conn.send(request)
+        return self._conn.recv()
+
+
+def _unpack(reply: Dict[str, Any]) -> ValidationResult:
+    errors = [FieldError(field, code, params) for field, code, params in reply["errors"]]
+    return ValidationResult(errors, reply.get("truncated", False))
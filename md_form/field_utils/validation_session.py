@@ -0,0 +1,129 @@
+"""Incremental validation of a form that is being edited.
+
+A :class:`ValidationSession` holds the current data for one form and keeps its
+validation errors up to date as single fields change. Each :meth:`update`
+revalidates only the fields whose result can depend on the changed value (see
+:attr:`CompiledForm.dependents`), so live editing costs a handful of field
+checks rather than a full :func:`validate_form` per change.
+
+The errors reported match what :func:`validate_form` would return for the
+session's current data, provided that the datasets and the rules don't read
+anything the dependents graph doesn't know about. Two cases fall outside it:
+
+- A :class:`DatasetIndex` changed between updates only affects the dataset
+  fields revalidated afterwards; call :meth:`ValidationSession.revalidate` to
+  pick the change up everywhere.
+- A custom rule (see :mod:`rule_registry`) that reads fields other than its
+  own and the ``field``/``values`` parameters it is given is not rerun when
+  those fields change.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from .dataset_resolver import DatasetResolver
+from .form_validator import (
+    CompiledForm,
+    Datasets,
+    FieldError,
+    ValidationResult,
+    _ValidationContext,
+    _check_dataset_field,
+    _index_datasets,
+    _selected_dataset_ids,
+    _validate_field,
+    compile_form,
+)
+
+
+class ValidationSession:
+    """Keep the validation result of a form current as its fields change.
+
+    A :class:`DatasetIndex` passed as ``datasets`` is used as is, so later
+    changes to it apply to the fields revalidated after them. With a
+    :class:`DatasetResolver`, each changed dataset field asks it for its own
+    selection.
+
+    Example::
+
+        session = ValidationSession(definition, datasets)
+        session.update("input_datasets", ["ds1"])
+        if not session.result:
+            show(session.errors)
+    """
+
+    def __init__(
+        self,
+        definition: Union[Dict[str, Any], CompiledForm],
+        datasets: Optional[Datasets] = None,
+        data: Optional[Dict[str, Any]] = None,
+        *,
+        allow_unknown: bool = True,
+    ):
+        self.form = compile_form(definition)
+        self.data: Dict[str, Any] = dict(data or {})
+        self.allow_unknown = allow_unknown
+        if datasets is None or isinstance(datasets, DatasetResolver):
+            self._datasets = datasets
+        else:
+            self._datasets = _index_datasets(datasets)
+        self._dataset_fields = {name for name, _ in self.form.dataset_fields}
+        self._field_errors: Dict[str, List[FieldError]] = {}
+        self._dataset_errors: Dict[str, List[FieldError]] = {}
+        self._revalidate(self.form.fields)
+
+    def update(self, field: str, value: Any) -> ValidationResult:
+        """Set ``field`` to ``value`` and revalidate the fields that depend on it.
+
+        Setting a field to ``None`` clears it, as an absent value does in
+        :func:`validate_form`.
+        """
+        self.data[field] = value
+        self._revalidate(self.form.dependents.get(field, ()))
+        return self.result
+
+    def revalidate(self, fields: Optional[Iterable[str]] = None) -> ValidationResult:
+        """Revalidate ``fields`` (every field by default) against the current data.
+
+        For changes :meth:`update` can't see, such as a :class:`DatasetIndex`
+        edited in place.
+        """
+        self._revalidate(self.form.fields if fields is None else fields)
+        return self.result
+
+    @property
+    def errors(self) -> List[FieldError]:
+        """The current errors, in the order :func:`validate_form` reports them."""
+        errors: List[FieldError] = []
+        for name in self.form.fields:
+            errors.extend(self._field_errors.get(name, ()))
+        for name in self.form.fields:
+            errors.extend(self._dataset_errors.get(name, ()))
+        if not self.allow_unknown:
+            for key in self.data:
+                if key not in self.form.fields:
+                    errors.append(FieldError(key, "unknown_field"))
+        return errors
+
+    @property
+    def result(self) -> ValidationResult:
+        return ValidationResult(self.errors)
+
+    def _revalidate(self, names: Iterable[str]) -> None:
+        ctx = _ValidationContext(self.data)
+        fields = self.form.fields
+        for name in names:
+            spec = fields[name]
+            self._field_errors[name] = _validate_field(name, self.form, ctx)
+            if name in self._dataset_fields:
+                self._dataset_errors[name] = self._check_dataset(name, spec, ctx)
+
+    def _check_dataset(self, name: str, spec: Dict[str, Any], ctx: _ValidationContext) -> List[FieldError]:
+        if self._datasets is None:
+            return [FieldError(name, "datasets_not_provided")]
+        value = self.data.get(name)
+        datasets = self._datasets
+        if isinstance(datasets, DatasetResolver):
+            if value is None:
+                return []
+            datasets = datasets.resolve(set(_selected_dataset_ids(value)))
+        return _check_dataset_field(name, spec, value, datasets, ctx)
@@ -1,4 +1,17 @@
-from typing import Any, Dict, List, Union
+import copy
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from .frozen import FrozenDict, FrozenList, exact_key, freeze
+
+# A compiled condition: takes the data dict, returns whether the condition holds.
+Predicate = Callable[[Dict[str, Any]], bool]
+
+# Leaf condition types in the order evaluate_when checks them.
+_CONDITION_TYPES = ("equals", "not_equals", "is_present", "contains")
+
+# Upper bound on distinct compiled conditions kept in the cache.
+_MAX_COMPILED = 4096
 
 
 def evaluate_when(when_dict: Dict[str, Any], data: Dict[str, Any]) -> bool:
@@ -13,26 +26,507 @@ def evaluate_when(when_dict: Dict[str, Any], data: Dict[str, Any]) -> bool:
     prop = when_dict.get("property")
     value = data.get(prop)
 
-    if "equals" in when_dict:
-        return value == when_dict["equals"]
-    if "not_equals" in when_dict:
-        return value != when_dict["not_equals"]
-    if "is_present" in when_dict:
+    for condition_type in _CONDITION_TYPES:
+        if condition_type in when_dict:
+            return _evaluate_leaf(condition_type, value, when_dict[condition_type])
+    return False
+
+
+def _evaluate_leaf(condition_type: Optional[str], value: Any, expected: Any) -> Any:
+    """A leaf condition of ``condition_type`` on the property's ``value``."""
+    if condition_type == "equals":
+        return value == expected
+    if condition_type == "not_equals":
+        return value != expected
+    if condition_type == "is_present":
         return value is not None
-    if "contains" in when_dict:
-        return isinstance(value, (list, tuple)) and when_dict["contains"] in value
+    if condition_type == "contains":
+        return isinstance(value, (list, tuple)) and expected in value
+    return False
+
+
+def compile_when(when: Union["When", Dict[str, Any]]) -> Predicate:
+    """Compile a ``When`` or a raw ``when`` dict into a predicate over ``data``.
+
+    The predicate agrees with :func:`evaluate_when`, but the condition is first
+    simplified (see :func:`simplify_when`) and repeated ``equals``/``contains`` checks on one
+    property are folded into a single set lookup. Compiled predicates are cached
+    by the structure of the condition, so identical conditions built in
+    different places share one predicate.
+    """
+    if isinstance(when, When) and when._predicate is not None:
+        return when._predicate
+    try:
+        key = _when_key(when)
+    except TypeError:
+        # A condition value we can't hash structurally; compile it uncached.
+        predicate = _build(_simplified(_as_node(when)))
+    else:
+        predicate = _COMPILED.get(key)
+        if predicate is None:
+            # Conditions that simplify to the same thing share one predicate.
+            simplified = _simplified(_as_node(when))
+            simple_key = _when_key(simplified)
+            predicate = _COMPILED.get(simple_key)
+            if predicate is None:
+                predicate = _cache_predicate(simple_key, _build(simplified))
+            _cache_predicate(key, predicate)
+    if isinstance(when, When):
+        object.__setattr__(when, "_predicate", predicate)
+    return predicate
+
+
+_COMPILED: Dict[Any, Predicate] = {}
+
+
+def _cache_predicate(key: Any, predicate: Predicate) -> Predicate:
+    if len(_COMPILED) >= _MAX_COMPILED:
+        _COMPILED.clear()
+    _COMPILED[key] = predicate
+    return predicate
+
+
+def referenced_properties(when: Union["When", Dict[str, Any]]) -> Set[Any]:
+    """The names of every property a ``When`` or ``when`` dict reads."""
+    is_group, operator, conditions, prop, _, _ = _parts(when)
+    if not is_group:
+        return {prop}
+    found: Set[Any] = set()
+    for condition in conditions:
+        found |= referenced_properties(condition)
+    return found
+
+
+def simplify_when(when: Union["When", Dict[str, Any]]) -> Union["When", Dict[str, Any]]:
+    """Normalize a ``When`` or a ``when`` dict into an equivalent, cheaper condition.
+
+    The result agrees with :func:`evaluate_when` on every ``data``:
+
+    - nested groups with the same operator are flattened, and groups of one
+      condition are replaced by that condition;
+    - repeated clauses are dropped;
+    - conditions that are constant (unknown condition types or operators, empty
+      groups) are folded, so ``and`` drops ``true`` clauses and becomes ``false``
+      on a ``false`` one, and ``or`` the other way round;
+    - clauses on one property that contradict or imply each other are folded:
+      ``equals(x, a)`` and ``equals(x, b)`` is ``false``, ``equals(x, a)`` or
+      ``not_equals(x, a)`` is ``true``, and ``is_present(x)`` next to
+      ``equals(x, a)`` is dropped from an ``and`` (the ``equals`` from an ``or``);
+    - the remaining clauses are ordered cheapest first.
+
+    Constant ``true`` and ``false`` are written as the empty ``and`` and ``or``
+    groups. A ``When`` gives a ``When``, a dict gives a plain dict.
+    """
+    if isinstance(when, When):
+        return _simplified(when)
+    return copy.deepcopy(_simplified(_as_node(when)).as_dict())
+
+
+def _as_node(when: Union["When", Dict[str, Any]]) -> "When":
+    """The ``When`` for a condition in either form; unknown kinds become ``false``."""
+    if isinstance(when, When):
+        return when
+    is_group, operator, conditions, prop, condition_type, value = _parts(when)
+    if is_group:
+        if operator not in ("and", "or"):
+            return When.any_of()
+        return When(operator=operator, conditions=[_as_node(c) for c in conditions])
+    if condition_type is None:
+        return When.any_of()
+    return When(prop, condition_type, value)
+
+
+_SIMPLIFIED: Dict["When", "When"] = {}
+
+
+def _simplified(node: "When") -> "When":
+    try:
+        found = _SIMPLIFIED.get(node)
+    except TypeError:
+        return _simplify(node)
+    if found is None:
+        if len(_SIMPLIFIED) >= _MAX_COMPILED:
+            _SIMPLIFIED.clear()
+        found = _SIMPLIFIED[node] = _simplify(node)
+    return found
+
+
+def _simplify(node: "When") -> "When":
+    operator = node.operator
+    if operator is None:
+        if node.condition_type not in _CONDITION_TYPES:
+            return When.any_of()
+        if node.condition_type == "is_present" and node.value is not True:
+            # evaluate_when ignores the value of is_present.
+            return When.is_present(node.property)
+        return node
+    if operator not in ("and", "or"):
+        return When.any_of()
+
+    # The empty `and` is true and the empty `or` is false: an `and` drops the
+    # former (its identity) and is decided by the latter, and vice versa.
+    identity = When(operator=operator)
+    absorbing = When(operator="or" if operator == "and" else "and")
+    terms: List[When] = []
+    for condition in node.conditions:
+        simplified = _simplified(_as_node(condition))
+        if simplified.operator == operator:
+            terms.extend(simplified.conditions)
+        else:
+            terms.append(simplified)
+
+    kept: List[When] = []
+    seen: Set[Any] = set()
+    for term in terms:
+        if term == identity:
+            continue
+        if term == absorbing:
+            return absorbing
+        try:
+            key = _when_key(term)
+        except TypeError:
+            kept.append(term)
+            continue
+        if key not in seen:
+            seen.add(key)
+            kept.append(term)
+
+    folded = _fold_property_clauses(operator, kept)
+    if folded is None:
+        return absorbing
+    folded.sort(key=_cost)
+    if not folded:
+        return identity
+    if len(folded) == 1:
+        return folded[0]
+    return When(operator=operator, conditions=folded)
+
+
+def _is_plain(value: Any) -> bool:
+    """Whether ``==`` on ``value`` is an ordinary, transitive value comparison."""
+    if value is None or type(value) in (str, int, bool):
+        return True
+    return type(value) is float and value == value
+
+
+def _fold_property_clauses(operator: str, terms: List["When"]) -> Optional[List["When"]]:
+    """Fold leaves on one property that decide or imply each other.
+
+    Returns the clauses to keep, or ``None`` when the group is decided by its
+    absorbing value (``false`` for ``and``, ``true`` for ``or``). Only plain
+    values (see :func:`_is_plain`) are reasoned about.
+    """
+    by_property: Dict[Any, List[When]] = {}
+    for term in terms:
+        if term.operator is None and term.condition_type != "contains":
+            if term.condition_type != "is_present" and not _is_plain(term.value):
+                continue
+            try:
+                by_property.setdefault(term.property, []).append(term)
+            except TypeError:
+                continue
+
+    dropped: Set[int] = set()
+    for leaves in by_property.values():
+        if len(leaves) < 2:
+            continue
+        equals = [leaf.value for leaf in leaves if leaf.condition_type == "equals"]
+        not_equals = [leaf.value for leaf in leaves if leaf.condition_type == "not_equals"]
+        present = [leaf for leaf in leaves if leaf.condition_type == "is_present"]
+        if operator == "and":
+            if equals:
+                expected = equals[0]
+                if any(value != expected for value in equals) or any(value == expected for value in not_equals):
+                    return None
+                if present and expected is None:
+                    return None
+                # x == a already implies x != b and x is not None.
+                dropped.update(id(leaf) for leaf in leaves if leaf.condition_type != "equals")
+        else:
+            if any(value == other for value in equals for other in not_equals):
+                return None
+            if any(value != other for i, value in enumerate(not_equals) for other in not_equals[i + 1:]):
+                return None
+            if present:
+                if any(value is None for value in equals):
+                    return None
+                # x == a (a not None) already implies x is not None.
+                dropped.update(id(leaf) for leaf in leaves if leaf.condition_type == "equals")
+    return [term for term in terms if id(term) not in dropped]
+
+
+def _cost(when: "When") -> int:
+    """A rough evaluation cost, for ordering clauses cheapest first."""
+    if when.operator is not None:
+        return 1 + sum(_cost(c) for c in when.conditions)
+    if when.condition_type == "is_present":
+        return 1
+    if when.condition_type == "contains" or isinstance(when.value, (dict, list, tuple, set, frozenset)):
+        return 3
+    return 2
+
+
+def _freeze(value: Any) -> Any:
+    """A hashable stand-in for ``value`` that is equal only for equal values."""
+    if isinstance(value, dict):
+        return ("dict", frozenset((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return ("list", tuple(_freeze(v) for v in value))
+    if isinstance(value, tuple):
+        return ("tuple", tuple(_freeze(v) for v in value))
+    if isinstance(value, (set, frozenset)):
+        return ("set", frozenset(_freeze(v) for v in value))
+    hash(value)
+    return value
 
+
+def _parts(when: Union["When", Dict[str, Any]]) -> Tuple[bool, Any, Any, Any, Optional[str], Any]:
+    """Split a condition into ``(is_group, operator, conditions, property, type, value)``.
+
+    Both ``When`` objects and ``when`` dicts are read without building the
+    other representation. A leaf with no recognised condition type has a
+    ``type`` of ``None``.
+    """
+    if isinstance(when, When):
+        if when.operator is not None:
+            return True, when.operator, when.conditions, None, None, None
+        if when.condition_type in _CONDITION_TYPES:
+            return False, None, None, when.property, when.condition_type, when.value
+        return False, None, None, when.property, None, None
+
+    if "operator" in when:
+        return True, when["operator"], when.get("conditions", []), None, None, None
+    for condition_type in _CONDITION_TYPES:
+        if condition_type in when:
+            return False, None, None, when.get("property"), condition_type, when[condition_type]
+    return False, None, None, when.get("property"), None, None
+
+
+def _when_key(when: Union["When", Dict[str, Any]]) -> Any:
+    is_group, operator, conditions, prop, condition_type, value = _parts(when)
+    if is_group:
+        if operator not in ("and", "or"):
+            return ("false",)
+        return (operator, tuple(_when_key(c) for c in conditions))
+    if condition_type is None:
+        return ("false",)
+    if condition_type == "is_present":
+        return ("is_present", _freeze(prop))
+    return (condition_type, _freeze(prop), _freeze(value))
+
+
+def _always_true(data: Dict[str, Any]) -> bool:
+    return True
+
+
+def _always_false(data: Dict[str, Any]) -> bool:
     return False
 
 
+def _flatten(operator: str, conditions: Any, out: List[Any]) -> None:
+    """Collect the leaves and other-operator groups under nested ``operator`` groups."""
+    for condition in conditions:
+        parts = _parts(condition)
+        if parts[0] and parts[1] == operator:
+            _flatten(operator, parts[2], out)
+        else:
+            out.append((condition, parts))
+
+
+def _is_set_member(value: Any) -> bool:
+    """Whether ``value`` can be folded into a set lookup without changing results."""
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    # NaN never equals itself, but set lookups match it by identity.
+    return value == value
+
+
+def _build(when: Union["When", Dict[str, Any]]) -> Predicate:
+    is_group, operator, conditions, prop, condition_type, value = _parts(when)
+    if not is_group:
+        return _build_leaf(prop, condition_type, value)
+    if operator not in ("and", "or"):
+        return _always_false
+
+    terms: List[Any] = []
+    _flatten(operator, conditions, terms)
+
+    # An `or` can fold its equals/contains checks on one property into a single
+    # set lookup; an `and` can do the same with not_equals/contains.
+    foldable = ("equals", "contains") if operator == "or" else ("not_equals", "contains")
+    # Each slot is either a compiled predicate or the key of a folded group,
+    # so the flattened clause order is preserved.
+    slots: List[Any] = []
+    folded: Dict[Tuple[str, Any], List[Tuple[Any, Any]]] = {}
+    for condition, (sub_is_group, _, _, sub_prop, sub_type, sub_value) in terms:
+        if not sub_is_group and sub_type in foldable and _is_set_member(sub_value):
+            try:
+                values = folded.get((sub_type, sub_prop))
+            except TypeError:
+                values = None  # unhashable property name
+            else:
+                if values is None:
+                    values = folded[(sub_type, sub_prop)] = []
+                    slots.append((sub_type, sub_prop))
+                values.append((condition, sub_value))
+                continue
+        slots.append(compile_when(condition))
+
+    checks: List[Predicate] = []
+    for slot in slots:
+        if not isinstance(slot, tuple):
+            checks.append(slot)
+            continue
+        sub_type, sub_prop = slot
+        values = folded[slot]
+        if len(values) == 1:
+            checks.append(compile_when(values[0][0]))
+        else:
+            expected = frozenset(value for _, value in values)
+            checks.append(_build_set_check(operator, sub_prop, sub_type, expected))
+
+    if not checks:
+        return _always_true if operator == "and" else _always_false
+    if len(checks) == 1:
+        return checks[0]
+    group = tuple(checks)
+    if operator == "and":
+        return lambda data: all(check(data) for check in group)
+    return lambda data: any(check(data) for check in group)
+
+
+def _build_leaf(prop: Any, condition_type: Optional[str], expected: Any) -> Predicate:
+    if condition_type == "equals":
+        return lambda data: data.get(prop) == expected
+    if condition_type == "not_equals":
+        return lambda data: data.get(prop) != expected
+    if condition_type == "is_present":
+        return lambda data: data.get(prop) is not None
+    if condition_type == "contains":
+        def contains(data: Dict[str, Any]) -> bool:
+            value = data.get(prop)
+            return isinstance(value, (list, tuple)) and expected in value
+        return contains
+    return _always_false
+
+
+def _in_set(value: Any, expected: frozenset) -> bool:
+    try:
+        return value in expected
+    except TypeError:
+        # An unhashable value can still compare equal to a hashable one.
+        return any(value == e for e in expected)
+
+
+def _build_set_check(operator: str, prop: Any, condition_type: str, expected: frozenset) -> Predicate:
+    """One pass over ``data[prop]`` standing in for several same-property checks."""
+    if condition_type == "equals":
+        # or-group: value equals any of the expected values
+        return lambda data: _in_set(data.get(prop), expected)
+    if condition_type == "not_equals":
+        # and-group: value equals none of the expected values
+        return lambda data: not _in_set(data.get(prop), expected)
+
+    if operator == "or":
+        def contains_any(data: Dict[str, Any]) -> bool:
+            value = data.get(prop)
+            return isinstance(value, (list, tuple)) and any(_in_set(item, expected) for item in value)
+        return contains_any
+
+    def contains_all(data: Dict[str, Any]) -> bool:
+        value = data.get(prop)
+        if not isinstance(value, (list, tuple)):
+            return False
+        found = set()
+        for item in value:
+            try:
+                if item in expected:
+                    found.add(item)
+            except TypeError:
+                found.update(e for e in expected if item == e)
+            if len(found) == len(expected):
+                return True
+        return False
+    return contains_all
+
+
 class When:
-    def __init__(self, property_name: str = None, condition_type: str = None, value: Any = None,
-                 operator: str = None, conditions: List['When'] = None):
-        self.property = property_name
-        self.condition_type = condition_type
-        self.value = value
-        self.operator = operator
-        self.conditions = conditions or []
+    """An immutable condition node.
+
+    ``When`` objects are frozen, hashable and compared by structure. Building a
+    condition equal to an existing one returns that same object, so repeated
+    gates share one node, one cached dict form and one compiled predicate.
+    Condition values are stored as read-only copies (see :mod:`.frozen`).
+    """
+
+    __slots__ = ("property", "condition_type", "value", "operator", "conditions",
+                 "_key", "_dict", "_predicate", "__weakref__")
+
+    _interned: "weakref.WeakValueDictionary[Any, When]" = weakref.WeakValueDictionary()
+
+    def __new__(cls, property_name: str = None, condition_type: str = None, value: Any = None,
+                operator: str = None, conditions: List['When'] = None):
+        conditions = tuple(conditions) if conditions else ()
+        try:
+            key = (cls, exact_key(property_name), condition_type, exact_key(value), operator,
+                   tuple(c._key if isinstance(c, When) else exact_key(c) for c in conditions))
+            if any(k is None for k in key[5]):
+                raise TypeError("a sub-condition is not hashable")
+        except TypeError:
+            key = None
+        else:
+            existing = cls._interned.get(key)
+            if existing is not None:
+                return existing
+
+        self = object.__new__(cls)
+        setattr_ = object.__setattr__
+        setattr_(self, "property", property_name)
+        setattr_(self, "condition_type", condition_type)
+        setattr_(self, "value", freeze(value))
+        setattr_(self, "operator", operator)
+        setattr_(self, "conditions", conditions)
+        setattr_(self, "_key", key)
+        setattr_(self, "_dict", None)
+        setattr_(self, "_predicate", None)
+        if key is not None:
+            cls._interned[key] = self
+        return self
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("When objects are immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("When objects are immutable")
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, When):
+            return NotImplemented
+        if self._key is not None and other._key is not None:
+            return self._key == other._key
+        return (self.property, self.condition_type, self.value, self.operator, self.conditions) == \
+            (other.property, other.condition_type, other.value, other.operator, other.conditions)
+
+    def __hash__(self) -> int:
+        if self._key is None:
+            raise TypeError(f"unhashable When: {self!r}")
+        return hash(self._key)
+
+    def __repr__(self) -> str:
+        return f"When({dict(self.as_dict())!r})"
+
+    def __reduce__(self) -> Any:
+        return type(self), (self.property, self.condition_type, self.value, self.operator, self.conditions)
+
+    def __copy__(self) -> "When":
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "When":
+        return self
 
     @classmethod
     def equals(cls, property_name: str, value: Any):
@@ -53,23 +547,29 @@ class When:
     @classmethod
     def all_of(cls, *conditions: 'When'):
         """Create a When condition that requires ALL conditions to be true (AND operator)"""
-        return cls(operator="and", conditions=list(conditions))
+        return cls(operator="and", conditions=conditions)
 
     @classmethod
     def any_of(cls, *conditions: 'When'):
         """Create a When condition that requires ANY condition to be true (OR operator)"""
-        return cls(operator="or", conditions=list(conditions))
+        return cls(operator="or", conditions=conditions)
 
     def evaluate(self, data: Dict[str, Any]) -> bool:
-        return evaluate_when(self.as_dict(), data)
+        return compile_when(self)(data)
 
     def as_dict(self) -> Dict[str, Any]:
+        """The ``when`` dict for this condition, built once and shared (read-only)."""
+        cached = self._dict
+        if cached is not None:
+            return cached
         # If this is a compound condition (has operator)
         if self.operator is not None:
-            return {
-                "operator": self.operator,
-                "conditions": [condition.as_dict() for condition in self.conditions]
-            }
+            cached = FrozenDict(
+                operator=self.operator,
+                conditions=FrozenList(condition.as_dict() for condition in self.conditions),
+            )
         # If this is a simple condition
         else:
-            return {"property": self.property, self.condition_type: self.value}
\ No newline at end of file
+            cached = FrozenDict({"property": self.property, self.condition_type: self.value})
+        object.__setattr__(self, "_dict", cached)
+        return cached
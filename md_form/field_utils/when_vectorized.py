@@ -0,0 +1,113 @@
+"""Evaluate a ``when`` condition over many records at once.
+
+:func:`evaluate_when_vectorized` takes a pandas ``DataFrame`` or a dict of
+equal-length columns (lists, NumPy arrays, pandas Series) and returns a NumPy
+boolean mask with one entry per row: entry ``i`` is what
+:func:`evaluate_when` returns for the record ``{column: values[i]}``.
+
+Conditions are simplified first (see :func:`simplify_when`); ``and``/``or``
+groups become element-wise logical operations and leaves become column
+comparisons. Numeric, boolean and string columns compared against a plain
+value are handled by NumPy; other columns (``object`` arrays, lists) are
+compared value by value with Python equality, so results always match
+:func:`evaluate_when` exactly. As there, only ``None`` counts as missing: a NaN
+in a float column is present.
+"""
+
+import sys
+from typing import Any, Dict, Mapping, Union
+
+from .table_checks import as_table
+from .when import When, _as_node, _evaluate_leaf, _is_plain, _simplified
+
+# NumPy dtype kinds compared against a number (or bool) in one vectorized pass.
+_NUMERIC_KINDS = "biuf"
+
+
+def evaluate_when_vectorized(when: Union[When, Dict[str, Any]], records: Any) -> Any:
+    """Evaluate ``when`` against every row of ``records``; returns a NumPy bool array.
+
+    Args:
+        when: A ``When`` or a raw ``when`` dict.
+        records: A pandas ``DataFrame`` or a dict mapping property names to
+            equal-length columns. Properties without a column are ``None`` in
+            every row.
+
+    Raises:
+        ValueError: If ``records`` isn't table-shaped or its columns differ in length.
+    """
+    import numpy as np
+
+    columns = as_table(records)
+    if columns is None:
+        raise ValueError("records must be a DataFrame or a dict of columns")
+    pandas = sys.modules.get("pandas")
+    if pandas is not None and isinstance(records, pandas.DataFrame):
+        rows = len(records)
+    else:
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("columns must all have the same length")
+        rows = lengths.pop() if lengths else 0
+    return _mask(_simplified(_as_node(when)), columns, rows, np)
+
+
+def _mask(node: When, columns: Mapping[Any, Any], rows: int, np: Any) -> Any:
+    if node.operator is not None:
+        # Simplified groups are "and"/"or"; the empty ones are the constants.
+        combine = np.logical_and if node.operator == "and" else np.logical_or
+        result = np.full(rows, node.operator == "and")
+        for condition in node.conditions:
+            combine(result, _mask(condition, columns, rows, np), out=result)
+        return result
+
+    column = columns.get(node.property)
+    if column is None:
+        # Every row reads None for this property.
+        return np.full(rows, bool(_evaluate_leaf(node.condition_type, None, node.value)))
+    values = _as_array(column, np)
+    if values is not None and values.dtype != object:
+        vectorized = _vectorized_leaf(node.condition_type, node.value, values, rows, np)
+        if vectorized is not None:
+            return vectorized
+    if values is not None:
+        # Python scalars: np.int64(1) == [1] broadcasts to True, 1 == [1] is False.
+        column = values.tolist()
+    condition_type, expected = node.condition_type, node.value
+    return np.fromiter(
+        (bool(_evaluate_leaf(condition_type, value, expected)) for value in column), dtype=bool, count=rows,
+    )
+
+
+def _as_array(column: Any, np: Any) -> Any:
+    """``column`` as a NumPy array if it already is one (or a Series), else ``None``."""
+    if isinstance(column, np.ndarray):
+        return column if column.ndim == 1 else None
+    pandas = sys.modules.get("pandas")
+    if pandas is not None and isinstance(column, pandas.Series):
+        return column.to_numpy()
+    return None
+
+
+def _vectorized_leaf(condition_type: str, expected: Any, values: Any, rows: int, np: Any) -> Any:
+    """The mask for a leaf over a non-object array, or ``None`` to compare value by value."""
+    if condition_type == "is_present":
+        # Typed arrays cannot hold None.
+        return np.ones(rows, dtype=bool)
+    if condition_type == "contains":
+        # ...nor lists or tuples.
+        return np.zeros(rows, dtype=bool)
+    kind = values.dtype.kind
+    if expected is None:
+        matches = np.zeros(rows, dtype=bool)
+    elif not _is_plain(expected):
+        return None
+    elif kind in _NUMERIC_KINDS:
+        # A string never equals a number.
+        matches = np.zeros(rows, dtype=bool) if isinstance(expected, str) else values == expected
+    elif kind == "U":
+        matches = values == expected if isinstance(expected, str) else np.zeros(rows, dtype=bool)
+    else:
+        return None
+    # x != v is not (x == v) for the plain values and dtypes handled here.
+    return matches if condition_type == "equals" else ~matches
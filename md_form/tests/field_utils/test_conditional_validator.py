@@ -1,7 +1,7 @@
 import pytest
 from typing import Optional, List
 from pydantic import BaseModel, ValidationError
-from field_utils.conditional_validator import ConditionalRequiredMixin
+from field_utils.conditional_validator import ConditionalRequiredMixin, _gate_plan
 from field_utils.field_helpers import control_variables_field, string_field, select_field
 from field_utils.rules_builder import is_required
 from field_utils.when import When
@@ -102,3 +102,27 @@ class TestUnconditionalRequired:
     def test_required_without_when_provided(self):
         model = NoWhenModel(name="test")
         assert model.name == "test"
+
+
+class ExtendedModel(MultiConditionModel):
+    label: Optional[str] = string_field(
+        rules=[is_required()],
+        when=When.equals("entity_type", "protein"),
+    )
+
+
+class TestGatePlan:
+
+    def test_plan_holds_only_conditionally_required_fields(self):
+        assert [name for name, _ in _gate_plan(MultiConditionModel)] == ["batch_vars"]
+        assert _gate_plan(NoWhenModel) == []
+
+    def test_plan_is_built_once_per_class(self):
+        assert _gate_plan(MultiConditionModel) is _gate_plan(MultiConditionModel)
+
+    def test_subclass_gets_its_own_plan(self):
+        assert [name for name, _ in _gate_plan(ExtendedModel)] == ["batch_vars", "label"]
+        assert [name for name, _ in _gate_plan(MultiConditionModel)] == ["batch_vars"]
+        with pytest.raises(ValidationError, match="label"):
+            ExtendedModel(entity_type="protein")
+        assert MultiConditionModel(entity_type="protein").batch_vars is None
@@ -0,0 +1,81 @@
+import pytest
+
+from field_utils.dataset_index import DatasetIndex
+
+
+def _catalog():
+    return [
+        {"id": "a", "type": "INTENSITY", "state": "COMPLETED", "entityType": "protein"},
+        {"id": "b", "type": "INTENSITY", "state": "PROCESSING", "entityType": "gene"},
+        {"id": "c", "type": "PAIRWISE", "state": "COMPLETED", "entityType": "protein"},
+        {"name": "no id"},
+        "not a dict",
+    ]
+
+
+class TestDatasetIndex:
+    def test_build(self):
+        index = DatasetIndex(_catalog())
+        assert len(index) == 3
+        assert "a" in index and "z" not in index
+        assert index.get("c")["type"] == "PAIRWISE"
+        assert index.get("z") is None
+
+    def test_lookups(self):
+        index = DatasetIndex(_catalog())
+        assert index.of_type("INTENSITY") == {"a", "b"}
+        assert index.of_entity_type("protein") == {"a", "c"}
+        assert index.completed == {"a", "c"}
+        assert index.has_type("a", "INTENSITY")
+        assert not index.has_type("c", "INTENSITY")
+        assert index.has_entity_type("b", "gene")
+        assert index.is_completed("a")
+        assert not index.is_completed("b")
+
+    def test_add_replaces_existing(self):
+        index = DatasetIndex(_catalog())
+        index.add({"id": "a", "type": "ANOVA", "state": "FAILED"})
+        assert len(index) == 3
+        assert index.of_type("INTENSITY") == {"b"}
+        assert index.of_type("ANOVA") == {"a"}
+        assert not index.is_completed("a")
+        assert index.of_entity_type("protein") == {"c"}
+
+    def test_remove(self):
+        index = DatasetIndex(_catalog())
+        index.remove("a")
+        index.remove("missing")
+        assert "a" not in index
+        assert index.of_type("INTENSITY") == {"b"}
+        assert index.completed == {"c"}
+
+    def test_set_state(self):
+        catalog = _catalog()
+        index = DatasetIndex(catalog)
+        index.set_state("b", "COMPLETED")
+        assert index.is_completed("b")
+        assert index.get("b")["state"] == "COMPLETED"
+        # The caller's dict is left untouched.
+        assert catalog[1]["state"] == "PROCESSING"
+        index.set_state("b", "FAILED")
+        assert not index.is_completed("b")
+
+    def test_set_state_unknown(self):
+        with pytest.raises(KeyError):
+            DatasetIndex().set_state("missing", "COMPLETED")
+
+    def test_iterates_datasets(self):
+        assert [d["id"] for d in DatasetIndex(_catalog())] == ["a", "b", "c"]
+
+    def test_unhashable_type_values(self):
+        index = DatasetIndex(_catalog() + [{"id": "d", "type": ["INTENSITY"], "entityType": {"x": 1}}])
+        assert index.has_type("d", ["INTENSITY"])
+        assert not index.has_type("d", "INTENSITY")
+        assert index.of_type(["INTENSITY"]) == {"d"}
+        assert index.of_type("INTENSITY") == {"a", "b"}
+        assert index.of_entity_type({"x": 1}) == {"d"}
+        index.add({"id": "d", "type": "INTENSITY"})
+        assert index.of_type(["INTENSITY"]) == frozenset()
+        assert index.of_type("INTENSITY") == {"a", "b", "d"}
+        index.remove("d")
+        assert index.of_entity_type({"x": 1}) == frozenset()
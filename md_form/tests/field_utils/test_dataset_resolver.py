@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+
+import field_utils.dataset_resolver as dataset_resolver
+import field_utils.form_validator as form_validator
+from field_utils.dataset_resolver import CachingDatasetResolver, InMemoryDatasetResolver
+from field_utils.form_validator import is_valid_form, validate_form, validate_form_async
+from field_utils.validation_session import ValidationSession
+
+catalog = [
+    {"id": "ds1", "type": "INTENSITY", "state": "COMPLETED"},
+    {"id": "ds2", "type": "PAIRWISE", "state": "COMPLETED"},
+    {"id": "ds3", "type": "INTENSITY", "state": "PROCESSING"},
+]
+
+definition = {
+    "properties": {
+        "input_datasets": {"fieldType": "Datasets", "parameters": {"type": "INTENSITY"}},
+        "comparison": {"fieldType": "Datasets", "parameters": {"type": "PAIRWISE"}},
+        "name": {"fieldType": "String"},
+    }
+}
+
+
+def _errors(result):
+    return [(e.field, e.message) for e in result.errors]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResolverValidation:
+    def test_results_match_full_catalog(self):
+        for data in (
+            {"input_datasets": ["ds1"], "comparison": "ds2"},
+            {"input_datasets": ["ds3", "missing"], "comparison": [{"id": "ds1"}]},
+            {},
+        ):
+            resolver = InMemoryDatasetResolver(catalog)
+            assert _errors(validate_form(definition, data, datasets=resolver)) == _errors(
+                validate_form(definition, data, datasets=catalog)
+            )
+
+    def test_selected_ids_fetched_in_one_batch(self):
+        resolver = InMemoryDatasetResolver(catalog)
+        validate_form(definition, {"input_datasets": ["ds1", "ds3"], "comparison": "ds2"}, datasets=resolver)
+        assert len(resolver.fetches) == 1
+        assert sorted(resolver.fetches[0]) == ["ds1", "ds2", "ds3"]
+
+    def test_no_fetch_without_selection(self):
+        resolver = InMemoryDatasetResolver(catalog)
+        assert validate_form(definition, {"name": "x"}, datasets=resolver).is_valid
+        assert resolver.fetches == []
+
+    def test_is_valid_form_with_resolver(self):
+        resolver = InMemoryDatasetResolver(catalog)
+        assert is_valid_form(definition, {"input_datasets": ["ds1"]}, datasets=resolver)
+        assert not is_valid_form(definition, {"input_datasets": ["ds2"]}, datasets=resolver)
+
+    def test_async_variant(self):
+        resolver = InMemoryDatasetResolver(catalog)
+        result = asyncio.run(validate_form_async(definition, {"input_datasets": ["ds3"]}, datasets=resolver))
+        assert _errors(result) == [
+            ("input_datasets", "dataset 'ds3' must be in state 'COMPLETED', not 'PROCESSING'"),
+        ]
+
+    def test_async_fetch(self):
+        calls = []
+
+        async def afetch(ids):
+            calls.append(sorted(ids))
+            return [d for d in catalog if d["id"] in ids]
+
+        resolver = CachingDatasetResolver(afetch=afetch)
+        data = {"input_datasets": ["ds1"], "comparison": ["ds2"]}
+        assert asyncio.run(validate_form_async(definition, data, datasets=resolver)).is_valid
+        assert asyncio.run(validate_form_async(definition, data, datasets=resolver)).is_valid
+        assert calls == [["ds1", "ds2"]]
+        with pytest.raises(TypeError):
+            validate_form(definition, {"input_datasets": ["ds3"]}, datasets=resolver)
+
+    def test_async_validates_the_compiled_form(self, monkeypatch):
+        seen = []
+        validate = form_validator.validate_form
+
+        def spy(form, *args, **kwargs):
+            seen.append(form)
+            return validate(form, *args, **kwargs)
+
+        monkeypatch.setattr(form_validator, "validate_form", spy)
+        resolver = InMemoryDatasetResolver(catalog)
+        assert asyncio.run(validate_form_async(definition, {"input_datasets": ["ds1"]}, datasets=resolver)).is_valid
+        assert len(seen) == 1 and isinstance(seen[0], form_validator.CompiledForm)
+
+    def test_session_with_resolver(self):
+        resolver = InMemoryDatasetResolver(catalog)
+        session = ValidationSession(definition, resolver)
+        assert session.result.is_valid
+        result = session.update("input_datasets", ["ds2"])
+        assert _errors(result) == [
+            ("input_datasets", "dataset 'ds2' must be of type 'INTENSITY', not 'PAIRWISE'"),
+        ]
+
+
+class TestCachingDatasetResolver:
+    def test_requires_a_fetch(self):
+        with pytest.raises(ValueError):
+            CachingDatasetResolver()
+
+    def test_answers_cached_until_ttl(self):
+        clock = FakeClock()
+        resolver = InMemoryDatasetResolver(catalog, ttl=10, clock=clock)
+        assert resolver.resolve({"ds1", "nope"}).get("ds1") is not None
+        resolver.resolve({"ds1", "nope"})
+        assert len(resolver.fetches) == 1
+
+        clock.now = 5
+        resolver.resolve({"ds1", "ds2"})
+        assert resolver.fetches[1] == ["ds2"]
+
+        clock.now = 11
+        resolver.resolve({"ds1", "ds2"})
+        assert resolver.fetches[2] == ["ds1"]
+
+    def test_missing_ids_cached(self):
+        resolver = InMemoryDatasetResolver(catalog)
+        assert "nope" not in resolver.resolve({"nope"})
+        assert "nope" not in resolver.resolve({"nope"})
+        assert resolver.fetches == [["nope"]]
+
+    def test_invalidate(self):
+        resolver = InMemoryDatasetResolver(catalog)
+        resolver.resolve({"ds1", "ds2"})
+        resolver.invalidate(["ds1"])
+        resolver.resolve({"ds1", "ds2"})
+        assert resolver.fetches[-1] == ["ds1"]
+        resolver.invalidate()
+        resolver.resolve({"ds2"})
+        assert resolver.fetches[-1] == ["ds2"]
+
+    def test_expired_entries_evicted(self, monkeypatch):
+        monkeypatch.setattr(dataset_resolver, "_MIN_PRUNE_SIZE", 2)
+        clock = FakeClock()
+        resolver = InMemoryDatasetResolver(catalog, ttl=10, clock=clock)
+        resolver.resolve({"ds1", "ds2"})
+        clock.now = 11
+        resolver.resolve({"ds3"})
+        assert set(resolver._cache) == {"ds3"}
+        clock.now = 12
+        resolver.resolve({"nope"})
+        assert set(resolver._cache) == {"ds3", "nope"}
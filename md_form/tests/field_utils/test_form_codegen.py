@@ -0,0 +1,183 @@
+import json
+import os
+import random
+import traceback
+
+import pytest
+
+from field_utils.dataset_resolver import InMemoryDatasetResolver
+from field_utils.form_codegen import compile_form_code, definition_fingerprint
+from field_utils.form_validator import FieldError, FormValidationError, compile_form, validate_form
+from field_utils.rule_registry import register_rule, unregister_rule
+from field_utils.validation_profile import ValidationProfile
+
+# DEFINITION carries a rule the registry doesn't know, on purpose.
+pytestmark = pytest.mark.filterwarnings("ignore:Skipping rules the registry doesn't know")
+
+TUTORIAL_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+    "tutorial",
+)
+
+OPTIONS = [{"name": v, "value": v} for v in "abcdefghij"]
+
+DEFINITION = {"properties": {
+    "mode": {"fieldType": "Select", "parameters": {"options": ["a", "b", None, 1.5]},
+             "rules": [{"name": "is_required"}]},
+    "letters": {"fieldType": "Multiple", "parameters": {"options": OPTIONS}},
+    "level": {"fieldType": "Number", "parameters": {"min": 0, "max": 10.5},
+              "when": {"operator": "and", "conditions": [{"property": "mode", "equals": "a"},
+                                                         {"property": "mode", "is_present": True}]}},
+    "label": {"fieldType": "String", "when": {"property": "mode", "equals": "a"},
+              "rules": [{"name": "is_required"}, {"name": "is_not_equal_to_value", "parameters": {"value": "x"}},
+                        {"name": "is_equal_to_value_from_field", "parameters": {"field": "label_copy"}}]},
+    "label_copy": {"fieldType": "String", "rules": {"name": "is_equal_to_value", "parameters": {"value": ["x"]}}},
+    "method": {"fieldType": "String", "default": "none", "parameters": {"options": [
+        {"name": "none", "value": "none"},
+        {"name": "ptm", "value": "ptm", "when": {"property": "mode", "equals": "b"}},
+    ]}},
+    "db": {"fieldType": "String", "parameters": {"options": {
+        "ref": "mode", "cases": {"a": [{"name": "go", "value": "go"}], "b": ["kegg"]}}}},
+    "tags": {"fieldType": "String", "when": {"property": "letters", "contains": "a"},
+             "rules": [{"name": "is_not_included_in_values_from_field", "parameters": {"field": "letters"}},
+                       {"name": "is_future_rule"}]},
+    "flag": {"fieldType": "Boolean", "default": False},
+    "condition_column": {"fieldType": "DatasetSampleMetadata"},
+    "design": {"fieldType": "SampleMetadataTable", "rules": [
+        {"name": "has_unique_column_values_in_table", "parameters": {"column": "sample_name"}},
+        {"name": "has_multiple_column_values_from_field_in_table", "parameters": {"values": "condition_column"}},
+    ]},
+    "inputs": {"fieldType": "Datasets", "parameters": {"type": "INTENSITY"}},
+    "never": {"fieldType": "String", "when": {"operator": "xor", "conditions": []},
+              "rules": [{"name": "is_required"}]},
+}}
+
+DATASETS = [
+    {"id": "ds1", "type": "INTENSITY", "state": "COMPLETED"},
+    {"id": "ds2", "type": "PAIRWISE", "state": "FAILED"},
+]
+
+CHOICES = {
+    "mode": ["a", "b", "c", None, 1.5],
+    "letters": [["a", "b"], ["a", "z"], "c", ["q", "r", 1], []],
+    "level": [-1, 5, 11, True, "x", 10.5],
+    "label": ["x", "y", None],
+    "label_copy": ["x", ["x"], "y"],
+    "method": ["none", "ptm", "z"],
+    "db": ["go", "kegg", "x"],
+    "tags": ["a", "q", None],
+    "flag": [True, None],
+    "condition_column": ["condition", "missing"],
+    "design": [{"sample_name": ["s1", "s2"], "condition": ["x", "x"]},
+               {"sample_name": ["s1", "s1"], "condition": ["x", "y"]},
+               {"sample_name": ["s1"], "condition": ["x", "y"]}, "nope"],
+    "inputs": [["ds1"], ["ds2", "ds3"], "ds1"],
+    "extra": [1],
+}
+
+
+def _payloads(count, seed=3):
+    rng = random.Random(seed)
+    return [{key: rng.choice(values) for key, values in CHOICES.items() if rng.random() < 0.7}
+            for _ in range(count)]
+
+
+def _same(generated, definition, data, **kwargs):
+    expected = validate_form(definition, data, **kwargs)
+    result = generated.validate(data, **kwargs)
+    assert result.errors == expected.errors
+    assert [str(e) for e in result.errors] == [str(e) for e in expected.errors]
+    assert result.truncated == expected.truncated
+
+
+class TestCompileFormCode:
+    @pytest.mark.parametrize("max_errors", [None, 1, 2, 5])
+    @pytest.mark.parametrize("allow_unknown", [True, False])
+    def test_matches_validate_form(self, max_errors, allow_unknown):
+        generated = compile_form_code(DEFINITION)
+        for data in _payloads(150):
+            _same(generated, DEFINITION, data, datasets=DATASETS, max_errors=max_errors, allow_unknown=allow_unknown)
+        _same(generated, DEFINITION, {}, max_errors=max_errors, allow_unknown=allow_unknown)
+
+    def test_tutorial_forms(self):
+        for filename in sorted(os.listdir(TUTORIAL_DIR)):
+            if not filename.endswith(".json"):
+                continue
+            with open(os.path.join(TUTORIAL_DIR, filename)) as f:
+                definition = json.load(f)
+            generated = compile_form_code(definition)
+            for data in [{}] + _payloads(20):
+                _same(generated, definition, data, datasets=DATASETS)
+
+    def test_options(self):
+        generated = compile_form_code(DEFINITION)
+        data = {"mode": "a", "label": "y", "label_copy": ["x"], "datasets": [],
+                "inputs": ["ds3"], "flag": True, "method": "none"}
+        _same(generated, DEFINITION, data, datasets=InMemoryDatasetResolver(DATASETS), fail_fast=True)
+        _same(generated, DEFINITION, data, datasets=None)
+        with pytest.raises(FormValidationError):
+            generated.validate({"mode": "zz"}, raise_on_error=True)
+        assert generated.is_valid({"mode": "zz"}) is False
+        assert [e.code for e in generated.validate([1]).errors] == ["invalid_data"]
+        with pytest.raises(ValueError):
+            generated.validate({}, max_errors=0)
+
+    def test_profile_falls_back_to_validate_form(self):
+        profile = ValidationProfile()
+        generated = compile_form_code(DEFINITION)
+        _same(generated, DEFINITION, {"mode": "a"}, profile=profile)
+        assert profile.calls == 2
+
+    def test_source_is_inspectable(self):
+        generated = compile_form_code(DEFINITION)
+        assert generated.source.startswith(f"# Validation code generated by md_form for form {generated.fingerprint}.")
+        assert "(data.get('mode') == 'a')" in generated.source
+        assert "if value > 10.5:" in generated.source
+        compile(generated.source, "<check>", "exec")
+
+    def test_tracebacks_show_generated_lines(self):
+        @register_rule("explodes")
+        def factory(params):
+            def check(name, value, ctx):
+                raise RuntimeError("boom")
+            return check
+
+        try:
+            generated = compile_form_code({"x": {"fieldType": "String", "rules": [{"name": "explodes"}]}})
+            with pytest.raises(RuntimeError) as info:
+                generated.validate({"x": 1})
+            assert "error = _k" in "".join(traceback.format_tb(info.value.__traceback__))
+        finally:
+            unregister_rule("explodes")
+
+    def test_cached_by_fingerprint(self):
+        reordered = {"properties": dict(reversed(list(DEFINITION["properties"].items())))}
+        assert definition_fingerprint(reordered) != definition_fingerprint(DEFINITION)
+        copy = json.loads(json.dumps(DEFINITION))
+        assert compile_form_code(copy) is compile_form_code(DEFINITION)
+        assert compile_form_code(compile_form(DEFINITION)) is compile_form_code(DEFINITION)
+
+    def test_tuple_and_list_values_not_conflated(self):
+        def gated(expected):
+            return {"properties": {
+                "mode": {"fieldType": "String"},
+                "level": {"fieldType": "Number", "rules": [{"name": "is_required"}],
+                          "when": {"property": "mode", "equals": expected}},
+            }}
+
+        as_list, as_tuple = gated(["a"]), gated(("a",))
+        assert definition_fingerprint(as_list) != definition_fingerprint(as_tuple)
+        assert compile_form_code(as_list) is not compile_form_code(as_tuple)
+        for definition in (as_list, as_tuple):
+            _same(compile_form_code(definition), definition, {"mode": ["a"]})
+
+    def test_registry_changes_invalidate_cache(self):
+        definition = {"x": {"fieldType": "String", "rules": [{"name": "is_shouting"}]}}
+        assert compile_form_code(definition).validate({"x": "hi"}).is_valid
+        register_rule("is_shouting", lambda params: (
+            lambda name, value, ctx: None if value.isupper() else FieldError(name, "not_shouting")))
+        try:
+            assert [e.code for e in compile_form_code(definition).validate({"x": "hi"}).errors] == ["not_shouting"]
+        finally:
+            unregister_rule("is_shouting")
+        assert compile_form_code(definition).validate({"x": "hi"}).is_valid
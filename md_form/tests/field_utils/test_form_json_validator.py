@@ -0,0 +1,106 @@
+import io
+import json
+
+import pytest
+
+from field_utils.form_json_validator import validate_form_json
+from field_utils.form_validator import FormValidationError, validate_form
+from field_utils.table_checks import ColumnSummary
+
+
+DEFINITION = {"properties": {
+    "mode": {"fieldType": "String", "rules": [{"name": "is_required"}], "parameters": {"options": ["a", "b"]}},
+    "threshold": {"fieldType": "Number", "parameters": {"min": 0, "max": 1},
+                  "when": {"property": "mode", "equals": "a"}, "rules": [{"name": "is_required"}]},
+    "condition_column": {"fieldType": "DatasetSampleMetadata"},
+    "control_variables": {"fieldType": "PairwiseControlVariables"},
+    "design": {"fieldType": "SampleMetadataTable", "rules": [
+        {"name": "has_unique_column_values_in_table", "parameters": {"column": "sample_name"}},
+        {"name": "has_multiple_column_values_from_field_in_table", "parameters": {"values": "condition_column"}},
+        {"name": "is_all_unique_in_column_from_field",
+         "parameters": {"field": "control_variables", "values": "control_variables[].column"}},
+    ]},
+}}
+
+PAYLOADS = [
+    {"mode": "a", "threshold": 0.5, "condition_column": "condition",
+     "design": {"sample_name": ["s1", "s2", "s3"], "condition": ["x", "y", "x"]}},
+    {"mode": "a", "threshold": 1.5e0, "condition_column": "condition",
+     "design": {"sample_name": ["s1", "s1", None, None], "condition": [1, 1.0, True, 1]}},
+    {"mode": "b", "control_variables": [{"column": "batch"}], "condition_column": "condition",
+     "design": {"condition": [1, 2], "batch": [[1], [1]], "sample_name": [-1e-3, 12345678901234567890]}},
+    {"mode": "c", "design": {"sample_name": [1, 2], "condition": [3]}},
+    {"mode": "a", "design": [["sample_name"], ["s1"]], "extra": {"big": list(range(50))}},
+    {"design": {"sample_name": [], "other": "scalar"}, "condition_column": "missing"},
+    {},
+]
+
+
+def _messages(result):
+    return [str(error) for error in result.errors]
+
+
+class TestValidateFormJson:
+    @pytest.mark.parametrize("payload", PAYLOADS)
+    @pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+    def test_matches_validate_form(self, payload, chunk_size):
+        body = json.dumps(payload, indent=1)
+        expected = validate_form(DEFINITION, json.loads(body), allow_unknown=False)
+        for source in (body.encode(), io.BytesIO(body.encode()), io.StringIO(body), body):
+            result = validate_form_json(DEFINITION, source, chunk_size=chunk_size, allow_unknown=False)
+            assert _messages(result) == _messages(expected)
+
+    def test_streamed_table_keeps_only_summaries(self):
+        from field_utils.form_json_validator import _Reader, _read_submission
+        from field_utils.form_validator import compile_form
+
+        body = json.dumps(PAYLOADS[0])
+        data = _read_submission(compile_form(DEFINITION), _Reader(body, 16), early=False)
+        assert all(isinstance(col, ColumnSummary) for col in data["design"].values())
+        assert data["mode"] == "a"
+
+    def test_table_read_by_another_field_is_parsed_in_full(self):
+        from field_utils.form_json_validator import _streamed_tables
+        from field_utils.form_validator import compile_form
+
+        definition = {"properties": {**DEFINITION["properties"], "pick": {
+            "fieldType": "String", "rules": [{"name": "is_not_included_in_values_from_field",
+                                              "parameters": {"field": "design", "values": "condition"}}]}}}
+        assert "design" not in _streamed_tables(compile_form(definition))
+        payload = {"design": {"sample_name": ["a"], "condition": ["x"]}, "pick": "x"}
+        assert _messages(validate_form_json(definition, json.dumps(payload))) == \
+            _messages(validate_form(definition, payload))
+
+    def test_fail_fast_stops_reading(self):
+        class Stream(io.BytesIO):
+            def __init__(self, data):
+                super().__init__(data)
+                self.reads = 0
+
+            def read(self, size=-1):
+                self.reads += 1
+                return super().read(size)
+
+        body = json.dumps({"mode": "z", "design": {"sample_name": list(range(100_000))}}).encode()
+        stream = Stream(body)
+        result = validate_form_json(DEFINITION, stream, chunk_size=64, fail_fast=True)
+        assert _messages(result) == ["mode: 'z' is not one of the allowed options ['a', 'b']"]
+        assert result.truncated
+        assert stream.tell() < 1000
+
+    def test_fail_fast_waits_for_gate_properties(self):
+        # threshold is gated on mode, which comes later in the stream.
+        body = json.dumps({"threshold": 5, "mode": "b"})
+        assert validate_form_json(DEFINITION, body, fail_fast=True).is_valid
+        body = json.dumps({"threshold": 5, "mode": "a"})
+        assert _messages(validate_form_json(DEFINITION, body, fail_fast=True)) == ["threshold: must be <= 1"]
+
+    @pytest.mark.parametrize("body", ['{"mode": "a",}', '{"mode": "a"} x', '{"mode": ', "", '{1: 2}'])
+    def test_invalid_json(self, body):
+        result = validate_form_json(DEFINITION, body)
+        assert [e.code for e in result.errors] == ["invalid_json"]
+        with pytest.raises(FormValidationError):
+            validate_form_json(DEFINITION, body, raise_on_error=True)
+
+    def test_non_object_submission(self):
+        assert _messages(validate_form_json(DEFINITION, b"[1, 2]")) == ["<root>: data must be an object"]
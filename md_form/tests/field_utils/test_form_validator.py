@@ -1,10 +1,19 @@
+import array
+import copy
 import json
 import os
+import pickle
 
+import numpy as np
+import pandas as pd
 import pytest
 
+from field_utils.dataset_index import DatasetIndex
 from field_utils.form_validator import (
+    CompiledForm,
+    FieldError,
     FormValidationError,
+    compile_form,
     is_valid_form,
     validate_form,
 )
@@ -243,6 +252,215 @@ class TestValueRules:
         ).is_valid
 
 
+class TestColumnFromFieldRules:
+    definition = {"properties": {
+        "condition_column": {"fieldType": "String"},
+        "control_variables": {"fieldType": "PairwiseControlVariables"},
+        "design": {
+            "fieldType": "SampleMetadataTable",
+            "rules": [
+                {"name": "is_all_unique_in_column_from_field", "parameters": {"values": "condition_column"}},
+                {"name": "has_multiple_column_values_from_field_in_table",
+                 "parameters": {"field": "control_variables", "values": "control_variables[].column"}},
+            ],
+        },
+    }}
+
+    def test_unique_column_named_by_field(self):
+        data = {"condition_column": "sample", "design": {"sample": ["a", "b", "a"]}}
+        assert _errors(validate_form(self.definition, data)) == {
+            ("design", "column 'sample' must contain unique values (duplicates: 'a' at rows 0, 2)"),
+        }
+        data["design"] = {"sample": ["a", "b", "c"]}
+        assert validate_form(self.definition, data).is_valid
+
+    def test_multiple_values_in_each_listed_column(self):
+        data = {
+            "control_variables": [{"column": "batch"}, {"column": "sex"}],
+            "design": {"batch": [1, 2, 1], "sex": ["F", "F", "F"]},
+        }
+        assert _errors(validate_form(self.definition, data)) == {
+            ("design", "column 'sex' must contain more than one distinct value"),
+        }
+        data["design"] = {"batch": [1, 2, 1], "sex": ["F", "M", "F"]}
+        assert validate_form(self.definition, data).is_valid
+
+    def test_unset_referenced_field_skips_rule(self):
+        assert validate_form(self.definition, {"design": {"sample": ["a", "a"]}}).is_valid
+
+    def test_missing_column_reported(self):
+        data = {"condition_column": "sample", "design": {"other": [1, 2]}}
+        assert _errors(validate_form(self.definition, data)) == {
+            ("design", "table has no column 'sample' (named by 'condition_column')"),
+        }
+
+    def test_large_columnar_table(self):
+        n = 100_000
+        data = {
+            "condition_column": "sample",
+            "control_variables": [{"column": "batch"}],
+            "design": pd.DataFrame({"sample": np.arange(n), "batch": np.zeros(n)}),
+        }
+        assert _errors(validate_form(self.definition, data)) == {
+            ("design", "column 'batch' must contain more than one distinct value"),
+        }
+        data["design"]["batch"] = np.arange(n) % 3
+        assert validate_form(self.definition, data).is_valid
+
+    def test_referenced_field_is_a_dependency(self):
+        assert "design" in compile_form(self.definition).dependents["control_variables"]
+        assert "design" in compile_form(self.definition).dependents["condition_column"]
+
+
+class TestTableRules:
+    definition = {"properties": {"design": {
+        "fieldType": "SampleMetadataTable",
+        "rules": [{"name": "has_unique_column_values_in_table", "parameters": {"column": "sample_name"}}],
+    }}}
+
+    def test_large_table_duplicates_reported_with_rows(self):
+        names = [f"S{i}" for i in range(5000)]
+        names[4000] = "S7"
+        names[4999] = "S7"
+        table = {"sample_name": names, "condition": ["c"] * 5000}
+        result = validate_form(self.definition, {"design": table})
+        assert _errors(result) == {(
+            "design",
+            "column 'sample_name' must contain unique values (duplicates: 'S7' at rows 7, 4000, 4999)",
+        )}
+        assert not is_valid_form(self.definition, {"design": table})
+
+    def test_large_unique_table(self):
+        table = {"sample_name": [f"S{i}" for i in range(5000)], "condition": ["c"] * 5000}
+        assert validate_form(self.definition, {"design": table}).is_valid
+
+    def test_dataframe_table(self):
+        frame = pd.DataFrame({"sample_name": ["a", "b", "a"], "condition": ["x", "y", "z"]})
+        result = validate_form(self.definition, {"design": frame})
+        assert _errors(result) == {(
+            "design", "column 'sample_name' must contain unique values (duplicates: 'a' at rows 0, 2)",
+        )}
+        assert validate_form(self.definition, {"design": frame.iloc[:2]}).is_valid
+
+    @pytest.mark.parametrize("rows", [3, 3000])
+    def test_numeric_dataframe_duplicates_are_python_values(self, rows):
+        frame = pd.DataFrame({"sample_name": np.arange(rows), "condition": ["x"] * rows})
+        frame.loc[2, "sample_name"] = 1
+        result = validate_form(self.definition, {"design": frame})
+        assert _errors(result) == {(
+            "design", "column 'sample_name' must contain unique values (duplicates: 1 at rows 1, 2)",
+        )}
+        assert json.loads(json.dumps(result.to_dicts()))[0]["params"]["duplicates"] == [[1, [1, 2]]]
+
+    def test_dict_of_arrays_table(self):
+        table = {"sample_name": np.array([1, 2, 3]), "dose": array.array("d", [0.1, 0.2, 0.3]),
+                 "batch": memoryview(array.array("i", [1, 1, 2])), "condition": pd.Series(["a", "b", "c"])}
+        assert validate_form(self.definition, {"design": table}).is_valid
+        table["sample_name"] = np.array([1, 2, 1])
+        assert not validate_form(self.definition, {"design": table}).is_valid
+
+    def test_columnar_uneven_columns(self):
+        table = {"sample_name": np.array([1, 2, 3]), "condition": np.array(["a", "b"])}
+        result = validate_form(self.definition, {"design": table})
+        assert ("design", "table columns must all have the same length") in _errors(result)
+
+    def test_non_column_values_rejected(self):
+        table = {"sample_name": np.zeros((2, 2)), "condition": ("a", "b")}
+        result = validate_form(self.definition, {"design": table})
+        assert ("design", "table columns must be lists") in _errors(result)
+
+    def test_referenced_values_from_dataframe(self):
+        d = {"properties": {
+            "table": {"fieldType": "SampleMetadataTable"},
+            "pick": {"fieldType": "String",
+                     "rules": [{"name": "is_not_included_in_values_from_field",
+                                "parameters": {"field": "table", "values": "column"}}]},
+        }}
+        frame = pd.DataFrame({"column": ["a", "b"]})
+        assert validate_form(d, {"table": frame, "pick": "c"}).is_valid
+        assert not validate_form(d, {"table": frame, "pick": "a"}).is_valid
+
+
+class TestReferencedValues:
+    definition = {"properties": {
+        "control_variables": {"fieldType": "PairwiseControlVariables"},
+        **{
+            f"pick_{i}": {"fieldType": "String",
+                          "rules": [{"name": "is_not_included_in_values_from_field",
+                                     "parameters": {"field": "control_variables",
+                                                    "values": "control_variables[].column"}}]}
+            for i in range(5)
+        },
+    }}
+
+    def test_built_once_per_validation(self):
+        data = _CountingDict(control_variables=[{"column": f"c{i}"} for i in range(1000)],
+                             **{f"pick_{i}": f"x{i}" for i in range(5)})
+        assert validate_form(self.definition, data).is_valid
+        # One lookup for the field's own check, one to build the shared set.
+        assert data.lookups["control_variables"] == 2
+
+    def test_path_from_field(self):
+        data = {"control_variables": [{"column": "batch"}], "pick_0": "batch"}
+        assert _errors(validate_form(self.definition, data)) == {
+            ("pick_0", "must not be one of the values in 'control_variables'"),
+        }
+
+    def test_unhashable_values(self):
+        data = {"control_variables": [{"column": ["a"]}, {"column": "b"}], "pick_0": ["a"], "pick_1": "b"}
+        assert {e.field for e in validate_form(self.definition, data).errors} == {"pick_0", "pick_1"}
+        data.update(pick_0=["b"], pick_1="a")
+        assert validate_form(self.definition, data).is_valid
+
+    def test_equal_across_types(self):
+        data = {"control_variables": [{"column": 1}], "pick_0": 1.0, "pick_1": True}
+        assert {e.field for e in validate_form(self.definition, data).errors} == {"pick_0", "pick_1"}
+
+
+class TestFieldError:
+    definition = {"properties": {
+        "level": {"fieldType": "Select", "parameters": {"options": ["low", "high"], "max": 3}},
+        "name": {"fieldType": "String", "rules": [{"name": "is_required"}]},
+    }}
+
+    def test_code_and_params(self):
+        result = validate_form(self.definition, {"level": "mid"})
+        assert [(e.field, e.code, e.params) for e in result.errors] == [
+            ("level", "not_an_option", {"value": "mid", "allowed": ["low", "high"]}),
+            ("name", "required", None),
+        ]
+
+    def test_to_dicts(self):
+        assert validate_form(self.definition, {"level": "mid"}).to_dicts() == [
+            {"field": "level", "code": "not_an_option", "params": {"value": "mid", "allowed": ["low", "high"]},
+             "message": "'mid' is not one of the allowed options ['low', 'high']"},
+            {"field": "name", "code": "required", "params": {}, "message": "is required"},
+        ]
+        assert validate_form(self.definition, {"level": "low", "name": "x"}).to_dicts() == []
+
+    def test_slotted_and_comparable(self):
+        error = FieldError("name", "required")
+        assert not hasattr(error, "__dict__")
+        assert error == FieldError("name", "required", {})
+        assert error != FieldError("name", "below_min", {"min": 1})
+        assert len({error, FieldError("name", "required")}) == 1
+        assert str(error) == "name: is required"
+
+    def test_read_only(self):
+        error = FieldError("name", "below_min", {"min": 1})
+        with pytest.raises(AttributeError):
+            error.field = "other"
+        with pytest.raises(AttributeError):
+            del error.code
+        assert (error.field, error.code) == ("name", "below_min")
+        copied = pickle.loads(pickle.dumps(error))
+        assert copied == error and copied.params == {"min": 1}
+        assert copy.copy(error) == error
+
+    def test_unknown_code_is_its_own_message(self):
+        assert FieldError("x", "must be a prime").message == "must be a prime"
+
+
 class TestUnknownFields:
     definition = {"properties": {"name": {"fieldType": "String"}}}
 
@@ -284,6 +502,209 @@ class TestApiSurface:
         assert validate_form(d, {"name": "x"}).is_valid
 
 
+class TestDefinitionDicts:
+    definition = {"properties": {
+        "mode": {"fieldType": "String"},
+        "level": {"fieldType": "Number", "rules": [{"name": "is_required"}],
+                  "when": {"operator": "or", "conditions": [{"property": "mode", "equals": "a"},
+                                                            {"property": "mode", "contains": "a"}]}},
+    }}
+
+    def test_dict_and_compiled_form_agree(self):
+        form = compile_form(self.definition)
+        for data in ({}, {"mode": "a"}, {"mode": ("a",)}, {"mode": ["a"], "level": 1}, {"mode": "b"}):
+            assert validate_form(self.definition, data) == validate_form(form, data)
+            assert is_valid_form(self.definition, data) == is_valid_form(form, data)
+
+    def test_definition_edited_in_place_is_revalidated(self):
+        definition = {"properties": {"level": {"fieldType": "String", "parameters": {"options": ["a"]}}}}
+        assert not validate_form(definition, {"level": "b"}).is_valid
+        definition["properties"]["level"]["parameters"]["options"].append("b")
+        assert validate_form(definition, {"level": "b"}).is_valid
+
+    def test_registering_a_rule_applies_to_dicts(self):
+        from field_utils.rule_registry import register_rule, unregister_rule
+
+        definition = {"properties": {"name": {"fieldType": "String", "rules": [{"name": "is_never_valid"}]}}}
+        with pytest.warns(UserWarning, match="'is_never_valid' on 'name'"):
+            assert validate_form(definition, {"name": "x"}).is_valid
+        register_rule("is_never_valid", lambda params: lambda name, value, ctx: FieldError(name, "never_valid"))
+        try:
+            assert not validate_form(definition, {"name": "x"}).is_valid
+        finally:
+            unregister_rule("is_never_valid")
+        with pytest.warns(UserWarning):
+            assert validate_form(definition, {"name": "x"}).is_valid
+
+
+class TestDatasetIndex:
+    definition = {
+        "properties": {
+            "input_datasets": {"fieldType": "Datasets",
+                               "parameters": {"type": "INTENSITY", "entityType": "protein"}},
+            "other": {"fieldType": "Datasets", "parameters": {"entityType": {"ref": "entity_type"}}},
+        }
+    }
+    catalog = [
+        {"id": "ds1", "type": "INTENSITY", "state": "COMPLETED", "entityType": "protein"},
+        {"id": "ds2", "type": "INTENSITY", "state": "COMPLETED", "entityType": "gene"},
+        {"id": "ds3", "type": "INTENSITY", "state": "PROCESSING", "entityType": "protein"},
+    ]
+
+    def test_index_accepted_in_place_of_list(self):
+        index = DatasetIndex(self.catalog)
+        for data in ({"input_datasets": ["ds1"]}, {"input_datasets": ["ds2", "ds3", "ds4"]}):
+            assert _errors(validate_form(self.definition, data, datasets=index)) == _errors(
+                validate_form(self.definition, data, datasets=self.catalog)
+            )
+        assert is_valid_form(self.definition, {"input_datasets": "ds1"}, datasets=index)
+
+    def test_entity_type_not_checked(self):
+        # parameters.entityType filters what the UI offers; it isn't validated.
+        assert validate_form(self.definition, {"input_datasets": ["ds2"]}, datasets=self.catalog).is_valid
+        catalog = [{"id": "ds4", "type": "INTENSITY", "state": "COMPLETED"}]
+        for datasets in (catalog, DatasetIndex(catalog)):
+            assert validate_form(self.definition, {"input_datasets": ["ds4"]}, datasets=datasets).is_valid
+        assert validate_form(self.definition, {"other": ["ds2"]}, datasets=self.catalog).is_valid
+
+    def test_unhashable_type_values(self):
+        catalog = [{"id": "ds5", "type": ["INTENSITY"], "state": "COMPLETED"}]
+        for datasets in (catalog, DatasetIndex(catalog)):
+            result = validate_form(self.definition, {"input_datasets": ["ds5"]}, datasets=datasets)
+            assert _errors(result) == {
+                ("input_datasets", "dataset 'ds5' must be of type 'INTENSITY', not ['INTENSITY']"),
+            }
+
+    def test_index_updates_seen_by_later_calls(self):
+        index = DatasetIndex(self.catalog)
+        assert not is_valid_form(self.definition, {"input_datasets": ["ds3"]}, datasets=index)
+        index.set_state("ds3", "COMPLETED")
+        assert is_valid_form(self.definition, {"input_datasets": ["ds3"]}, datasets=index)
+        index.remove("ds3")
+        assert not is_valid_form(self.definition, {"input_datasets": ["ds3"]}, datasets=index)
+
+
+class TestErrorBudget:
+    definition = {
+        "properties": {
+            "a": {"fieldType": "String", "rules": [{"name": "is_required"}]},
+            "b": {"fieldType": "String", "rules": [{"name": "is_required"}]},
+            "tags": {
+                "fieldType": "Multiple",
+                "parameters": {"options": [{"name": str(i), "value": str(i)} for i in range(1000)]},
+            },
+        }
+    }
+
+    def test_full_run_reports_everything(self):
+        result = validate_form(self.definition, {"tags": ["x", "y"]})
+        assert len(result.errors) == 4
+        assert not result.truncated
+
+    def test_max_errors_stops_early(self):
+        result = validate_form(self.definition, {"tags": ["x", "y"]}, max_errors=3)
+        assert [e.field for e in result.errors] == ["a", "b", "tags"]
+        assert result.truncated
+
+    def test_max_errors_within_a_field(self):
+        result = validate_form(self.definition, {"a": "1", "b": "1", "tags": ["x", "y", "z"]}, max_errors=2)
+        assert len(result.errors) == 2
+        assert result.truncated
+
+    def test_fail_fast(self):
+        result = validate_form(self.definition, {"tags": ["x"]}, fail_fast=True)
+        assert _errors(result) == {("a", "is required")}
+        assert result.truncated
+        assert not result
+
+    def test_budget_not_reached(self):
+        result = validate_form(self.definition, {"a": "1", "b": "1"}, max_errors=3)
+        assert result.is_valid
+        assert not result.truncated
+
+    def test_invalid_budget(self):
+        with pytest.raises(ValueError):
+            validate_form(self.definition, {}, max_errors=0)
+
+    def test_fail_fast_reaches_dataset_and_unknown_checks(self):
+        d = {"properties": {"ds": {"fieldType": "Datasets"}}}
+        result = validate_form(d, {"ds": ["missing"]}, datasets=[], fail_fast=True)
+        assert _errors(result) == {("ds", "dataset 'missing' is not in the provided datasets")}
+        result = validate_form(d, {"x": 1, "y": 2}, datasets=[], fail_fast=True, allow_unknown=False)
+        assert [e.field for e in result.errors] == ["x"]
+
+    def test_messages_are_rendered_lazily(self):
+        class Unprintable:
+            def __repr__(self):
+                raise AssertionError("message was formatted")
+
+        d = {"properties": {"x": {"fieldType": "String",
+                                  "parameters": {"options": [{"name": "a", "value": "a"}]}}}}
+        assert is_valid_form(d, {"x": Unprintable()}) is False
+        result = validate_form(d, {"x": Unprintable()})
+        assert [e.code for e in result.errors] == ["not_an_option"]
+        with pytest.raises(AssertionError):
+            str(result.errors[0])
+
+    def test_is_valid_form_accepts_validate_form_options(self):
+        assert is_valid_form(self.definition, {"a": "1", "b": "1", "z": 1}) is True
+        assert is_valid_form(self.definition, {"a": "1", "b": "1", "z": 1}, allow_unknown=False) is False
+        assert is_valid_form(self.definition, {"a": "1", "b": "1"}, fail_fast=False) is True
+        assert is_valid_form(self.definition, "not a dict") is False
+
+
+class _CountingDict(dict):
+    """A data dict that counts lookups per key."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lookups = {}
+
+    def get(self, key, default=None):
+        self.lookups[key] = self.lookups.get(key, 0) + 1
+        return super().get(key, default)
+
+
+_SHARED_GATE = {"property": "input_datasets", "is_present": True}
+
+
+class TestSharedGates:
+    definition = {
+        "properties": {
+            "input_datasets": {"fieldType": "String"},
+            **{
+                f"field_{i}": {"fieldType": "String", "when": dict(_SHARED_GATE),
+                               "rules": [{"name": "is_required"}]}
+                for i in range(20)
+            },
+        }
+    }
+
+    def test_identical_gates_share_one_predicate(self):
+        form = compile_form(self.definition)
+        assert len(form.gates) == 20
+        assert len({id(g) for g in form.gates.values()}) == 1
+
+    def test_shared_gate_evaluated_once_per_data(self):
+        data = _CountingDict(input_datasets="ds1", **{f"field_{i}": "x" for i in range(20)})
+        assert validate_form(compile_form(self.definition), data).is_valid
+        # One lookup from the gate itself, and one per presence check of the field.
+        assert data.lookups["input_datasets"] == 2
+
+    def test_shared_gate_unmet_skips_all_fields(self):
+        assert validate_form(self.definition, {}).is_valid
+        result = validate_form(self.definition, {"input_datasets": "ds1"})
+        assert len(result.errors) == 20
+
+    def test_compiled_form_accepted_and_reused(self):
+        form = compile_form(self.definition)
+        assert isinstance(form, CompiledForm)
+        assert compile_form(form) is form
+        assert validate_form(form, {}).is_valid
+        assert not validate_form(form, {"input_datasets": "ds1"}).is_valid
+        assert is_valid_form(form, {"input_datasets": "ds1", **{f"field_{i}": "x" for i in range(20)}})
+
+
 class TestTutorialForms:
     def _load(self, filename):
         with open(os.path.join(TUTORIAL_DIR, filename)) as f:
@@ -1256,8 +1677,8 @@ class TestDifferentialExpressionExample:
         "filter_threshold_percentage": 0.5,
         "filter_valid_values_logic": "at least one condition",
         "experiment_design": {
-            "sample_name": ["Heart_1", "Heart_2"],
-            "condition": ["Heart", "Heart"],
+            "sample_name": ["Heart_1", "Brain_1"],
+            "condition": ["Heart", "Brain_1ug"],
         },
     }
 
@@ -1383,6 +1804,28 @@ class TestDifferentialExpressionExample:
         result = validate_form(self.definition, bad, datasets=self.datasets)
         assert ("experiment_design", "table columns must all have the same length") in _errors(result)
 
+    def test_experiment_design_single_condition(self):
+        # has_multiple_column_values_from_field_in_table: the column named by
+        # condition_column needs at least two conditions to compare.
+        bad = dict(self.payload)
+        bad["experiment_design"] = {
+            "sample_name": ["Heart_1", "Heart_2"],
+            "condition": ["Heart", "Heart"],
+        }
+        result = validate_form(self.definition, bad, datasets=self.datasets)
+        assert _errors(result) == {
+            ("experiment_design", "column 'condition' must contain more than one distinct value"),
+        }
+
+    def test_experiment_design_missing_control_variable_column(self):
+        bad = dict(self.payload)
+        bad["control_variables"] = [{"column": "batch", "type": "categorical"}]
+        result = validate_form(self.definition, bad, datasets=self.datasets)
+        assert (
+            "experiment_design",
+            "table has no column 'batch' (named by 'control_variables[].column')",
+        ) in _errors(result)
+
     def test_experiment_design_duplicate_sample_names(self):
         # experiment_design declares has_unique_column_values_in_table on the
         # sample_name column, so duplicate sample names are rejected.
@@ -1395,7 +1838,7 @@ class TestDifferentialExpressionExample:
         assert not result.is_valid
         assert (
             "experiment_design",
-            "column 'sample_name' must contain unique values",
+            "column 'sample_name' must contain unique values (duplicates: 'Heart_1' at rows 0, 1)",
         ) in _errors(result)
 
 
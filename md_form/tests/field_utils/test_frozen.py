@@ -0,0 +1,53 @@
+import copy
+import pickle
+
+import pytest
+
+from field_utils.frozen import FrozenDict, FrozenList, freeze, thaw
+
+
+class TestFreeze:
+    def test_nested_containers_frozen(self):
+        value = freeze({"a": [1, {"b": 2}], "c": (3, [4])})
+        assert value == {"a": [1, {"b": 2}], "c": (3, [4])}
+        assert isinstance(value, FrozenDict)
+        assert isinstance(value["a"], FrozenList) and isinstance(value["a"][1], FrozenDict)
+        assert isinstance(value["c"][1], FrozenList)
+
+    def test_frozen_values_returned_as_is(self):
+        value = freeze({"a": [1]})
+        assert freeze(value) is value
+
+    @pytest.mark.parametrize("mutate", [
+        lambda d: d.__setitem__("x", 1),
+        lambda d: d.update(x=1),
+        lambda d: d.pop("a"),
+        lambda d: d.setdefault("x", 1),
+        lambda d: d.clear(),
+        lambda d: d["a"].append(2),
+        lambda d: d["a"].extend([2]),
+        lambda d: d["a"].__setitem__(0, 2),
+        lambda d: d["a"].sort(),
+    ])
+    def test_read_only(self, mutate):
+        with pytest.raises(TypeError):
+            mutate(freeze({"a": [1]}))
+
+    def test_copies_are_plain_and_mutable(self):
+        value = freeze({"a": [1]})
+        for copied in (copy.copy(value), copy.deepcopy(value), pickle.loads(pickle.dumps(value))):
+            assert type(copied) is dict and copied == {"a": [1]}
+        deep = copy.deepcopy(value)
+        deep["a"].append(2)
+        assert type(deep["a"]) is list and value["a"] == [1]
+
+
+class TestThaw:
+    def test_plain_mutable_copy(self):
+        frozen = freeze({"a": [1, {"b": 2}], "c": (3, [4])})
+        thawed = thaw(frozen)
+        assert thawed == frozen
+        assert type(thawed) is dict and type(thawed["a"]) is list and type(thawed["a"][1]) is dict
+        assert type(thawed["c"][1]) is list
+        thawed["a"][1]["b"] = 5
+        assert frozen["a"][1]["b"] == 2
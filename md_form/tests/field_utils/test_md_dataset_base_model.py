@@ -1,4 +1,7 @@
+import pytest
+
 from field_utils.md_dataset_base_model import MdDatasetBaseModel
+from field_utils.frozen import FrozenDict
 from md_form.field_utils import number_field, string_field
 
 
@@ -32,3 +35,106 @@ class TestMdDatasetBaseModel:
         assert inner_def["properties"]["x"]["md-field-order"] == 0
         assert inner_def["properties"]["y"]["md-field-order"] == 1
 
+
+class TestSchemaCache:
+    def test_schema_generated_once(self):
+        class Model(MdDatasetBaseModel):
+            a: int = number_field()
+
+        frozen = Model._frozen_json_schema()
+        assert isinstance(frozen, FrozenDict)
+        assert Model._frozen_json_schema() is frozen
+        assert Model.model_json_schema() == frozen
+
+    def test_returned_schema_is_a_mutable_copy(self):
+        class Model(MdDatasetBaseModel):
+            a: int = number_field()
+
+        schema = Model.model_json_schema()
+        schema["properties"]["a"]["md-field-order"] = 7
+        assert Model.model_json_schema()["properties"]["a"]["md-field-order"] == 0
+
+    def test_cached_per_mode_and_class(self):
+        class Model(MdDatasetBaseModel):
+            a: int = number_field()
+
+        class Other(MdDatasetBaseModel):
+            b: str = string_field()
+
+        assert Model._frozen_json_schema(mode="serialization") is not Model._frozen_json_schema()
+        assert Model._frozen_json_schema(by_alias=False) is not Model._frozen_json_schema()
+        assert list(Other.model_json_schema()["properties"]) == ["b"]
+
+    def test_rebuild_invalidates(self):
+        class Model(MdDatasetBaseModel):
+            a: int = number_field()
+
+        frozen = Model._frozen_json_schema()
+        Model.model_rebuild(force=True)
+        assert Model._frozen_json_schema() is not frozen
+        assert Model._frozen_json_schema() == frozen
+
+    def test_forward_reference_resolved_by_rebuild(self):
+        class Outer(MdDatasetBaseModel):
+            inner: "LaterInner"
+
+        class LaterInner(MdDatasetBaseModel):
+            x: int
+
+        Outer.model_rebuild()
+        schema = Outer.model_json_schema()
+        assert schema["$defs"]["LaterInner"]["properties"]["x"]["md-field-order"] == 0
+
+
+class TestFormDefinition:
+    def test_matches_translated_wrapper(self):
+        from md_form import translate_payload
+
+        class Inner(MdDatasetBaseModel):
+            x: int = number_field(name="X")
+
+        class Params(MdDatasetBaseModel):
+            a: str = string_field(name="A")
+            inner: Inner
+
+        schema = Params.model_json_schema(ref_template="#/definitions/{model}")
+        definitions = schema.pop("$defs")
+        expected = translate_payload({
+            "properties": {"params": {"$ref": "#/definitions/Params", "position": 0, "title": "params"}},
+            "required": ["params"],
+            "definitions": {**definitions, "Params": schema},
+        })
+
+        form = Params.form_definition()
+        assert form == expected
+        assert list(form) == ["a", "inner"]
+        assert form["a"]["name"] == "A"
+
+    def test_computed_once_and_read_only(self):
+        class Params(MdDatasetBaseModel):
+            a: str = string_field(name="A")
+
+        form = Params.form_definition()
+        assert Params.form_definition() is form
+        with pytest.raises(TypeError):
+            form["a"]["name"] = "B"
+
+    def test_json_bytes(self):
+        import json
+
+        class Params(MdDatasetBaseModel):
+            a: str = string_field(name="A")
+
+        encoded = Params.form_definition(as_json=True)
+        assert isinstance(encoded, bytes)
+        assert json.loads(encoded) == Params.form_definition()
+        assert Params.form_definition(as_json=True) is encoded
+
+    def test_rebuild_invalidates(self):
+        class Params(MdDatasetBaseModel):
+            a: str = string_field(name="A")
+
+        form = Params.form_definition()
+        Params.model_rebuild(force=True)
+        assert Params.form_definition() is not form
+        assert Params.form_definition() == form
@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from typeguard import TypeCheckError
+
+from field_utils.field_helpers import number_field, string_field
+from field_utils.production_mode import is_production_mode, set_production_mode, typechecked
+from field_utils.rules_builder import has_unique_in_column, is_required
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def production():
+    set_production_mode(True)
+    yield
+    set_production_mode(False)
+
+
+class TestProductionMode:
+    def test_checked_by_default(self):
+        assert not is_production_mode()
+        with pytest.raises(TypeCheckError):
+            string_field(default=3)
+        with pytest.raises(TypeCheckError):
+            has_unique_in_column(3)
+        with pytest.raises(TypeCheckError):
+            number_field(name=3)
+
+    def test_unchecked_in_production(self, production):
+        assert is_production_mode()
+        field = string_field(default=3)
+        assert field.json_schema_extra["default"] == 3
+        assert has_unique_in_column(3).as_dict()["parameters"] == {"column": 3}
+        assert number_field(name="n", rules=[is_required()], ge=0).json_schema_extra["name"] == "n"
+
+    def test_decorator_keeps_metadata(self):
+        @typechecked
+        def double(value: int) -> int:
+            """Double it."""
+            return value * 2
+
+        assert double.__name__ == "double" and double.__doc__ == "Double it."
+        assert double(2) == 4
+        with pytest.raises(TypeCheckError):
+            double("x")
+
+    def test_environment_variable_skips_instrumentation(self):
+        probe = (
+            "import sys, md_form.field_utils as f\n"
+            "from md_form.field_utils.production_mode import is_production_mode\n"
+            "assert is_production_mode()\n"
+            "assert 'typeguard' not in sys.modules\n"
+            "assert not hasattr(f.rules_builder.is_required, '__wrapped__')\n"
+            "assert f.string_field(default=3).json_schema_extra['default'] == 3\n"
+        )
+        env = dict(os.environ, MD_FORM_PRODUCTION="1", PYTHONPATH=os.path.dirname(PACKAGE_ROOT))
+        subprocess.run([sys.executable, "-c", probe], env=env, check=True)
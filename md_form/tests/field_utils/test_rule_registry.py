@@ -0,0 +1,74 @@
+import pytest
+
+from field_utils.form_validator import FieldError, compile_form, validate_form
+from field_utils.rule_registry import register_rule, registered_rules, rule_factory, unregister_rule
+
+
+CATALOG = {"P12345", "Q67890"}
+
+
+@pytest.fixture
+def known_entity_rule():
+    calls = []
+
+    @register_rule("is_known_entity", messages={"unknown_entity": "{entity!r} is not a known entity"})
+    def factory(params):
+        calls.append(params)
+        catalog = set(params["catalog"])
+
+        def check(name, value, ctx):
+            if value not in catalog:
+                return FieldError(name, "unknown_entity", {"entity": value})
+            return None
+        return check
+
+    yield calls
+    unregister_rule("is_known_entity")
+
+
+def _definition(rules):
+    return {"properties": {"entity": {"fieldType": "String", "rules": rules}}}
+
+
+class TestRuleRegistry:
+    def test_builtin_rules_registered(self):
+        assert {"is_required", "is_equal_to_value", "has_unique_column_values_in_table",
+                "has_multiple_column_values_from_field_in_table"} <= set(registered_rules())
+        assert rule_factory("no_such_rule") is None
+        assert rule_factory(["unhashable"]) is None
+
+    def test_custom_rule_runs_like_builtins(self, known_entity_rule):
+        definition = _definition([{"name": "is_known_entity", "parameters": {"catalog": sorted(CATALOG)}}])
+        assert validate_form(definition, {"entity": "P12345"}).is_valid
+        result = validate_form(definition, {"entity": "X1"})
+        assert [str(e) for e in result.errors] == ["entity: 'X1' is not a known entity"]
+        assert result.to_dicts()[0]["code"] == "unknown_entity"
+
+    def test_factory_called_once_per_compile(self, known_entity_rule):
+        form = compile_form(_definition([{"name": "is_known_entity", "parameters": {"catalog": []}}]))
+        for value in ("a", "b", "c"):
+            validate_form(form, {"entity": value})
+        assert known_entity_rule == [{"catalog": []}]
+
+    def test_unknown_rules_skipped_and_recorded(self):
+        with pytest.warns(UserWarning, match="'is_future_rule' on 'entity'") as caught:
+            form = compile_form(_definition([{"name": "is_future_rule"}, {"name": "is_required"}]))
+        assert caught[0].filename == __file__
+        assert form.unknown_rules == [("entity", "is_future_rule")]
+        with pytest.warns(UserWarning) as caught:
+            assert validate_form(_definition([{"name": "is_future_rule"}]), {}).is_valid
+        assert caught[0].filename == __file__
+        assert validate_form(form, {"entity": "x"}).is_valid
+        assert not validate_form(form, {}).is_valid
+
+    def test_duplicate_registration(self, known_entity_rule):
+        with pytest.raises(ValueError):
+            register_rule("is_known_entity", lambda params: None)
+        register_rule("is_known_entity", lambda params: None, replace=True)
+        definition = _definition([{"name": "is_known_entity", "parameters": {"catalog": []}}])
+        assert validate_form(definition, {"entity": "anything"}).is_valid
+
+    def test_compiled_forms_keep_their_checks(self, known_entity_rule):
+        form = compile_form(_definition([{"name": "is_known_entity", "parameters": {"catalog": []}}]))
+        unregister_rule("is_known_entity")
+        assert not validate_form(form, {"entity": "x"}).is_valid
@@ -299,4 +299,56 @@ class TestRulesIntegration:
         ]
         
         for rule in rules:
-            assert isinstance(rule, Rule) 
\ No newline at end of file
+            assert isinstance(rule, Rule)
+
+
+class TestRuleFlyweights:
+    """Test cases for interned, immutable rules"""
+
+    def test_equal_rules_are_the_same_object(self):
+        assert RequiredRule("is_required") is RequiredRule("is_required")
+        assert EqualsToValueRule("is_equal_to_value", [1, 2]) is EqualsToValueRule("is_equal_to_value", [1, 2])
+        assert EqualsToValueRule("is_equal_to_value", 1) is not EqualsToValueRule("is_equal_to_value", True)
+        assert EqualsToFieldRule("f", "a") is not ColumnValidationRule("f", "a")
+
+    def test_dict_form_is_shared_and_read_only(self):
+        rule = EqualsToValueRule("is_equal_to_value", [1, 2])
+        assert rule.as_dict() is rule.as_dict()
+        with pytest.raises(TypeError):
+            rule.as_dict()["name"] = "other"
+        with pytest.raises(TypeError):
+            rule.as_dict()["parameters"]["value"].append(3)
+
+    def test_rules_are_immutable(self):
+        rule = RequiredRule("is_required")
+        with pytest.raises(AttributeError):
+            rule.rule_name = "other"
+        with pytest.raises(AttributeError):
+            rule.extra = 1
+
+    def test_arguments_are_copied(self):
+        values = [1, 2]
+        rule = EqualsToValueRule("is_equal_to_value", values)
+        values.append(3)
+        assert rule.value == [1, 2]
+
+    def test_copy_and_pickle(self):
+        import copy
+        import pickle
+
+        rule = EqualsToFieldRule("is_equal_to_value_from_field", "other", "values")
+        assert copy.deepcopy(rule) is rule
+        assert pickle.loads(pickle.dumps(rule)) is rule
+        assert copy.deepcopy(rule.as_dict()) == rule.as_dict()
+        assert type(copy.deepcopy(rule.as_dict())) is dict
+
+    def test_unhashable_values_are_not_interned(self):
+        class Opaque:
+            __hash__ = None
+
+        value = Opaque()
+        rule = EqualsToValueRule("is_equal_to_value", value)
+        assert rule.value is value
+        assert rule == EqualsToValueRule("is_equal_to_value", value)
+        with pytest.raises(TypeError):
+            hash(rule)
@@ -327,4 +327,10 @@ class TestRulesBuilderIntegration:
         not_equal_field_rule = is_not_included_in_values_from_field("test")
         
         assert equal_field_rule.field == not_equal_field_rule.field
-        assert equal_field_rule.rule_name != not_equal_field_rule.rule_name 
\ No newline at end of file
+        assert equal_field_rule.rule_name != not_equal_field_rule.rule_name 
+
+    def test_builders_return_shared_rules(self):
+        """Test that building the same rule twice returns the same object"""
+        assert is_required() is is_required()
+        assert is_equal_to_value([1, 2]) is is_equal_to_value([1, 2])
+        assert is_equal_to_value("a") is not is_not_equal_to_value("a")
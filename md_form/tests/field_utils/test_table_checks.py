@@ -0,0 +1,168 @@
+import array
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from field_utils.table_checks import (
+    ColumnSummary,
+    as_table,
+    column_values,
+    describe_duplicates,
+    duplicate_positions,
+    has_duplicates,
+    has_multiple_values,
+    is_column,
+)
+
+nan = float("nan")
+
+
+def _columns():
+    rng = random.Random(0)
+    return [
+        [],
+        ["a"],
+        ["a", "b", "a", "c", "b", "a"],
+        [1, 1.0, True, 2, "1"],
+        [None, None, "x"],
+        [nan, nan, None],
+        [nan, None, nan],
+        [["a"], ["a"], "a", ("a",), ("a",)],
+        [rng.randrange(500) for _ in range(3000)],
+        [f"S{rng.randrange(2000)}" for _ in range(3000)] + [None, None],
+        [f"S{i}" for i in range(3000)],
+    ]
+
+
+class TestDuplicatePositions:
+    @pytest.mark.parametrize("column", _columns())
+    def test_vectorized_matches_dict_pass(self, column):
+        expected = duplicate_positions(column, vectorize_min_rows=len(column) + 1)
+        assert has_duplicates(column, vectorize_min_rows=len(column) + 1) == bool(expected)
+        series = pd.Series(column, dtype=object)
+        assert duplicate_positions(series, vectorize_min_rows=0) == expected
+        assert has_duplicates(series, vectorize_min_rows=0) == bool(expected)
+
+    def test_lists_are_never_vectorized(self, monkeypatch):
+        import field_utils.table_checks as table_checks
+
+        def fail(column):
+            raise AssertionError("vectorized")
+        monkeypatch.setattr(table_checks, "_duplicate_positions_vectorized", fail)
+        column = [f"S{i % 1500}" for i in range(3000)]
+        assert has_duplicates(column, vectorize_min_rows=0)
+        assert duplicate_positions(column, vectorize_min_rows=0)["S0"] == [0, 1500]
+
+    def test_positions(self):
+        assert duplicate_positions(["a", "b", "a", "c", "b", "a"]) == {"a": [0, 2, 5], "b": [1, 4]}
+
+    def test_python_equality_semantics(self):
+        assert duplicate_positions([None, None]) == {None: [0, 1]}
+        # Distinct NaN objects never compare equal.
+        assert duplicate_positions([float("nan"), float("nan")]) == {}
+        assert duplicate_positions([1, 1.0, True]) == {1: [0, 1, 2]}
+
+    def test_numpy_column(self):
+        column = np.array([3, 1, 3, 2, 1])
+        assert duplicate_positions(column, vectorize_min_rows=0) == {3: [0, 2], 1: [1, 4]}
+
+    @pytest.mark.parametrize("vectorize_min_rows", [0, 100])
+    def test_numpy_values_reported_as_python_values(self, vectorize_min_rows):
+        for column in (np.array([3, 1, 3]), np.array([0.5, 0.5]), np.array(["a", "a"]), pd.Series([True, True])):
+            duplicates = duplicate_positions(column, vectorize_min_rows=vectorize_min_rows)
+            assert [type(value) for value in duplicates] == [type(column[0].item())]
+
+    def test_unhashable_values(self):
+        assert duplicate_positions([["a"], "b", ["a"]]) == {"['a']": [0, 2]}
+
+    def test_describe(self):
+        assert describe_duplicates({"a": [0, 2], "b": [1, 3]}) == "'a' at rows 0, 2; 'b' at rows 1, 3"
+        many = {i: [i, i + 100] for i in range(8)}
+        assert describe_duplicates(many).endswith("; and 3 more")
+
+
+class TestHasMultipleValues:
+    @pytest.mark.parametrize("column, expected", [
+        ([], False),
+        (["a"], False),
+        (["a", "a", "a"], False),
+        (["a", "a", "b"], True),
+        ([1, 1.0, True], False),
+        ([None, None], False),
+        ([["a"], ["a"]], False),
+        ([["a"], ["b"]], True),
+        ([nan, nan], False),
+        ([nan, float("nan")], True),
+    ])
+    def test_python_equality(self, column, expected):
+        assert has_multiple_values(column) is expected
+
+    def test_vectorized_matches_loop(self):
+        for column in (np.zeros(5000), np.arange(5000) % 2, np.array(["x"] * 5000), np.full(5000, np.nan)):
+            looped = has_multiple_values(column, vectorize_min_rows=len(column) + 1)
+            assert has_multiple_values(column, vectorize_min_rows=0) == looped
+
+
+class TestColumnSummary:
+    @staticmethod
+    def _summary(column, track_duplicates=True):
+        summary = ColumnSummary(track_duplicates)
+        for value in column:
+            summary.add(value)
+        return summary.finish()
+
+    @pytest.mark.parametrize("column", _columns())
+    def test_matches_list_checks(self, column):
+        summary = self._summary(column)
+        assert is_column(summary) and len(summary) == len(column)
+        assert duplicate_positions(summary) == duplicate_positions(column)
+        assert has_duplicates(summary) == has_duplicates(column)
+        assert has_multiple_values(summary) == has_multiple_values(column)
+
+    def test_untracked_duplicates(self):
+        summary = self._summary(["a", "b"], track_duplicates=False)
+        assert has_multiple_values(summary)
+        with pytest.raises(ValueError):
+            duplicate_positions(summary)
+
+
+class TestColumnarTables:
+    def test_dict_is_its_own_table(self):
+        table = {"a": [1, 2]}
+        assert as_table(table) is table
+
+    def test_dataframe_columns_are_views(self):
+        frame = pd.DataFrame({"x": np.arange(5, dtype=float), "y": np.arange(5, dtype=float)})
+        table = as_table(frame)
+        assert list(table) == ["x", "y"]
+        assert np.shares_memory(table["x"], frame["x"].to_numpy())
+
+    def test_not_a_table(self):
+        assert as_table([["a"], ["b"]]) is None
+        assert as_table("table") is None
+
+    @pytest.mark.parametrize("column", [
+        [1, 2],
+        np.array([1, 2]),
+        pd.Series([1, 2]),
+        array.array("d", [1.0, 2.0]),
+        memoryview(array.array("i", [1, 2])),
+    ])
+    def test_columns(self, column):
+        assert is_column(column)
+
+    @pytest.mark.parametrize("value", [(1, 2), "ab", b"ab", np.zeros((2, 2)), 3, None])
+    def test_non_columns(self, value):
+        assert not is_column(value)
+
+    def test_series_read_by_position(self):
+        series = pd.Series(["a", "b", "a"], index=[10, 20, 30])
+        assert duplicate_positions(column_values(series)) == {"a": [0, 2]}
+        assert duplicate_positions(series, vectorize_min_rows=0) == {"a": [0, 2]}
+
+    def test_buffer_columns(self):
+        column = array.array("i", [4, 5, 4])
+        assert duplicate_positions(column) == {4: [0, 2]}
+        assert duplicate_positions(memoryview(column), vectorize_min_rows=0) == {4: [0, 2]}
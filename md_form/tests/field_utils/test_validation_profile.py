@@ -0,0 +1,59 @@
+import itertools
+
+from field_utils.form_validator import is_valid_form, validate_form
+from field_utils.validation_profile import ValidationProfile
+
+
+def _ticking_profile():
+    # Every clock read advances one second, so timings are deterministic.
+    return ValidationProfile(clock=itertools.count().__next__)
+
+
+class TestValidationProfile:
+    definition = {"properties": {
+        "mode": {"fieldType": "Select", "parameters": {"options": ["a", "b"]}},
+        "level": {"fieldType": "Number", "parameters": {"min": 0, "max": 10},
+                  "when": {"property": "mode", "equals": "a"}},
+        "label": {"fieldType": "String",
+                  "rules": [{"name": "is_required"}, {"name": "is_not_equal_to_value", "parameters": {"value": "x"}}]},
+        "inputs": {"fieldType": "Datasets"},
+    }}
+    data = {"mode": "a", "level": 11, "label": "x", "inputs": ["ds1"]}
+    datasets = [{"id": "ds1", "state": "COMPLETED"}]
+
+    def test_counts_per_field_rule_and_check(self):
+        profile = _ticking_profile()
+        validate_form(self.definition, self.data, datasets=self.datasets, profile=profile)
+        validate_form(self.definition, self.data, datasets=self.datasets, profile=profile)
+        stats = profile.as_dict()
+        assert stats["calls"] == 2
+        assert {name: s["count"] for name, s in stats["fields"].items()} == {
+            "mode": 2, "level": 2, "label": 2, "inputs": 2,
+        }
+        # is_required is a presence check, not a per-value rule check.
+        assert {name: s["count"] for name, s in stats["rules"].items()} == {"is_not_equal_to_value": 2}
+        assert {kind: s["count"] for kind, s in stats["checks"].items()} == {
+            "gate": 2, "options": 8, "bounds": 8, "rule": 2, "datasets": 2,
+        }
+        assert all(s["seconds"] > 0 for s in stats["fields"].values())
+
+    def test_unmet_gate_is_timed_without_checks(self):
+        profile = _ticking_profile()
+        validate_form(self.definition, {"mode": "b", "label": "y"}, datasets=[], profile=profile)
+        stats = profile.as_dict()
+        assert stats["checks"]["gate"]["count"] == 1
+        assert stats["fields"]["level"]["count"] == 1
+        assert stats["checks"]["options"]["count"] == 2  # mode and label only
+
+    def test_results_match_unprofiled(self):
+        for data in (self.data, {"mode": "c"}, {"mode": "b", "label": "y", "inputs": ["nope"]}):
+            expected = validate_form(self.definition, data, datasets=self.datasets)
+            profiled = validate_form(self.definition, data, datasets=self.datasets, profile=ValidationProfile())
+            assert profiled.errors == expected.errors
+        assert is_valid_form(self.definition, self.data, datasets=self.datasets, profile=ValidationProfile()) is False
+
+    def test_reset(self):
+        profile = ValidationProfile()
+        validate_form(self.definition, self.data, datasets=self.datasets, profile=profile)
+        profile.reset()
+        assert profile.as_dict() == {"calls": 0, "fields": {}, "rules": {}, "checks": {}}
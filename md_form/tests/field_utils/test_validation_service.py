@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from field_utils.form_validator import FieldError, validate_form
+from field_utils.rule_registry import register_rule, unregister_rule
+from field_utils.validation_service import ValidationService
+
+
+definition = {"properties": {
+    "mode": {"fieldType": "String", "rules": [{"name": "is_required"}], "parameters": {"options": ["a", "b"]}},
+    "level": {"fieldType": "Number", "parameters": {"min": 0, "max": 10}},
+    "inputs": {"fieldType": "Datasets"},
+}}
+slow_definition = {"properties": {"x": {"fieldType": "String", "rules": [{"name": "takes_a_while"}]}}}
+datasets = [{"id": "ds1", "state": "COMPLETED"}]
+
+
+@pytest.fixture(scope="module")
+def service():
+    # Workers are forked after this, so they see the rule too.
+    @register_rule("takes_a_while")
+    def takes_a_while(params):
+        def check(name, value, ctx):
+            time.sleep(float(value))
+            return None
+        return check
+
+    with ValidationService({"form": definition, "slow": slow_definition}, datasets=datasets,
+                           workers=2, max_pending=2, queue_timeout=0.05) as running:
+        yield running
+    unregister_rule("takes_a_while")
+
+
+def _messages(result):
+    return [str(e) for e in result.errors]
+
+
+class TestValidationService:
+    def test_results_match_validate_form(self, service):
+        with service.client() as client:
+            for data in ({"mode": "a", "inputs": ["ds1"]}, {"mode": "z", "level": 11}, {}):
+                expected = validate_form(definition, data, datasets=datasets)
+                result = client.validate("form", data, datasets=datasets)
+                assert _messages(result) == _messages(expected)
+                assert result.errors == expected.errors
+
+    def test_service_datasets_used_by_default(self, service):
+        with service.client() as client:
+            assert client.validate("form", {"mode": "a", "inputs": ["ds1"]}).is_valid
+            result = client.validate("form", {"mode": "a", "inputs": ["ds1"]}, datasets=[])
+        assert [e.code for e in result.errors] == ["dataset_not_found"]
+
+    def test_validate_many_keeps_order(self, service):
+        items = [{"mode": "a", "level": level} for level in range(20)]
+        with service.client() as client:
+            results = client.validate_many("form", items)
+        assert [r.is_valid for r in results] == [level <= 10 for level in range(20)]
+
+    def test_fail_fast_option(self, service):
+        with service.client() as client:
+            result = client.validate("form", {"mode": "z", "level": 11}, fail_fast=True)
+        assert result.truncated and len(result.errors) == 1
+
+    def test_unknown_form_and_forms_list(self, service):
+        with service.client() as client:
+            assert client.forms() == ["form", "slow"]
+            result = client.validate("nope", {})
+        assert result.errors == [FieldError("<service>", "unknown_form", {"form": "nope"})]
+
+    def test_backpressure_rejects_when_full(self, service):
+        busy = [service.submit("slow", {"x": "0.5"}) for _ in range(2)]
+        rejected = service.submit("slow", {"x": "0"}).result()
+        assert rejected["errors"][0][1] == "overloaded"
+        assert all(not f.result().get("failed") for f in busy)
+        metrics = service.metrics()
+        assert metrics["rejected"] >= 1
+        assert metrics["max_queue_depth"] == 2
+        assert metrics["queue_depth"] == 0
+
+    def test_concurrent_clients_and_metrics(self, service):
+        before = service.metrics()["completed"]
+
+        def run():
+            with service.client() as client:
+                for _ in range(10):
+                    assert client.validate("form", {"mode": "a"}).is_valid
+
+        threads = [threading.Thread(target=run) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with service.client() as client:
+            metrics = client.metrics()
+        assert metrics["completed"] - before == 20
+        assert metrics["throughput_per_second"] > 0
+        assert metrics["workers"] == 2
+
+
+class TestWorkers:
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="needs the fork start method")
+    def test_forms_compiled_once_in_the_service_process(self):
+        @register_rule("reports_compiling_pid")
+        def reports_compiling_pid(params):
+            pid = os.getpid()
+
+            def check(name, value, ctx):
+                return FieldError(name, "compiled_in", {"pid": pid, "worker": os.getpid()})
+            return check
+
+        form = {"properties": {"x": {"fieldType": "String", "rules": [{"name": "reports_compiling_pid"}]}}}
+        try:
+            with ValidationService({"form": form}, workers=1) as running:
+                with running.client() as client:
+                    params = client.validate("form", {"x": "a"}).errors[0].params
+        finally:
+            unregister_rule("reports_compiling_pid")
+        assert params["pid"] == os.getpid()
+        assert params["worker"] != os.getpid()
+
+    def test_all_workers_started_up_front(self):
+        with ValidationService({"form": definition}, workers=3) as running:
+            assert len(running._pool._processes) == 3
+
+    def test_submit_failure_frees_its_slot(self):
+        service = ValidationService({"form": definition}, max_pending=1)
+        pool = ThreadPoolExecutor(1)
+        pool.shutdown()
+        service._pool = pool
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                service.submit("form", {})
+        metrics = service.metrics()
+        assert metrics["queue_depth"] == 0
+        assert metrics["failed"] == 2
+
+    def test_service_error_messages(self, service):
+        with service.client() as client:
+            result = client.validate("nope", {})
+        assert str(result.errors[0]) == "<service>: no form 'nope' is served"
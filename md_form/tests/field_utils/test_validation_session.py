@@ -0,0 +1,155 @@
+import json
+import os
+
+import pytest
+
+import field_utils.validation_session as validation_session
+from field_utils.dataset_index import DatasetIndex
+from field_utils.form_validator import validate_form
+from field_utils.validation_session import ValidationSession
+
+TUTORIAL_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+    "tutorial",
+)
+
+
+def _errors(result):
+    return [(e.field, e.message) for e in result.errors]
+
+
+definition = {
+    "properties": {
+        "input_datasets": {"fieldType": "Datasets", "parameters": {"type": "INTENSITY"},
+                           "rules": [{"name": "is_required"}]},
+        "mode": {"fieldType": "String",
+                 "parameters": {"options": [{"name": "skip", "value": "skip"},
+                                            {"name": "batch", "value": "batch"}]}},
+        "batch_variables": {"fieldType": "PairwiseControlVariables",
+                            "rules": [{"name": "is_required"}],
+                            "when": {"property": "mode", "equals": "batch"}},
+        "species": {"fieldType": "String"},
+        "db": {"fieldType": "String",
+               "parameters": {"options": {"ref": "species", "cases": {
+                   "human": [{"name": "reactome", "value": "reactome"}],
+               }}}},
+        "control_variables": {"fieldType": "PairwiseControlVariables"},
+        "condition_column": {"fieldType": "DatasetSampleMetadata",
+                             "rules": [{"name": "is_not_included_in_values_from_field",
+                                        "parameters": {"field": "control_variables"}}]},
+        "confirm": {"fieldType": "String",
+                    "rules": [{"name": "is_equal_to_value_from_field",
+                               "parameters": {"field": "condition_column"}}]},
+        "unrelated": {"fieldType": "Number", "parameters": {"min": 0}},
+    }
+}
+
+datasets = [{"id": "ds1", "type": "INTENSITY", "state": "COMPLETED"},
+            {"id": "ds2", "type": "PAIRWISE", "state": "COMPLETED"}]
+
+
+@pytest.fixture
+def revalidated(monkeypatch):
+    """Record the fields each session update revalidates."""
+    names = []
+    original = validation_session._validate_field
+
+    def recording(name, *args):
+        names.append(name)
+        return original(name, *args)
+
+    monkeypatch.setattr(validation_session, "_validate_field", recording)
+    return names
+
+
+class TestValidationSession:
+    def test_initial_result_matches_validate_form(self):
+        session = ValidationSession(definition, datasets)
+        assert _errors(session.result) == _errors(validate_form(definition, {}, datasets=datasets))
+        assert ("input_datasets", "is required") in _errors(session.result)
+
+    def test_updates_track_validate_form(self):
+        session = ValidationSession(definition, datasets)
+        data = {}
+        for field, value in [
+            ("input_datasets", ["ds1"]),
+            ("mode", "batch"),
+            ("batch_variables", ["v"]),
+            ("species", "human"),
+            ("db", "go"),
+            ("db", "reactome"),
+            ("control_variables", ["condition"]),
+            ("condition_column", "condition"),
+            ("control_variables", ["batch"]),
+            ("confirm", "other"),
+            ("condition_column", "other"),
+            ("input_datasets", ["ds2"]),
+            ("mode", "skip"),
+            ("unrelated", -1),
+            ("species", None),
+        ]:
+            data[field] = value
+            result = session.update(field, value)
+            assert _errors(result) == _errors(validate_form(definition, data, datasets=datasets)), field
+
+    def test_only_dependent_fields_revalidated(self, revalidated):
+        session = ValidationSession(definition, datasets)
+        revalidated.clear()
+
+        session.update("unrelated", 1)
+        assert revalidated == ["unrelated"]
+
+        revalidated.clear()
+        session.update("mode", "batch")
+        assert revalidated == ["mode", "batch_variables"]
+
+        revalidated.clear()
+        session.update("species", "human")
+        assert revalidated == ["species", "db"]
+
+        revalidated.clear()
+        session.update("control_variables", ["x"])
+        assert revalidated == ["control_variables", "condition_column"]
+
+        revalidated.clear()
+        session.update("condition_column", "y")
+        assert revalidated == ["condition_column", "confirm"]
+
+    def test_unknown_key_revalidates_nothing(self, revalidated):
+        session = ValidationSession(definition, datasets, allow_unknown=False)
+        revalidated.clear()
+        result = session.update("extra", 1)
+        assert revalidated == []
+        assert ("extra", "unknown field not present in the form definition") in _errors(result)
+
+    def test_missing_datasets_reported(self):
+        session = ValidationSession(definition)
+        result = session.update("input_datasets", ["ds1"])
+        assert ("input_datasets", "a datasets list must be provided to validate this field") in _errors(result)
+
+    def test_initial_data(self):
+        session = ValidationSession(definition, datasets, {"input_datasets": ["ds1"]})
+        assert session.result.is_valid
+
+    def test_revalidate_picks_up_dataset_index_changes(self):
+        index = DatasetIndex(datasets)
+        session = ValidationSession(definition, index, {"input_datasets": ["ds1"]})
+        assert session.result.is_valid
+        index.set_state("ds1", "PROCESSING")
+        assert session.result.is_valid
+        assert _errors(session.revalidate()) == [
+            ("input_datasets", "dataset 'ds1' must be in state 'COMPLETED', not 'PROCESSING'"),
+        ]
+        index.set_state("ds1", "COMPLETED")
+        assert session.revalidate(["input_datasets"]).is_valid
+
+    def test_shared_gate_fields_follow_controlling_field(self):
+        with open(os.path.join(TUTORIAL_DIR, "transform_intensities_form.json")) as f:
+            form = json.load(f)
+        session = ValidationSession(form, [{"id": "ds1", "type": "INTENSITY", "state": "COMPLETED"}])
+        assert _errors(session.result) == [("input_datasets", "is required")]
+        result = session.update("input_datasets", ["ds1"])
+        assert result.is_valid == validate_form(
+            form, {"input_datasets": ["ds1"]},
+            datasets=[{"id": "ds1", "type": "INTENSITY", "state": "COMPLETED"}],
+        ).is_valid
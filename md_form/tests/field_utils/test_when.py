@@ -1,5 +1,5 @@
 import pytest
-from md_form.field_utils.when import When, evaluate_when
+from md_form.field_utils.when import When, compile_when, evaluate_when, simplify_when
 
 
 class TestWhen:
@@ -304,7 +304,7 @@ class TestWhen:
         when = When(operator="and", conditions=[])
         
         assert when.operator == "and"
-        assert when.conditions == []
+        assert when.conditions == ()
         
         result = when.as_dict()
         expected = {
@@ -529,4 +529,269 @@ class TestEvaluateWhen:
         )
         assert when.evaluate({"input_datasets": "ds1", "sets": ["Reactome", "Custom Lists"]}) is True
         assert when.evaluate({"input_datasets": "ds1", "sets": ["Reactome"]}) is False
-        assert when.evaluate({"sets": ["Custom Lists"]}) is False
\ No newline at end of file
+        assert when.evaluate({"sets": ["Custom Lists"]}) is False
+
+class TestCompileWhen:
+    """Test cases for compile_when"""
+
+    cases = [
+        {"property": "x", "equals": "a"},
+        {"property": "x", "not_equals": "a"},
+        {"property": "x", "is_present": True},
+        {"property": "x", "is_present": False},
+        {"property": "tags", "contains": "a"},
+        {"property": "x", "greater_than": 5},
+        {"property": "x", "equals": ["a"]},
+        {"property": "x", "equals": {"k": "v"}},
+        {"operator": "and", "conditions": []},
+        {"operator": "or", "conditions": []},
+        {"operator": "xor", "conditions": []},
+        {"operator": None, "conditions": []},
+        {"operator": "or", "conditions": [
+            {"property": "x", "equals": "a"},
+            {"property": "x", "equals": "b"},
+            {"property": "x", "equals": ["a"]},
+            {"property": "tags", "contains": "a"},
+            {"property": "tags", "contains": "b"},
+        ]},
+        {"operator": "and", "conditions": [
+            {"property": "x", "not_equals": "a"},
+            {"property": "x", "not_equals": "b"},
+            {"property": "tags", "contains": "a"},
+            {"property": "tags", "contains": "b"},
+            {"operator": "and", "conditions": [{"property": "y", "is_present": True}]},
+        ]},
+        {"operator": "and", "conditions": [
+            {"property": "y", "is_present": True},
+            {"operator": "or", "conditions": [
+                {"property": "x", "equals": "a"},
+                {"operator": "or", "conditions": [{"property": "x", "equals": "b"}]},
+            ]},
+        ]},
+    ]
+
+    records = [
+        {},
+        {"x": "a"},
+        {"x": "b", "y": 1},
+        {"x": "c", "y": None},
+        {"x": ["a"], "y": 0},
+        {"x": {"k": "v"}},
+        {"x": None, "tags": ["a"]},
+        {"x": "a", "y": "z", "tags": ["a", "b"]},
+        {"x": "c", "y": "z", "tags": ("b", "a", {"unhashable": 1})},
+        {"tags": "ab"},
+        {"tags": [["a"], "b"]},
+    ]
+
+    @pytest.mark.parametrize("when_dict", cases)
+    def test_agrees_with_evaluate_when(self, when_dict):
+        predicate = compile_when(when_dict)
+        for data in self.records:
+            assert bool(predicate(data)) == bool(evaluate_when(when_dict, data)), data
+
+    def test_when_object_and_dict_share_predicate(self):
+        when = When.any_of(When.equals("x", "a"), When.equals("x", "b"))
+        assert compile_when(when) is compile_when(when.as_dict())
+
+    def test_identical_conditions_share_predicate(self):
+        first = {"property": "input_datasets", "is_present": True}
+        second = {"is_present": True, "property": "input_datasets"}
+        assert compile_when(first) is compile_when(second)
+
+    def test_distinguishes_list_and_tuple_values(self):
+        as_list = compile_when({"property": "x", "equals": ["a"]})
+        as_tuple = compile_when({"property": "x", "equals": ("a",)})
+        assert as_list({"x": ["a"]}) is True
+        assert as_tuple({"x": ["a"]}) is False
+
+    def test_nested_groups_flattened(self):
+        when = When.all_of(
+            When.all_of(When.is_present("a"), When.all_of(When.is_present("b"))),
+            When.is_present("c"),
+        )
+        predicate = compile_when(when)
+        assert predicate({"a": 1, "b": 1, "c": 1}) is True
+        assert predicate({"a": 1, "b": 1}) is False
+
+    def test_single_condition_group_compiles_to_leaf(self):
+        leaf = When.equals("x", "a")
+        assert compile_when(When.any_of(leaf)) is compile_when(leaf)
+
+    def test_unhashable_data_value_in_folded_equals(self):
+        predicate = compile_when(When.any_of(When.equals("x", "a"), When.equals("x", "b")))
+        assert predicate({"x": ["a"]}) is False
+        assert predicate({"x": "b"}) is True
+
+
+class TestWhenNode:
+    """When objects are immutable, interned and cache their dict form"""
+
+    def test_equal_conditions_are_interned(self):
+        first = When.all_of(When.equals("x", "a"), When.is_present("y"))
+        second = When.all_of(When.equals("x", "a"), When.is_present("y"))
+        assert first is second
+        assert first == second and hash(first) == hash(second)
+        assert len({first, second, When.equals("x", "a")}) == 2
+
+    def test_values_of_different_types_are_not_interned_together(self):
+        assert When.equals("x", 1) is not When.equals("x", True)
+        assert type(When.equals("x", 1).as_dict()["equals"]) is int
+        assert When.equals("x", True).as_dict()["equals"] is True
+        assert When.equals("x", ["a"]) != When.equals("x", ("a",))
+
+    def test_immutable(self):
+        when = When.equals("x", "a")
+        with pytest.raises(AttributeError):
+            when.value = "b"
+        with pytest.raises(AttributeError):
+            del when.property
+        assert isinstance(When.any_of(when).conditions, tuple)
+
+    def test_as_dict_cached_and_read_only(self):
+        when = When.any_of(When.equals("x", ["a"]), When.is_present("y"))
+        result = when.as_dict()
+        assert result is when.as_dict()
+        assert result["conditions"][0] is when.conditions[0].as_dict()
+        with pytest.raises(TypeError):
+            result["operator"] = "and"
+        with pytest.raises(TypeError):
+            result["conditions"].append({})
+        with pytest.raises(TypeError):
+            result["conditions"][0]["equals"].append("b")
+
+    def test_value_is_copied(self):
+        value = ["a"]
+        when = When.equals("x", value)
+        value.append("b")
+        assert when.value == ["a"]
+        assert when.evaluate({"x": ["a"]}) is True
+
+    def test_copies_are_plain(self):
+        import copy
+        import json
+        import pickle
+
+        when = When.all_of(When.equals("x", {"k": [1]}))
+        copied = copy.deepcopy(when.as_dict())
+        copied["conditions"][0]["equals"]["k"].append(2)
+        assert type(copied) is dict and type(copied["conditions"]) is list
+        assert when.as_dict()["conditions"][0]["equals"] == {"k": [1]}
+        assert copy.deepcopy(when) is when
+        assert pickle.loads(pickle.dumps(when)) is when
+        assert json.loads(json.dumps(when.as_dict())) == when.as_dict()
+
+    def test_unhashable_value_still_works(self):
+        class Opaque:
+            __hash__ = None
+
+        when = When.equals("x", Opaque())
+        assert when is not When.equals("x", Opaque())
+        with pytest.raises(TypeError):
+            hash(When.any_of(when))
+        assert When.any_of(when) == When.any_of(when)
+        assert when.evaluate({"x": 1}) is False
+
+    def test_predicate_cached_on_node(self):
+        when = When.any_of(When.equals("x", "a"), When.equals("x", "b"))
+        assert compile_when(when) is compile_when(when)
+        assert when.evaluate({"x": "b"}) is True
+
+
+class TestSimplifyWhen:
+    """Test cases for simplify_when"""
+
+    TRUE = {"operator": "and", "conditions": []}
+    FALSE = {"operator": "or", "conditions": []}
+
+    @pytest.mark.parametrize("when, expected", [
+        # flattening and single-condition groups
+        (When.all_of(When.all_of(When.is_present("a")), When.all_of(When.is_present("b"))),
+         When.all_of(When.is_present("a"), When.is_present("b"))),
+        (When.any_of(When.equals("x", "a")), When.equals("x", "a")),
+        # duplicates
+        (When.any_of(When.equals("x", "a"), When.contains("t", 1), When.equals("x", "a")),
+         When.any_of(When.equals("x", "a"), When.contains("t", 1))),
+        # constants
+        (When.all_of(When("x", "greater_than", 1), When.is_present("y")), When.any_of()),
+        (When.any_of(When("x", "greater_than", 1), When.is_present("y")), When.is_present("y")),
+        (When.any_of(When.all_of(), When.is_present("y")), When.all_of()),
+        (When(operator="xor", conditions=[When.is_present("y")]), When.any_of()),
+        # contradictions and implications on one property
+        (When.all_of(When.equals("x", "a"), When.equals("x", "b")), When.any_of()),
+        (When.all_of(When.equals("x", "a"), When.not_equals("x", "a")), When.any_of()),
+        (When.all_of(When.equals("x", None), When.is_present("x")), When.any_of()),
+        (When.all_of(When.is_present("x"), When.not_equals("x", "b"), When.equals("x", "a")),
+         When.equals("x", "a")),
+        (When.any_of(When.equals("x", "a"), When.not_equals("x", "a")), When.all_of()),
+        (When.any_of(When.not_equals("x", "a"), When.not_equals("x", "b")), When.all_of()),
+        (When.any_of(When.equals("x", "a"), When.is_present("x")), When.is_present("x")),
+        (When.all_of(When.equals("x", 1), When.equals("x", 1.0)), When.equals("x", 1)),
+        # cheapest first
+        (When.all_of(When.contains("t", "a"), When.equals("x", "a"), When.is_present("y")),
+         When.all_of(When.is_present("y"), When.equals("x", "a"), When.contains("t", "a"))),
+    ])
+    def test_simplifies(self, when, expected):
+        assert simplify_when(when) is expected
+
+    def test_dicts(self):
+        when = {"operator": "or", "conditions": [
+            {"operator": "or", "conditions": [{"property": "x", "is_present": False}]},
+            {"property": "x", "equals": "a"},
+        ]}
+        simplified = simplify_when(when)
+        assert simplified == {"property": "x", "is_present": True}
+        assert type(simplified) is dict
+        assert simplify_when({"operator": "and", "conditions": [{"property": "x", "equals": "a"},
+                                                                  {"property": "x", "equals": "b"}]}) == self.FALSE
+        assert simplify_when({"operator": "and"}) == self.TRUE
+
+    def test_leaves_unplain_values_alone(self):
+        nan = float("nan")
+        when = When.all_of(When.equals("x", nan), When.equals("x", 1))
+        assert simplify_when(when) == when
+        when = When.all_of(When.equals("x", ["a"]), When.equals("x", ["b"]))
+        assert len(simplify_when(when).conditions) == 2
+
+    def test_idempotent(self):
+        when = When.any_of(When.all_of(When.equals("x", "a"), When.contains("t", 1)), When.is_present("y"))
+        assert simplify_when(simplify_when(when)) is simplify_when(when)
+
+    def test_equivalent_conditions_share_predicate(self):
+        assert compile_when(When.any_of(When.equals("x", "a"), When.equals("x", "a"))) is \
+            compile_when(When.equals("x", "a"))
+
+    def test_agrees_with_evaluate_when(self):
+        import random
+
+        rng = random.Random(1234)
+        values = [None, "a", "b", 1, 1.0, True, 0, ["a"], ("a",), float("nan")]
+        props = ["x", "y", "t"]
+
+        def condition(depth):
+            if depth < 3 and rng.random() < 0.4:
+                operator = rng.choice(["and", "or", "and", "or", "xor"])
+                return {"operator": operator, "conditions": [condition(depth + 1) for _ in range(rng.randint(0, 4))]}
+            kind = rng.choice(["equals", "not_equals", "is_present", "contains", "greater_than"])
+            return {"property": rng.choice(props), kind: rng.choice(values)}
+
+        datas = [{}] + [
+            {prop: rng.choice(values + [["a", "b"], [1]]) for prop in props if rng.random() < 0.8}
+            for _ in range(40)
+        ]
+        for _ in range(300):
+            when = condition(0)
+            simplified = simplify_when(when)
+            node = simplify_when(When(operator="and", conditions=[_node(when)]))
+            for data in datas:
+                expected = evaluate_when(when, data)
+                assert evaluate_when(simplified, data) == expected, (when, simplified, data)
+                assert node.evaluate(data) == expected
+                assert compile_when(when)(data) == expected
+
+
+def _node(when):
+    if "operator" in when:
+        return When(operator=when["operator"], conditions=[_node(c) for c in when["conditions"]])
+    kind = next(k for k in when if k != "property")
+    return When(when["property"], kind, when[kind])
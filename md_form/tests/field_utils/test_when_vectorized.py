@@ -0,0 +1,92 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from field_utils.when import When, evaluate_when
+from field_utils.when_vectorized import evaluate_when_vectorized
+
+
+VALUES = [None, "a", "b", 1, 0, 1.0, 2.5, True, False, ["a"], ("a", "b"), float("nan")]
+
+
+def _conditions(rng, count):
+    def condition(depth):
+        if depth < 3 and rng.random() < 0.4:
+            operator = rng.choice(["and", "or", "and", "or", "xor"])
+            return {"operator": operator, "conditions": [condition(depth + 1) for _ in range(rng.randint(0, 4))]}
+        kind = rng.choice(["equals", "not_equals", "is_present", "contains", "greater_than"])
+        return {"property": rng.choice(["i", "f", "s", "b", "o", "l", "missing"]), kind: rng.choice(VALUES)}
+    return [condition(0) for _ in range(count)]
+
+
+def _records(rows=30):
+    rng = random.Random(7)
+    return {
+        "i": np.array([rng.randint(-1, 2) for _ in range(rows)]),
+        "f": np.array([rng.choice([0.0, 1.0, 2.5, float("nan")]) for _ in range(rows)]),
+        "s": np.array([rng.choice(["a", "b", ""]) for _ in range(rows)]),
+        "b": np.array([rng.random() < 0.5 for _ in range(rows)]),
+        "o": np.array([rng.choice(VALUES) for _ in range(rows)] + [None], dtype=object)[:rows],
+        "l": [rng.choice(VALUES + [["a", "b"], [1, None]]) for _ in range(rows)],
+    }
+
+
+def _expected(when, columns, rows):
+    return [bool(evaluate_when(when, {name: column[i] for name, column in columns.items()})) for i in range(rows)]
+
+
+def _assert_agrees(when, records, columns, rows=30):
+    try:
+        expected = _expected(when, columns, rows)
+    except ValueError:
+        # A NumPy scalar compared with a tuple gives an array, not a bool, so
+        # evaluate_when itself fails on this record.
+        return
+    mask = evaluate_when_vectorized(when, records)
+    assert mask.dtype == bool
+    assert mask.tolist() == expected, when
+
+
+class TestEvaluateWhenVectorized:
+    def test_agrees_with_evaluate_when(self):
+        records = _records()
+        for when in _conditions(random.Random(99), 400):
+            _assert_agrees(when, records, records)
+
+    def test_dataframe(self):
+        records = _records()
+        frame = pd.DataFrame({name: column for name, column in records.items() if name != "l"})
+        columns = {name: frame[name].to_numpy() for name in frame.columns}
+        for when in _conditions(random.Random(5), 200):
+            _assert_agrees(when, frame, columns)
+
+    @pytest.mark.parametrize("expected", [[1], [True], ["a"], {"a": 1}, [], ("a",)])
+    @pytest.mark.parametrize("kind", ["equals", "not_equals"])
+    def test_container_values_on_typed_columns(self, kind, expected):
+        frame = pd.DataFrame({"n": [1, 2], "b": [True, False], "s": ["a", "b"]})
+        for name in frame.columns:
+            when = {"property": name, kind: expected}
+            records = frame.to_dict("records")
+            mask = evaluate_when_vectorized(when, frame)
+            assert mask.tolist() == [bool(evaluate_when(when, record)) for record in records], when
+            columns = {column: frame[column].to_numpy() for column in frame.columns}
+            assert evaluate_when_vectorized(when, columns).tolist() == mask.tolist()
+
+    def test_when_objects_and_series(self):
+        records = {"mode": pd.Series(["a", "b", "a"], index=[10, 20, 30]), "tags": [["x"], [], ("x",)]}
+        when = When.all_of(When.equals("mode", "a"), When.contains("tags", "x"))
+        assert evaluate_when_vectorized(when, records).tolist() == [True, False, True]
+        assert evaluate_when_vectorized(When.is_present("other"), records).tolist() == [False] * 3
+        assert evaluate_when_vectorized(When.not_equals("other", "a"), records).tolist() == [True] * 3
+
+    def test_empty_and_column_less_frames(self):
+        assert evaluate_when_vectorized({"property": "x", "is_present": True}, {}).shape == (0,)
+        frame = pd.DataFrame(index=range(3))
+        assert evaluate_when_vectorized({"operator": "and", "conditions": []}, frame).tolist() == [True] * 3
+
+    @pytest.mark.parametrize("records", [[{"x": 1}], {"x": [1, 2], "y": [1]}])
+    def test_rejects_bad_records(self, records):
+        with pytest.raises(ValueError):
+            evaluate_when_vectorized({"property": "x", "is_present": True}, records)